@@ -1,59 +1,163 @@
-import json
+import hashlib
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Any, Dict, Optional, Tuple
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from pydantic import BaseModel, EmailStr
 
-from database_adapter import get_user_by_email_db
-from models import User
+from database_adapter import get_user_by_email_db, user_update_listeners
+from models import User, construct_trusted
+from passwords import (  # noqa: F401 (usate dal router utenti)
+    get_password_hash,
+    get_password_hash_async,
+    verify_password,
+    verify_password_async,
+)
+from revoked_tokens import RevokedTokenRegistry, token_id
 
 SECRET_KEY = "your-secret-key"  # Replace with a strong, randomly generated key
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
-REVOKED_TOKENS_FILE = "revoked_tokens.json"
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "14"))
+REFRESH_TOKEN_TYPE = "refresh"
 
 
 # --- Token Revocation ---
+# Revoche per jti in memoria, con file append-only condiviso tra i worker (vedi revoked_tokens.py)
+revoked_tokens = RevokedTokenRegistry()
 
-def load_revoked_tokens():
+def is_token_revoked(token: str, payload: Optional[Dict[str, Any]] = None) -> bool:
+    """payload: claims gia' decodificati del token, se il chiamante li ha (evita una seconda decodifica)."""
+    if payload is None:
+        try:
+            payload = jwt.get_unverified_claims(token)
+        except JWTError:
+            return False
+    return revoked_tokens.is_revoked(token_id(token, payload))
+
+def revoke_token(token: str):
+    auth_cache.invalidate_token(token)
     try:
-        with open(REVOKED_TOKENS_FILE, "r") as f:
-            return set(json.load(f))
-    except (FileNotFoundError, json.JSONDecodeError):
-        return set()
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM], options={"verify_exp": False})
+    except JWTError:
+        return  # Token non valido: viene gia' rifiutato, non c'e' niente da revocare
+    if payload.get("exp"):
+        revoked_tokens.revoke(token_id(token, payload), payload["exp"])
 
-def is_token_revoked(token: str):
-    return token in load_revoked_tokens()
 
-def revoke_token(token: str):
-    revoked_tokens = load_revoked_tokens()
-    revoked_tokens.add(token)
-    with open(REVOKED_TOKENS_FILE, "w") as f:
-        json.dump(list(revoked_tokens), f)
+
+# --- Cache dei token verificati ---
+# jwt.decode e la costruzione del modello User vengono rifatti solo al primo uso di un token:
+# la cache (LRU, chiave = hash del token) conserva claims e User fino alla scadenza del token,
+# ma non oltre AUTH_CACHE_TTL secondi, cosi' le modifiche fatte da altri worker vengono viste.
+# Logout e update_user_db invalidano subito le voci interessate; la revoca viene comunque
+# controllata a ogni richiesta (lookup in memoria), anche sulle voci in cache.
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "1024"))
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "60"))
+
+
+def _token_hash(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+
+class _AuthCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # hash del token -> (scadenza della voce, claims, User)
+        self._entries: "OrderedDict[bytes, Tuple[float, Dict[str, Any], User]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, token: str) -> Optional[Tuple[Dict[str, Any], User]]:
+        key = _token_hash(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.time():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def put(self, token: str, claims: Dict[str, Any], user: User):
+        if self.maxsize <= 0:
+            return
+        expires = min(float(claims.get("exp", 0)), time.time() + self.ttl)
+        key = _token_hash(token)
+        with self._lock:
+            self._entries[key] = (expires, claims, user)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_token(self, token: str):
+        with self._lock:
+            if self._entries.pop(_token_hash(token), None) is not None:
+                self.invalidations += 1
+
+    def invalidate_user(self, user_id: str):
+        with self._lock:
+            keys = [key for key, (_, _, user) in self._entries.items() if user.id == user_id]
+            for key in keys:
+                del self._entries[key]
+            self.invalidations += len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+auth_cache = _AuthCache(AUTH_CACHE_SIZE, AUTH_CACHE_TTL)
+user_update_listeners.append(auth_cache.invalidate_user)
+
+
+def get_auth_cache_stats() -> Dict[str, Any]:
+    """Statistiche della cache dei token verificati (hit rate, dimensione, invalidazioni), in GET /api/health."""
+    return auth_cache.stats()
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="users/token") # Corrected tokenUrl
 oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="users/token", auto_error=False)
 
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+class LogoutRequest(BaseModel):
+    refresh_token: Optional[str] = None  # Revocato insieme all'access token
 
 class TokenData(BaseModel):
     email: Optional[EmailStr] = None
     sub: Optional[str] = None
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
-
-def get_password_hash(password):
-    return pwd_context.hash(password)
-
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -61,19 +165,81 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
+    to_encode.setdefault("jti", uuid.uuid4().hex)  # Chiave del token nel registro delle revoche
     if "sub" not in to_encode and "email" in to_encode:
         to_encode["sub"] = to_encode["email"]
 
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+
+# --- Refresh token ---
+# Un refresh token (type=refresh, valido REFRESH_TOKEN_EXPIRE_DAYS giorni) si scambia con un
+# nuovo access token senza verificare di nuovo la password. Ogni uso lo ruota: il vecchio jti
+# viene revocato e se ne emette uno nuovo della stessa famiglia (`fam`, una per login). Il riuso
+# di un refresh token gia' ruotato revoca l'intera famiglia. Nel registro delle revoche finiscono
+# solo jti/famiglia e scadenza, potati quando scadono.
+
+def create_refresh_token(email: str, family: Optional[str] = None) -> str:
+    expire = datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    to_encode = {
+        "sub": email,
+        "type": REFRESH_TOKEN_TYPE,
+        "fam": family or uuid.uuid4().hex,
+        "jti": uuid.uuid4().hex,
+        "exp": expire,
+    }
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+def _revoke_refresh_family(family: str):
+    # Tutti i token della famiglia emessi fino a ora scadono entro REFRESH_TOKEN_EXPIRE_DAYS
+    expire = datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    revoked_tokens.revoke(family, expire.timestamp())
+
+def rotate_refresh_token(refresh_token: str) -> Optional[Tuple[str, str]]:
+    """
+    Verifica e revoca il refresh token; restituisce (email, nuovo refresh token) o None se non valido.
+    Scrive il registro delle revoche (fsync): dagli endpoint va chiamata con run_in_threadpool.
+    """
+    try:
+        payload = jwt.decode(refresh_token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    family = payload.get("fam")
+    if payload.get("type") != REFRESH_TOKEN_TYPE or not family or not payload.get("sub"):
+        return None
+    if revoked_tokens.is_revoked(family):
+        return None
+    # Controllo e revoca in un passo solo: due rotazioni concorrenti (anche da worker diversi)
+    # dello stesso token non possono riuscire entrambe
+    if not revoked_tokens.revoke_if_active(token_id(refresh_token, payload), payload["exp"], family):
+        if not revoked_tokens.is_revoked(family):
+            _revoke_refresh_family(family)  # Riuso di un token gia' ruotato
+        return None
+    return payload["sub"], create_refresh_token(payload["sub"], family)
+
+def revoke_refresh_token(refresh_token: str):
+    """Logout: revoca la famiglia del refresh token (tutte le sue rotazioni)."""
+    try:
+        payload = jwt.decode(refresh_token, SECRET_KEY, algorithms=[ALGORITHM], options={"verify_exp": False})
+    except JWTError:
+        return
+    if payload.get("type") == REFRESH_TOKEN_TYPE and payload.get("fam"):
+        _revoke_refresh_family(payload["fam"])
+
 async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
-    if is_token_revoked(token):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token has been revoked",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    revoked_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Token has been revoked",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    cached = auth_cache.get(token)
+    if cached is not None:
+        payload, user = cached
+        if is_token_revoked(token, payload):
+            raise revoked_exception
+        return user
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -82,17 +248,21 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: Optional[str] = payload.get("sub")
-        if email is None:
+        if email is None or payload.get("type") == REFRESH_TOKEN_TYPE:
             raise credentials_exception
         token_data = TokenData(email=email, sub=email)
     except JWTError:
         raise credentials_exception
 
-    user_dict = get_user_by_email_db(email=token_data.email)
+    if is_token_revoked(token, payload):
+        raise revoked_exception
+
+    user_dict = await get_user_by_email_db(email=token_data.email)
     if user_dict is None:
         raise credentials_exception
 
-    user = User(**user_dict)
+    user = construct_trusted(User, user_dict)
+    auth_cache.put(token, payload, user)
     return user
 
 
@@ -104,19 +274,26 @@ async def get_current_active_user(current_user: User = Depends(get_current_user)
 async def get_optional_current_active_user(token: Optional[str] = Depends(oauth2_scheme_optional)) -> Optional[User]:
     if not token:
         return None
-    if is_token_revoked(token):
-        return None
+    cached = auth_cache.get(token)
+    if cached is not None:
+        payload, user = cached
+        if is_token_revoked(token, payload) or not user.is_active:
+            return None
+        return user
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        if is_token_revoked(token, payload):
+            return None
         email: Optional[str] = payload.get("sub")
-        if email is None:
+        if email is None or payload.get("type") == REFRESH_TOKEN_TYPE:
             return None
 
-        user_dict = get_user_by_email_db(email=email)
+        user_dict = await get_user_by_email_db(email=email)
         if user_dict is None:
             return None
 
-        user = User(**user_dict)
+        user = construct_trusted(User, user_dict)
+        auth_cache.put(token, payload, user)
         if not user.is_active:
             return None
         return user
@@ -0,0 +1,83 @@
+"""
+Stress test di letture concorrenti su tournaments.json con uno scrittore attivo.
+
+Confronta le letture senza lock (file sostituito atomicamente con os.replace) con le
+letture sotto FileLock esclusivo, per numero crescente di processi lettori.
+
+Uso (dalla directory backend/):
+    python benchmarks/bench_concurrent_reads.py [--tournaments 200] [--seconds 2]
+"""
+import argparse
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from filelock import FileLock  # noqa: E402
+
+
+def _reader(filepath, locked, seconds, counter):
+    from database import _read_json_file
+
+    reads = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        if locked:
+            with FileLock(filepath + ".lock"):
+                data = _read_json_file(filepath)
+        else:
+            data = _read_json_file(filepath)
+        assert isinstance(data, list) and data, "torn read"
+        reads += 1
+    with counter.get_lock():
+        counter.value += reads
+
+
+def _writer(filepath, data, stop):
+    from database import _save_data
+
+    while not stop.is_set():
+        _save_data(filepath, data)
+        time.sleep(0.05)
+
+
+def run(filepath, data, workers, locked, seconds):
+    counter = mp.Value("i", 0)
+    stop = mp.Event()
+    writer = mp.Process(target=_writer, args=(filepath, data, stop))
+    writer.start()
+    readers = [mp.Process(target=_reader, args=(filepath, locked, seconds, counter)) for _ in range(workers)]
+    for p in readers:
+        p.start()
+    for p in readers:
+        p.join()
+    stop.set()
+    writer.join()
+    return counter.value / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tournaments", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix="bench_reads_"))
+    from benchmarks.bench_storage import make_tournament
+    from database import TOURNAMENTS_FILE, _save_data
+
+    data = [make_tournament() for _ in range(args.tournaments)]
+    _save_data(TOURNAMENTS_FILE, data)
+
+    print(f"{'workers':>7} {'lock-free reads/s':>18} {'locked reads/s':>15}")
+    for workers in (1, 2, 4, 8):
+        free = run(TOURNAMENTS_FILE, data, workers, False, args.seconds)
+        locked = run(TOURNAMENTS_FILE, data, workers, True, args.seconds)
+        print(f"{workers:>7} {free:>18.0f} {locked:>15.0f}")
+
+
+if __name__ == "__main__":
+    main()
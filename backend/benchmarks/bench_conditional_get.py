@@ -0,0 +1,64 @@
+"""
+GET condizionali sulle risorse di un torneo: risposta completa (200) contro revalidazione con
+If-None-Match (304), che legge solo la versione del torneo e non lo carica ne' lo serializza.
+
+Uso (dalla directory backend/):
+    python benchmarks/bench_conditional_get.py [--participants 32,64] [--requests 50]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+ENDPOINTS = ("", "/matches", "/standings", "/schedule")
+
+
+async def run(sizes, requests):
+    import httpx
+
+    import main
+    from database_adapter import backend
+    from bench_tournament_load import make_tournament
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for num_participants in sizes:
+            tournament = make_tournament(num_participants)
+            backend.create_tournament(tournament.model_dump(mode='json'))
+            for endpoint in ENDPOINTS:
+                url = f"/api/tournaments/{tournament.id}{endpoint}"
+                first = await client.get(url)
+                assert first.status_code == 200
+                conditional = {"If-None-Match": first.headers["etag"]}
+                assert (await client.get(url, headers=conditional)).status_code == 304
+                timings = []
+                for headers in ({}, conditional):
+                    start = time.perf_counter()
+                    for _ in range(requests):
+                        await client.get(url, headers=headers)
+                    timings.append((time.perf_counter() - start) / requests * 1000)
+                print(f"{num_participants:>12} {'GET ' + (endpoint or '/'):>15} {timings[0]:>10.2f} "
+                      f"{len(first.content) / 1024:>10.0f} {timings[1]:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--participants", default="32,64")
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    os.environ.setdefault("STORAGE_THREADS", "0")
+    os.chdir(tempfile.mkdtemp(prefix="bench_etag_"))
+    print("ms per richiesta (media)")
+    print(f"{'partecipanti':>12} {'endpoint':>15} {'200 ms':>10} {'KB':>10} {'304 ms':>10}")
+    asyncio.run(run([int(s) for s in args.participants.split(",")], args.requests))
+
+
+if __name__ == "__main__":
+    main()
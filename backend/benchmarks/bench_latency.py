@@ -0,0 +1,94 @@
+"""
+Latenza p50/p99 sotto carico misto lettura/scrittura, con lo storage eseguito
+nell'event loop (STORAGE_THREADS=0) oppure nel pool di thread (default).
+
+Uso (dalla directory backend/):
+    python benchmarks/bench_latency.py [--clients 32] [--seconds 5] [--write-ratio 0.2]
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] * 1000 if values else float("nan")
+
+
+async def run_load(clients, seconds, write_ratio):
+    import httpx
+
+    import main
+    from auth import create_access_token
+    from benchmarks.bench_storage import make_tournament
+    from database_adapter import backend
+
+    tournament = make_tournament()
+    owner = {"id": tournament["user_id"], "email": "owner@example.com", "name": "Owner", "is_active": True}
+    backend.create_user(owner)
+    backend.create_tournament(tournament)
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": owner["email"]})}
+    tid = tournament["id"]
+    match_ids = [m["id"] for m in tournament["matches"]]
+
+    latencies = {"read": [], "write": []}
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        deadline = time.perf_counter() + seconds
+
+        async def worker():
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                if random.random() < write_ratio:
+                    kind = "write"
+                    r = await client.post(
+                        f"/api/tournaments/{tid}/matches/{random.choice(match_ids)}/result",
+                        json={"set1_score_participant1": 6, "set1_score_participant2": random.randint(0, 4)},
+                        headers=headers,
+                    )
+                else:
+                    kind = "read"
+                    r = await client.get(f"/api/tournaments/{tid}")
+                assert r.status_code == 200, r.text
+                latencies[kind].append(time.perf_counter() - start)
+
+        await asyncio.gather(*(worker() for _ in range(clients)))
+    return latencies
+
+
+def child(args):
+    os.chdir(tempfile.mkdtemp(prefix="bench_latency_"))
+    latencies = asyncio.run(run_load(args.clients, args.seconds, args.write_ratio))
+    for kind in ("read", "write"):
+        values = latencies[kind]
+        print(f"{os.environ.get('STORAGE_THREADS', '8'):>7} {kind:>6} {len(values):>6} "
+              f"{percentile(values, 0.5):>8.2f} {percentile(values, 0.99):>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--child", action="store_true")
+    args = parser.parse_args()
+    if args.child:
+        child(args)
+        return
+
+    print(f"{'threads':>7} {'kind':>6} {'reqs':>6} {'p50 ms':>8} {'p99 ms':>8}")
+    for threads in ("0", "8"):
+        env = dict(os.environ, STORAGE_THREADS=threads)
+        subprocess.run([sys.executable, os.path.abspath(__file__), "--child"] + sys.argv[1:], env=env, check=True)
+
+
+if __name__ == "__main__":
+    main()
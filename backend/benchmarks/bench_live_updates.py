@@ -0,0 +1,94 @@
+"""
+Byte per modifica ricevuti da chi segue un torneo: il delta SSE di GET /events contro la
+rilettura completa (torneo + partecipanti + match) che TournamentDetail faceva dopo ogni
+azione e che gli spettatori ripetevano in polling. Misura anche il costo del fan-out di un
+evento verso molti client collegati (serializzazione unica, una put per coda).
+
+Uso (dalla directory backend/):
+    python benchmarks/bench_live_updates.py [--participants 64] [--results 20] [--spectators 1000]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+REFETCH = ("", "/participants/", "/matches")
+
+
+async def run(num_participants, num_results, num_spectators):
+    import httpx
+
+    import live_updates
+    import main
+    from auth import create_access_token
+    from bench_tournament_load import make_tournament
+    from database_adapter import backend
+
+    tournament = make_tournament(num_participants)
+    owner = {"id": tournament.user_id, "email": "owner@example.com", "name": "Owner", "is_active": True}
+    backend.create_user(owner)
+    backend.create_tournament(tournament.model_dump(mode='json'))
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": owner["email"]})}
+    pending = [m.id for m in tournament.matches if m.status != "completed"][:num_results]
+    spectators = [live_updates.broker.subscribe(tournament.id) for _ in range(num_spectators)]
+
+    delta_bytes, refetch_bytes = [], {"identity": [], "gzip": []}
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for match_id in pending:
+            response = await client.post(
+                f"/api/tournaments/{tournament.id}/matches/{match_id}/result",
+                json={"set1_score_participant1": 6, "set1_score_participant2": 4},
+                headers=headers,
+            )
+            assert response.status_code == 200, response.text
+            for spectator in spectators:
+                _, frame = await spectator.get()
+            delta_bytes.append(len(frame.encode()))
+            for encoding, sizes in refetch_bytes.items():
+                total = 0
+                for endpoint in REFETCH:
+                    r = await client.get(f"/api/tournaments/{tournament.id}{endpoint}", headers={"Accept-Encoding": encoding})
+                    total += int(r.headers["content-length"])
+                sizes.append(total)
+
+    # Fan-out di un solo evento a tutti gli spettatori
+    event = {"type": "result_recorded", "tournament_id": tournament.id, "version": 10 ** 6,
+             "matches": [tournament.matches[0].model_dump(mode='json')], "changes": {"status": "group_stage"}}
+    start = time.perf_counter()
+    live_updates.broker.publish(event)
+    fanout_ms = (time.perf_counter() - start) * 1000
+    for spectator in spectators:
+        live_updates.broker.unsubscribe(spectator)
+
+    def average(values):
+        return sum(values) / len(values) / 1024
+
+    print(f"{num_participants} partecipanti, {len(tournament.matches)} match, {len(pending)} risultati registrati")
+    print(f"{'per modifica':>28} {'KB':>10}")
+    print(f"{'delta SSE':>28} {average(delta_bytes):>10.2f}")
+    for encoding, sizes in refetch_bytes.items():
+        print(f"{'rilettura completa ' + encoding:>28} {average(sizes):>10.1f}")
+    print(f"\nfan-out di un evento a {num_spectators} client: {fanout_ms:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--participants", type=int, default=64)
+    parser.add_argument("--results", type=int, default=20)
+    parser.add_argument("--spectators", type=int, default=1000)
+    args = parser.parse_args()
+
+    os.environ.setdefault("STORAGE_THREADS", "0")
+    os.chdir(tempfile.mkdtemp(prefix="bench_live_"))
+    asyncio.run(run(args.participants, args.results, args.spectators))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Throughput dei login (/api/users/token) e reattivita' dell'API durante un'ondata di login,
+con bcrypt eseguito nell'event loop (PASSWORD_HASH_WORKERS=0) oppure nel pool di processi.
+
+Mentre i client fanno login, una sonda chiama GET / ogni 10 ms: la sua latenza (dall'istante
+previsto di partenza) misura quanto l'event loop resta bloccato dagli hash.
+
+Uso (dalla directory backend/):
+    python benchmarks/bench_login.py [--logins 32] [--concurrency 16] [--rounds 12] [--workers 4]
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] * 1000 if values else float("nan")
+
+
+async def run_logins(logins, concurrency):
+    import httpx
+
+    import main
+    from database_adapter import backend
+    from passwords import get_password_executor_stats, get_password_hash
+
+    hashed_password = get_password_hash("password123")
+    emails = [f"user{i}@example.com" for i in range(concurrency)]
+    for email in emails:
+        backend.create_user({"id": email, "email": email, "name": email, "hashed_password": hashed_password, "is_active": True})
+
+    probe_latencies = []
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        remaining = logins
+        done = asyncio.Event()
+
+        async def login(email):
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                r = await client.post("/api/users/token", data={"username": email, "password": "password123"})
+                assert r.status_code == 200, r.text
+
+        async def probe():
+            # La latenza parte dall'istante in cui la sonda doveva partire: include il tempo
+            # in cui l'event loop era bloccato e non poteva riprenderla
+            while not done.is_set():
+                scheduled = time.perf_counter() + 0.01
+                await asyncio.sleep(0.01)
+                await client.get("/")
+                probe_latencies.append(time.perf_counter() - scheduled)
+
+        # Il primo login avvia i processi del pool: fuori dalla misura
+        await client.post("/api/users/token", data={"username": emails[0], "password": "password123"})
+        probe_task = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(login(email) for email in emails))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probe_task
+    return logins / elapsed, probe_latencies, get_password_executor_stats()
+
+
+def child(args):
+    os.chdir(tempfile.mkdtemp(prefix="bench_login_"))
+    throughput, probe, stats = asyncio.run(run_logins(args.logins, args.concurrency))
+    print(f"{stats['workers']:>7} {throughput:>9.1f} {percentile(probe, 0.5):>11.1f} {percentile(probe, 0.99):>11.1f} "
+          f"{stats['peak_queue_depth']:>10} {stats['avg_queue_wait_ms']:>13.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--child", action="store_true")
+    args = parser.parse_args()
+    if args.child:
+        child(args)
+        return
+
+    print(f"bcrypt rounds={args.rounds}, {args.logins} login, {args.concurrency} client, {os.cpu_count()} CPU")
+    print(f"{'workers':>7} {'login/s':>9} {'probe p50':>11} {'probe p99':>11} {'peak queue':>10} {'avg wait ms':>13}")
+    for workers in (0, args.workers):
+        env = dict(os.environ, PASSWORD_HASH_WORKERS=str(workers), BCRYPT_ROUNDS=str(args.rounds))
+        subprocess.run([sys.executable, os.path.abspath(__file__), "--child"] + sys.argv[1:], env=env, check=True)
+
+
+if __name__ == "__main__":
+    main()
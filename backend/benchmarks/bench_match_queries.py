@@ -0,0 +1,72 @@
+"""
+Query filtrate sui match di un girone grande: l'intero calendario contro "le partite di una
+giornata" e "le mie partite" servite dagli indici per torneo (services/match_index.py).
+Riporta anche il costo della costruzione degli indici, pagato una volta per versione.
+
+Uso (dalla directory backend/):
+    python benchmarks/bench_match_queries.py [--participants 64,200] [--requests 20]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+async def run(sizes, requests):
+    import httpx
+
+    import main
+    from bench_tournament_load import make_tournament
+    from database_adapter import backend
+    from services.match_index import MatchIndex
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for num_participants in sizes:
+            tournament = make_tournament(num_participants)
+            backend.create_tournament(tournament.model_dump(mode='json'))
+            tournament_dict = backend.get_tournament(tournament.id)
+            start = time.perf_counter()
+            MatchIndex(tournament_dict)
+            build_ms = (time.perf_counter() - start) * 1000
+            print(f"\n{num_participants} partecipanti, {len(tournament.matches)} match; "
+                  f"costruzione degli indici {build_ms:.1f} ms")
+
+            me = tournament.participants[0].id
+            queries = {
+                "calendario completo": ("/schedule", {}),
+                "giornata 5": ("/matches", {"matchday": 5}),
+                "le mie partite": ("/matches", {"participant_id": me}),
+                "le mie da giocare, 10": ("/matches", {"participant_id": me, "status": "pending", "limit": 10}),
+            }
+            for name, (endpoint, params) in queries.items():
+                url = f"/api/tournaments/{tournament.id}{endpoint}"
+                response = await client.get(url, params=params, headers={"Accept-Encoding": "identity"})
+                assert response.status_code == 200, response.text
+                start = time.perf_counter()
+                for _ in range(requests):
+                    await client.get(url, params=params, headers={"Accept-Encoding": "identity"})
+                ms = (time.perf_counter() - start) / requests * 1000
+                print(f"{name:>24} {ms:>10.2f} {len(response.content) / 1024:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--participants", default="64,200")
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+
+    os.environ.setdefault("STORAGE_THREADS", "0")
+    os.chdir(tempfile.mkdtemp(prefix="bench_match_queries_"))
+    print(f"{'query':>24} {'ms':>10} {'KB':>10}")
+    asyncio.run(run([int(s) for s in args.participants.split(",")], args.requests))
+
+
+if __name__ == "__main__":
+    main()
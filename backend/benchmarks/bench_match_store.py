@@ -0,0 +1,96 @@
+"""
+Memoria e tempi dei match di un girone all'italiana: lista di dict (come letta dallo storage),
+lista di Match pydantic e MatchStore a colonne (services/match_store.py).
+
+La memoria e' il picco di tracemalloc: per i dict la lettura del JSON, per Match e MatchStore
+la costruzione a partire dai dict, esclusi i dict stessi. I tempi coprono la costruzione e le
+operazioni dei servizi: conteggio dell'avanzamento e calcolo completo della classifica.
+
+Uso (dalla directory backend/):
+    python benchmarks/bench_match_store.py [--players 100,200]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Match, Participant, construct_trusted  # noqa: E402
+from services import standings_engine  # noqa: E402
+from services.match_store import MatchStore  # noqa: E402
+from services.schedule_service import round_robin_pairings  # noqa: E402
+
+
+def make_match_json(participants):
+    matches = []
+    for i, pairing in enumerate(round_robin_pairings([p.id for p in participants])):
+        match = Match(phase='group', **pairing._asdict())
+        if i % 2 == 0:
+            match.score_participant1, match.score_participant2 = 12, 7
+            match.set1_score_participant1, match.set1_score_participant2 = 6, 4
+            match.set2_score_participant1, match.set2_score_participant2 = 6, 3
+            match.winner_id, match.status = match.participant1_id, "completed"
+        matches.append(match.model_dump(mode='json'))
+    return json.dumps(matches)
+
+
+def peak_mb(build):
+    tracemalloc.start()
+    result = build()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+    return peak / 1024 / 1024
+
+
+def timed_ms(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--players", default="100,200")
+    args = parser.parse_args()
+
+    print(f"{'giocatori':>9} {'match':>6} {'dict MB':>8} {'Match MB':>9} {'store MB':>9} "
+          f"{'Match ms':>9} {'store ms':>9} {'progress Match':>15} {'progress store':>15} "
+          f"{'classifica Match':>17} {'classifica store':>17}")
+    for num_players in (int(p) for p in args.players.split(",")):
+        participants = [Participant(name=f"p{i}", email=f"p{i}@example.com") for i in range(num_players)]
+        ids = [p.id for p in participants]
+        # I dict come dopo la lettura da disco
+        text = make_match_json(participants)
+        dicts_mb = peak_mb(lambda: json.loads(text))
+        dicts = json.loads(text)
+        matches_mb = peak_mb(lambda: [construct_trusted(Match, m) for m in dicts])
+        store_mb = peak_mb(lambda: MatchStore.from_dicts(dicts))
+
+        build_matches = timed_ms(lambda: [construct_trusted(Match, m) for m in dicts])
+        build_store = timed_ms(lambda: MatchStore.from_dicts(dicts))
+        matches = [construct_trusted(Match, m) for m in dicts]
+        store = MatchStore.from_dicts(dicts)
+        progress_matches = timed_ms(lambda: sum(1 for m in matches if m.phase == 'group' and m.status == 'completed'))
+        progress_store = timed_ms(lambda: store.count(phase='group', status='completed'))
+
+        def standings(source):
+            arrays = standings_engine.encode_matches(ids, source)
+            return standings_engine.rank(standings_engine.compute_table(arrays, len(ids)), len(ids), ["wins", "score_diff"])
+
+        standings_matches = timed_ms(lambda: standings(matches))
+        standings_store = timed_ms(lambda: standings(store))
+        print(f"{num_players:>9} {len(dicts):>6} {dicts_mb:>8.1f} {matches_mb:>9.1f} {store_mb:>9.2f} "
+              f"{build_matches:>9.1f} {build_store:>9.1f} {progress_matches:>15.2f} {progress_store:>15.2f} "
+              f"{standings_matches:>17.2f} {standings_store:>17.2f}")
+    print(f"(classifica con NumPy: {'si' if standings_engine.HAVE_NUMPY else 'no, Python puro'})")
+
+
+if __name__ == "__main__":
+    main()
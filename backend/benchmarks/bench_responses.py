@@ -0,0 +1,105 @@
+"""
+Byte trasmessi e CPU per endpoint con le varie codifiche (identity, gzip, br), e confronto dei
+serializzatori JSON sul contenuto degli endpoint senza response_model (calendario e classifica).
+
+La CPU e' process_time per richiesta: comprende caricamento, serializzazione e compressione.
+br compare solo se il pacchetto brotli e' installato.
+
+Uso (dalla directory backend/):
+    python benchmarks/bench_responses.py [--participants 64] [--requests 20]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+ENDPOINTS = ("", "/matches", "/schedule", "/standings", "/results")
+
+
+def cpu_ms(fn, repeat):
+    start = time.process_time()
+    for _ in range(repeat):
+        fn()
+    return (time.process_time() - start) / repeat * 1000
+
+
+async def endpoints(tournament_id, encodings, requests):
+    import httpx
+
+    import main
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for endpoint in ENDPOINTS:
+            url = f"/api/tournaments/{tournament_id}{endpoint}"
+            row = []
+            for encoding in encodings:
+                headers = {"Accept-Encoding": encoding}
+                response = await client.get(url, headers=headers)
+                assert response.status_code == 200, response.text
+                assert response.headers.get("content-encoding", "identity") == encoding
+                start = time.process_time()
+                for _ in range(requests):
+                    await client.get(url, headers=headers)
+                row += [int(response.headers["content-length"]) / 1024, (time.process_time() - start) / requests * 1000]
+            print(f"{'GET ' + (endpoint or '/'):>15} " + " ".join(f"{kb:>9.1f} {ms:>7.2f}" for kb, ms in zip(row[::2], row[1::2])))
+
+
+def serializers(tournament, requests):
+    from fastapi.encoders import jsonable_encoder
+
+    from responses import FastJSONResponse
+    from services.standings_service import _calculate_standings
+
+    try:
+        import orjson
+    except ImportError:
+        orjson = None
+
+    contents = {
+        "schedule": {"tournament_id": tournament.id, "name": tournament.name, "matches": tournament.matches},
+        "standings": {"standings": _calculate_standings(tournament)},
+    }
+    print("\nserializzazione (ms CPU)")
+    print(f"{'contenuto':>10} {'jsonable_encoder':>17} {'FastJSONResponse':>17} {'orjson':>10}")
+    for name, content in contents.items():
+        legacy = cpu_ms(lambda: json.dumps(jsonable_encoder(content)).encode(), max(1, requests // 10))
+        fast = cpu_ms(lambda: FastJSONResponse(content), requests)
+        # orjson non conosce i modelli pydantic: li converte uno alla volta tramite `default`
+        alternative = (
+            f"{cpu_ms(lambda: orjson.dumps(content, default=lambda m: m.model_dump(mode='json')), requests):>10.2f}"
+            if orjson else f"{'-':>10}"
+        )
+        print(f"{name:>10} {legacy:>17.2f} {fast:>17.2f} {alternative}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--participants", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+
+    os.environ.setdefault("STORAGE_THREADS", "0")
+    os.chdir(tempfile.mkdtemp(prefix="bench_responses_"))
+    from bench_tournament_load import make_tournament
+    from compression import HAVE_BROTLI
+    from database_adapter import backend
+
+    tournament = make_tournament(args.participants)
+    backend.create_tournament(tournament.model_dump(mode='json'))
+    encodings = ["identity", "gzip"] + (["br"] if HAVE_BROTLI else [])
+    print(f"{args.participants} partecipanti, {len(tournament.matches)} match: KB trasmessi e ms CPU per richiesta")
+    print(f"{'endpoint':>15} " + " ".join(f"{e + ' KB':>9} {'ms':>7}" for e in encodings))
+    asyncio.run(endpoints(tournament.id, encodings, args.requests))
+    serializers(tournament, args.requests)
+
+
+if __name__ == "__main__":
+    main()
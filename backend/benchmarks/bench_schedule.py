@@ -0,0 +1,99 @@
+"""
+Generazione del calendario all'italiana: ciclo precedente del router (rotazione della lista a
+ogni giornata con [p[0]] + [p[-1]] + p[1:-1], lista completa in memoria) contro il generatore
+di services/schedule_service.py, che tiene in memoria una giornata alla volta.
+
+Per ogni dimensione: tempo per produrre tutti gli accoppiamenti e picco di memoria
+(tracemalloc) consumandoli uno alla volta. Con --matches si misura anche la costruzione dei
+match per un girone piu' piccolo: Match(...) validato, Match.model_construct e i dict costruiti
+dalla route di generazione (_group_match_dicts).
+
+Uso (dalla directory backend/):
+    python benchmarks/bench_schedule.py [--sizes 500,2000] [--matches 300]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Match  # noqa: E402
+from services.schedule_service import round_robin_pairings  # noqa: E402
+
+
+def legacy_pairings(entrant_ids):
+    """Ciclo precedente del router, con tuple al posto dei Match."""
+    participants = list(entrant_ids)
+    num_participants = len(participants)
+    if num_participants % 2 == 1:
+        participants.append(None)
+        num_participants += 1
+    pairings = []
+    match_num = 1
+    for matchday in range(num_participants - 1):
+        for i in range(num_participants // 2):
+            p1 = participants[i]
+            p2 = participants[num_participants - 1 - i]
+            if p1 is not None and p2 is not None:
+                pairings.append((matchday + 1, match_num, p1, p2))
+                match_num += 1
+        participants = [participants[0]] + [participants[-1]] + participants[1:-1]
+    return pairings
+
+
+def measure(fn):
+    """Tempo e picco di memoria in due esecuzioni separate: tracemalloc rallenta le allocazioni."""
+    start = time.perf_counter()
+    count = 0
+    for _ in fn():
+        count += 1
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    for _ in fn():
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return count, elapsed * 1000, peak / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="500,2000")
+    parser.add_argument("--matches", type=int, default=300, help="partecipanti per il confronto sui Match (0 = salta)")
+    args = parser.parse_args()
+
+    print(f"{'partecipanti':>12} {'match':>9} {'precedente ms':>14} {'MB':>8} {'generatore ms':>14} {'MB':>6}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        ids = [f"participant-{i}" for i in range(size)]
+        count, legacy_ms, legacy_mb = measure(lambda: legacy_pairings(ids))
+        _, new_ms, new_mb = measure(lambda: round_robin_pairings(ids))
+        print(f"{size:>12} {count:>9} {legacy_ms:>14.1f} {legacy_mb:>8.1f} {new_ms:>14.1f} {new_mb:>6.2f}")
+
+    if args.matches:
+        # Il router apre lo storage all'import: i file finiscono in una directory temporanea
+        os.chdir(tempfile.mkdtemp(prefix="bench_schedule_"))
+        from routers.tournaments import _group_match_dicts
+
+        ids = [f"participant-{i}" for i in range(args.matches)]
+        pairings = list(round_robin_pairings(ids))
+        start = time.perf_counter()
+        for p in pairings:
+            Match(participant1_id=p.participant1_id, participant2_id=p.participant2_id,
+                  match_number=p.match_number, match_day=p.match_day, phase='group')
+        validated = time.perf_counter() - start
+        start = time.perf_counter()
+        for p in pairings:
+            Match.model_construct(phase='group', **p._asdict())
+        constructed = time.perf_counter() - start
+        start = time.perf_counter()
+        _group_match_dicts(pairings)
+        dicts = time.perf_counter() - start
+        print(f"\n{len(pairings)} Match ({args.matches} partecipanti): Match(...) {validated * 1000:.1f} ms, "
+              f"model_construct {constructed * 1000:.1f} ms, dict {dicts * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Calcolo completo della classifica di un girone per leghe grandi: ciclo per match sui dict
+(implementazione precedente di _calculate_standings) contro il motore di
+services/standings_engine.py, in Python puro e con NumPy, con la catena di spareggi completa
+(vittorie, scontri diretti, quoziente set, differenza punti).
+
+"encode" e' la conversione dei Match in array; "tabella+rank" riusa gli array gia' codificati.
+
+Uso (dalla directory backend/):
+    python benchmarks/bench_standings.py [--sizes 200:20000,2000:200000] [--repeat 3]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Match, Participant  # noqa: E402
+from services import standings_engine  # noqa: E402
+
+TIEBREAKERS = ["wins", "head_to_head", "set_ratio", "score_diff"]
+
+
+def legacy_calculate_standings(participants, matches):
+    """Implementazione precedente: un aggiornamento di dict per match, ordinamento per (vittorie, differenza)."""
+    standings = {p.id: {"participant": p, "played": 0, "wins": 0, "losses": 0, "score_for": 0, "score_against": 0}
+                 for p in participants}
+    for match in matches:
+        if match.phase == 'group' and match.status == 'completed':
+            p1_id, p2_id = match.participant1_id, match.participant2_id
+            if p1_id in standings:
+                standings[p1_id]["played"] += 1
+                standings[p1_id]["score_for"] += match.score_participant1 or 0
+                standings[p1_id]["score_against"] += match.score_participant2 or 0
+            if p2_id in standings:
+                standings[p2_id]["played"] += 1
+                standings[p2_id]["score_for"] += match.score_participant2 or 0
+                standings[p2_id]["score_against"] += match.score_participant1 or 0
+            if match.winner_id:
+                if match.winner_id in standings:
+                    standings[match.winner_id]["wins"] += 1
+                loser_id = p2_id if match.winner_id == p1_id else p1_id
+                if loser_id in standings:
+                    standings[loser_id]["losses"] += 1
+    return sorted(standings.values(), key=lambda x: (x["wins"], x["score_for"] - x["score_against"]), reverse=True)
+
+
+def make_league(num_participants, num_matches):
+    participants = [Participant(name=f"p{i}", email=f"p{i}@example.com") for i in range(num_participants)]
+    matches = []
+    for _ in range(num_matches):
+        p1, p2 = random.sample(participants, 2)
+        sets = [(random.randint(0, 7), random.randint(0, 7)) for _ in range(random.choice((2, 3)))]
+        score1, score2 = sum(s[0] for s in sets), sum(s[1] for s in sets)
+        winner = p1.id if score1 > score2 else p2.id if score2 > score1 else None
+        fields = {}
+        for i, (s1, s2) in enumerate(sets, 1):
+            fields[f"set{i}_score_participant1"], fields[f"set{i}_score_participant2"] = s1, s2
+        matches.append(Match(
+            participant1_id=p1.id, participant2_id=p2.id, score_participant1=score1, score_participant2=score2,
+            winner_id=winner, status="completed" if winner else "in_progress", **fields,
+        ))
+    return participants, matches
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def engine(ids, matches, vectorized):
+    arrays = standings_engine.encode_matches(ids, matches, vectorized)
+    return standings_engine.rank(standings_engine.compute_table(arrays, len(ids)), len(ids), TIEBREAKERS, arrays)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="200:20000,2000:200000", help="partecipanti:match, separati da virgola")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    random.seed(42)
+    print(f"NumPy: {'si' if standings_engine.HAVE_NUMPY else 'non installato'}; spareggi: {', '.join(TIEBREAKERS)}")
+    print(f"{'partecipanti':>12} {'match':>8} {'precedente ms':>14} {'python ms':>10} {'numpy ms':>9} "
+          f"{'encode ms':>10} {'tabella+rank ms':>16}")
+    for size in args.sizes.split(","):
+        num_participants, num_matches = (int(x) for x in size.split(":"))
+        participants, matches = make_league(num_participants, num_matches)
+        ids = [p.id for p in participants]
+        legacy = timed(lambda: legacy_calculate_standings(participants, matches), args.repeat)
+        python = timed(lambda: engine(ids, matches, False), args.repeat)
+        row = f"{num_participants:>12} {num_matches:>8} {legacy:>14.1f} {python:>10.1f}"
+        if standings_engine.HAVE_NUMPY:
+            numpy_total = timed(lambda: engine(ids, matches, True), args.repeat)
+            encode = timed(lambda: standings_engine.encode_matches(ids, matches, True), args.repeat)
+            arrays = standings_engine.encode_matches(ids, matches, True)
+            batch = timed(
+                lambda: standings_engine.rank(
+                    standings_engine.compute_table(arrays, len(ids)), len(ids), TIEBREAKERS, arrays
+                ),
+                args.repeat,
+            )
+            row += f" {numpy_total:>9.1f} {encode:>10.1f} {batch:>16.2f}"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Confronto tra lo store JSON (journal + cache) e il backend SQLite a 10/100/1000 tornei.
+
+Uso (dalla directory backend/):
+    python benchmarks/bench_storage.py [--ops 200]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PARTICIPANTS_PER_TOURNAMENT = 8
+
+
+def make_tournament():
+    participants = [
+        {"id": str(uuid.uuid4()), "name": f"Player {i}", "email": f"p{i}@example.com", "ranking": None}
+        for i in range(PARTICIPANTS_PER_TOURNAMENT)
+    ]
+    matches = []
+    for i, p1 in enumerate(participants):
+        for p2 in participants[i + 1:]:
+            matches.append({
+                "id": str(uuid.uuid4()), "round_number": None, "match_number": len(matches) + 1,
+                "match_day": len(matches) % 7 + 1, "phase": "group", "scheduled_date": None,
+                "participant1_id": p1["id"], "participant2_id": p2["id"], "winner_id": None,
+                "score_participant1": None, "score_participant2": None,
+                "set1_score_participant1": None, "set1_score_participant2": None,
+                "set2_score_participant1": None, "set2_score_participant2": None,
+                "set3_score_participant1": None, "set3_score_participant2": None,
+                "is_bye": False, "status": "pending",
+            })
+    return {
+        "id": str(uuid.uuid4()), "user_id": "bench", "name": "Bench", "tournament_type": "single",
+        "format": "round_robin", "end_date": None, "due_date": None, "participants": participants,
+        "teams": [], "matches": matches, "registration_open": False, "status": "group_stage",
+        "invitation_link": None, "playoff_participants": 4, "total_matchdays": 7,
+    }
+
+
+def timed(fn, ops):
+    start = time.perf_counter()
+    for _ in range(ops):
+        fn()
+    return (time.perf_counter() - start) / ops * 1000
+
+
+def bench(backend, n, ops):
+    from tournament_events import result_recorded
+
+    tournaments = [make_tournament() for _ in range(n)]
+    for t in tournaments:
+        backend.create_tournament(t)
+
+    def read():
+        backend.get_tournament(random.choice(tournaments)["id"])
+
+    def record():
+        t = random.choice(tournaments)
+        m = dict(random.choice(t["matches"]), status="completed", winner_id=t["participants"][0]["id"])
+        backend.record_event(result_recorded(t["id"], [m], {"status": "group_stage"}))
+
+    def list_all():
+        backend.get_all_tournaments()
+
+    return timed(read, ops), timed(record, ops), timed(list_all, max(1, ops // 10))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ops", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'backend':<8} {'tournaments':>11} {'get ms':>9} {'result ms':>10} {'list ms':>9}")
+    for n in (10, 100, 1000):
+        for name in ("json", "sqlite"):
+            workdir = tempfile.mkdtemp(prefix="bench_storage_")
+            os.chdir(workdir)
+            if name == "json":
+                from database_adapter import JsonBackend
+
+                backend = JsonBackend(layout="monolithic")
+            else:
+                from db_sqlite import SqliteBackend
+
+                backend = SqliteBackend(os.path.join(workdir, "bench.db"))
+            get_ms, record_ms, list_ms = bench(backend, n, args.ops)
+            print(f"{name:<8} {n:>11} {get_ms:>9.3f} {record_ms:>10.3f} {list_ms:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
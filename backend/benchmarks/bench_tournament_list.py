@@ -0,0 +1,109 @@
+"""
+Elenco dei tornei: il vecchio GET /api/tournaments/ (tutti i tornei completi, match compresi,
+serializzati come List[Tournament]) contro la prima pagina dei riepiloghi servita dall'indice
+dello storage (list_tournament_summaries).
+
+Ogni backend gira in un processo separato, perche' DATABASE_URL viene letta all'import.
+
+Uso (dalla directory backend/):
+    python benchmarks/bench_tournament_list.py [--tournaments 50,200] [--participants 16] [--requests 20]
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+BACKENDS = {"json": "", "sqlite": "sqlite:///bench.db"}
+
+
+def make_tournament(index, num_participants):
+    from models import Match, Participant, Tournament
+    from services.schedule_service import round_robin_pairings
+
+    participants = [Participant(name=f"p{i}", email=f"p{i}@example.com") for i in range(num_participants)]
+    matches = [Match(phase='group', **p._asdict()) for p in round_robin_pairings([p.id for p in participants])]
+    for match in matches[: len(matches) // 2]:
+        match.score_participant1, match.score_participant2 = 6, 3
+        match.winner_id, match.status = match.participant1_id, "completed"
+    return Tournament(
+        user_id="bench", name=f"bench {index}", tournament_type="single", status="group_stage",
+        participants=participants, matches=matches,
+    )
+
+
+async def run(sizes, num_participants, requests):
+    import httpx
+    from pydantic import TypeAdapter
+    from typing import List
+
+    import main
+    from database_adapter import backend, get_all_tournaments_db
+    from models import Tournament, construct_trusted
+
+    legacy_adapter = TypeAdapter(List[Tournament])
+
+    async def legacy_listing():
+        tournaments = [construct_trusted(Tournament, t) for t in await get_all_tournaments_db()]
+        return legacy_adapter.dump_json(tournaments)
+
+    results = []
+    created = 0
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for num_tournaments in sizes:
+            for i in range(created, num_tournaments):
+                backend.create_tournament(make_tournament(i, num_participants).model_dump(mode='json'))
+            created = num_tournaments
+
+            legacy_bytes = len(await legacy_listing())
+            start = time.perf_counter()
+            for _ in range(requests):
+                await legacy_listing()
+            legacy_ms = (time.perf_counter() - start) / requests * 1000
+
+            response = await client.get("/api/tournaments/")
+            assert response.status_code == 200
+            start = time.perf_counter()
+            for _ in range(requests):
+                await client.get("/api/tournaments/")
+            page_ms = (time.perf_counter() - start) / requests * 1000
+            results.append((num_tournaments, legacy_ms, legacy_bytes / 1024, page_ms, len(response.content) / 1024))
+    return results
+
+
+def child(args):
+    os.chdir(tempfile.mkdtemp(prefix="bench_list_"))
+    from database_adapter import DATABASE_URL
+
+    sizes = [int(s) for s in args.tournaments.split(",")]
+    name = "sqlite" if DATABASE_URL else "json"
+    for num_tournaments, legacy_ms, legacy_kb, page_ms, page_kb in asyncio.run(run(sizes, args.participants, args.requests)):
+        print(f"{name:>7} {num_tournaments:>7} {legacy_ms:>14.1f} {legacy_kb:>10.0f} {page_ms:>14.2f} {page_kb:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tournaments", default="50,200")
+    parser.add_argument("--participants", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--child", action="store_true")
+    args = parser.parse_args()
+    if args.child:
+        child(args)
+        return
+
+    print(f"ms per richiesta (media), {args.participants} partecipanti per torneo; pagina = 50 riepiloghi")
+    print(f"{'backend':>7} {'tornei':>7} {'elenco completo':>14} {'KB':>10} {'pagina ms':>14} {'KB':>10}")
+    for database_url in BACKENDS.values():
+        env = dict(os.environ, DATABASE_URL=database_url, STORAGE_THREADS="0")
+        subprocess.run([sys.executable, os.path.abspath(__file__), "--child"] + sys.argv[1:], env=env, check=True)
+
+
+if __name__ == "__main__":
+    main()
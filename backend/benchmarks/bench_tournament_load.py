@@ -0,0 +1,93 @@
+"""
+Latenza delle GET su tornei con 500+ match, caricando i tornei dallo storage con la
+validazione completa (TRUSTED_STORAGE_LOADS=0) o con construct_trusted (default).
+
+Ogni modalita' gira in un processo separato, perche' il flag viene letto all'import di models.
+
+Uso (dalla directory backend/):
+    python benchmarks/bench_tournament_load.py [--participants 32,64] [--requests 50]
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+ENDPOINTS = ("", "/standings", "/progress")
+
+
+def make_tournament(num_participants):
+    from models import Match, Participant, Tournament
+    from services.schedule_service import round_robin_pairings
+
+    participants = [Participant(name=f"p{i}", email=f"p{i}@example.com") for i in range(num_participants)]
+    matches = [Match(phase='group', **p._asdict()) for p in round_robin_pairings([p.id for p in participants])]
+    # Meta' del girone giocata
+    for match in matches[: len(matches) // 2]:
+        match.score_participant1, match.score_participant2 = 6, 3
+        match.set1_score_participant1, match.set1_score_participant2 = 6, 3
+        match.winner_id, match.status = match.participant1_id, "completed"
+    return Tournament(
+        user_id="bench", name=f"bench {num_participants}", tournament_type="single", status="group_stage",
+        participants=participants, matches=matches,
+    )
+
+
+async def run(sizes, requests):
+    import httpx
+
+    import main
+    from database_adapter import backend
+
+    results = []
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for num_participants in sizes:
+            tournament = make_tournament(num_participants)
+            backend.create_tournament(tournament.model_dump(mode='json'))
+            row = [num_participants, len(tournament.matches)]
+            for endpoint in ENDPOINTS:
+                url = f"/api/tournaments/{tournament.id}{endpoint}"
+                assert (await client.get(url)).status_code == 200
+                start = time.perf_counter()
+                for _ in range(requests):
+                    await client.get(url)
+                row.append((time.perf_counter() - start) / requests * 1000)
+            results.append(row)
+    return results
+
+
+def child(args):
+    os.chdir(tempfile.mkdtemp(prefix="bench_load_"))
+    from models import TRUSTED_STORAGE_LOADS
+
+    sizes = [int(s) for s in args.participants.split(",")]
+    mode = "trusted" if TRUSTED_STORAGE_LOADS else "validated"
+    for num_participants, num_matches, *timings in asyncio.run(run(sizes, args.requests)):
+        print(f"{mode:>10} {num_participants:>12} {num_matches:>6} " + " ".join(f"{t:>12.2f}" for t in timings))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--participants", default="32,64")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--child", action="store_true")
+    args = parser.parse_args()
+    if args.child:
+        child(args)
+        return
+
+    print("ms per richiesta (media)")
+    print(f"{'load':>10} {'partecipanti':>12} {'match':>6} " + " ".join(f"{'GET ' + (e or '/'):>12}" for e in ENDPOINTS))
+    for trusted in ("0", "1"):
+        env = dict(os.environ, TRUSTED_STORAGE_LOADS=trusted, STORAGE_THREADS="0")
+        subprocess.run([sys.executable, os.path.abspath(__file__), "--child"] + sys.argv[1:], env=env, check=True)
+
+
+if __name__ == "__main__":
+    main()
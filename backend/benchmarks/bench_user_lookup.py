@@ -0,0 +1,60 @@
+"""
+Costo di get_user_by_email_db / get_user_by_id_db (chiamate a ogni richiesta autenticata)
+con 100/1000/10000 utenti registrati: scansione lineare di users.json contro indice in memoria.
+
+Uso (dalla directory backend/):
+    python benchmarks/bench_user_lookup.py [--lookups 2000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def linear_scan(database, email):
+    """Implementazione precedente: rilettura e scansione dell'intero file a ogni lookup."""
+    for user in database._load_data(database.USERS_FILE):
+        if user.get("email") and user["email"].lower() == email:
+            return user
+    return None
+
+
+def bench(fn, keys, lookups):
+    start = time.perf_counter()
+    for _ in range(lookups):
+        fn(random.choice(keys))
+    return (time.perf_counter() - start) / lookups * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix="bench_users_"))
+    import database
+
+    print(f"{'utenti':>8} {'scansione (us)':>16} {'indice email (us)':>18} {'indice id (us)':>16}")
+    for n in (100, 1000, 10000):
+        users = [
+            {"id": str(uuid.uuid4()), "email": f"user{i}@example.com", "username": None, "name": f"User {i}",
+             "hashed_password": "$2b$12$" + "x" * 53, "is_active": True}
+            for i in range(n)
+        ]
+        database._save_users(users)
+        emails = [u["email"] for u in users]
+        ids = [u["id"] for u in users]
+        database.get_user_by_id_db(ids[0])  # ricostruzione dell'indice dopo la scrittura, fuori dalla misura
+        scan = bench(lambda e: linear_scan(database, e), emails, max(50, args.lookups // (n // 100)))
+        by_email = bench(database.get_user_by_email_db, emails, args.lookups)
+        by_id = bench(database.get_user_by_id_db, ids, args.lookups)
+        print(f"{n:>8} {scan:>16.1f} {by_email:>18.1f} {by_id:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Compressione delle risposte sopra una soglia di dimensione: brotli se il client lo accetta e il
+pacchetto `brotli` e' installato, altrimenti gzip.
+
+Middleware ASGI puro: raccoglie il corpo della risposta e lo comprime intero. Gli eventi SSE
+(text/event-stream) e le risposte gia' codificate passano invariati. Con la compressione
+negoziata l'ETag diventa debole, perche' i byte inviati dipendono dalla codifica (il confronto
+di If-None-Match e' comunque debole, vedi routers/tournaments.py).
+"""
+import gzip
+import os
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+
+    HAVE_BROTLI = True
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+    HAVE_BROTLI = False
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+# 4-5 e' il compromesso usuale per contenuti dinamici: vicino a gzip -9 come rapporto, piu' veloce di gzip -6
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+# Sopra questa dimensione la compressione gira nel pool di thread invece che nell'event loop
+COMPRESSION_THREAD_SIZE = 256 * 1024
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """`br` o `gzip` secondo Accept-Encoding (q=0 esclude la codifica); None = nessuna."""
+    accepted = set()
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name.strip())
+    if HAVE_BROTLI and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        chunks = []
+
+        async def send_compressed(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=list(message.get("headers", [])))
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = "W/" + etag
+                message = dict(message, headers=headers.raw)
+                if "content-encoding" in headers or headers.get("content-type", "").startswith("text/event-stream"):
+                    await send(message)
+                else:
+                    # Trattenuto finche' non si sa se il corpo verra' compresso
+                    start_message = message
+                return
+            if start_message is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            # Anche le risposte a corpo unico arrivano a pezzi se passano da un middleware "http"
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            start, start_message = start_message, None
+            body = b"".join(chunks)
+            if len(body) >= self.minimum_size:
+                if len(body) >= COMPRESSION_THREAD_SIZE:
+                    body = await run_in_threadpool(compress, body, encoding)
+                else:
+                    body = compress(body, encoding)
+                headers = MutableHeaders(raw=start["headers"])
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                headers.add_vary_header("Accept-Encoding")
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
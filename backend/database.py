@@ -1,10 +1,12 @@
+import atexit
 import json
 import math
 import os
+import threading
 import uuid  # For generating IDs
 from filelock import FileLock
 from pydantic import BaseModel
-from typing import Any, Dict, List, Optional, TypeVar
+from typing import Any, Dict, List, Optional, Tuple, TypeVar
 
 # Definiamo un tipo generico per i modelli Pydantic
 T = TypeVar('T', bound=BaseModel)
@@ -24,25 +26,53 @@ def _ensure_data_dir_exists():
         os.makedirs(DATA_DIR)
 
 
+def _stat_signature(st: os.stat_result) -> tuple:
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def _read_json_file_with_signature(filepath: str) -> Tuple[List[Dict[str, Any]], Optional[tuple]]:
+    """
+    Legge e decodifica un file JSON senza prendere lock: i writer sostituiscono il file con
+    os.replace, quindi un lettore vede sempre una versione completa. Restituisce anche la
+    firma (inode, mtime, dimensione) della versione effettivamente letta.
+    """
+    try:
+        with open(filepath, "r") as f:
+            signature = _stat_signature(os.fstat(f.fileno()))
+            content = f.read()
+    except FileNotFoundError:
+        return [], None
+    if not content.strip():
+        return [], signature
+    try:
+        return json.loads(content), signature
+    except json.JSONDecodeError:
+        print(f"Warning: Could not decode JSON from {filepath}. Returning empty list.")
+        return [], signature
+
+
+def _read_json_file(filepath: str) -> List[Dict[str, Any]]:
+    """Legge e decodifica un file JSON. Restituisce una lista vuota se il file non esiste o è vuoto/malformato."""
+    return _read_json_file_with_signature(filepath)[0]
+
+
+def _write_json_file(filepath: str, data: Any, indent: Optional[int] = 4):
+    """
+    Scrive un file JSON in modo atomico: file temporaneo + fsync + os.replace, cosi' un crash
+    non lascia mai il file a meta'. Il chiamante deve gia' possedere il lock del file.
+    """
+    tmp_path = filepath + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=indent, default=str)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, filepath)
+
+
 def _load_data(filepath: str) -> List[Dict[str, Any]]:
     """Carica dati da un file JSON. Restituisce una lista vuota se il file non esiste o è vuoto/malformato."""
-    _ensure_data_dir_exists()
-    lock_path = filepath + ".lock"
-    lock = FileLock(lock_path)
-    with lock:
-        if not os.path.exists(filepath):
-            return []
-        try:
-            with open(filepath, "r") as f:
-                content = f.read()
-                if not content.strip():
-                    return []
-                return json.loads(content)
-        except FileNotFoundError:
-            return []
-        except json.JSONDecodeError:
-            print(f"Warning: Could not decode JSON from {filepath}. Returning empty list.")
-            return []
+    # Nessun lock in lettura: i lettori non si serializzano tra loro ne' dietro i writer
+    return _read_json_file(filepath)
 
 
 def _save_data(filepath: str, data: List[Dict[str, Any]]):
@@ -51,21 +81,199 @@ def _save_data(filepath: str, data: List[Dict[str, Any]]):
     lock_path = filepath + ".lock"
     lock = FileLock(lock_path)
     with lock:
-        with open(filepath, "w") as f:
-            json.dump(data, f, indent=4, default=str)
+        _write_json_file(filepath, data)
+
+
+def _file_signature(filepath: str) -> Optional[tuple]:
+    """Identifica la versione su disco di un file tramite inode, mtime e dimensione."""
+    try:
+        return _stat_signature(os.stat(filepath))
+    except FileNotFoundError:
+        return None
+
+
+# --- Cache in memoria dei tornei ---
+# Le letture vengono servite dalla copia gia' decodificata di tournaments.json; la cache
+# viene ricaricata quando inode/mtime/dimensione del file cambiano (es. scrittura da un
+# altro worker uvicorn). Le scritture aggiornano subito la cache e vengono salvate su disco
+# in background entro TOURNAMENT_CACHE_FLUSH_DELAY secondi (0 = scrittura immediata).
+TOURNAMENT_CACHE_FLUSH_DELAY = float(os.getenv("TOURNAMENT_CACHE_FLUSH_DELAY", "0.5"))
+
+
+def _copy_tournament(tournament: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Copia di un torneo in cache fino ai record (match, partecipanti, squadre, righe della
+    classifica), i cui campi sono scalari: chi la modifica non altera la cache. Costa una
+    frazione della decodifica del JSON.
+    """
+    copied = {}
+    for key, value in tournament.items():
+        if isinstance(value, list):
+            value = [dict(item) if isinstance(item, dict) else item for item in value]
+        elif isinstance(value, dict):
+            value = {k: dict(item) if isinstance(item, dict) else item for k, item in value.items()}
+        copied[key] = value
+    return copied
+
+
+class _TournamentCache:
+    def __init__(self, filepath: str, flush_delay: float):
+        self.filepath = filepath
+        self.flush_delay = flush_delay
+        self._lock = threading.RLock()
+        self._tournaments: Optional[List[Dict[str, Any]]] = None
+        self._index: Dict[str, int] = {}
+        self._signature: Optional[tuple] = None
+        # Modifiche non ancora scritte su disco, usate per il merge con le scritture di altri worker
+        self._dirty_ids: set = set()
+        self._deleted_ids: set = set()
+        self._replace_all = False
+        self._flush_timer: Optional[threading.Timer] = None
+        self.hits = 0
+        self.misses = 0
+        self.flushes = 0
+
+    @property
+    def _dirty(self) -> bool:
+        return bool(self._dirty_ids or self._deleted_ids or self._replace_all)
+
+    def _set(self, tournaments: List[Dict[str, Any]], signature: Optional[tuple]):
+        self._tournaments = tournaments
+        self._index = {t.get("id"): i for i, t in enumerate(tournaments)}
+        self._signature = signature
+
+    def _ensure_fresh(self):
+        """Ricarica il file se e' cambiato su disco. Da chiamare con self._lock acquisito."""
+        if self._tournaments is not None and (
+            self._dirty or _file_signature(self.filepath) == self._signature
+        ):
+            self.hits += 1
+            return
+        self.misses += 1
+        tournaments, signature = _read_json_file_with_signature(self.filepath)
+        self._set(tournaments, signature)
+
+    def _schedule_flush(self):
+        if self.flush_delay <= 0:
+            self.flush()
+            return
+        if self._flush_timer is None:
+            self._flush_timer = threading.Timer(self.flush_delay, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def flush(self):
+        """Scrive su disco le modifiche pendenti, unendole a eventuali scritture di altri processi."""
+        with self._lock:
+            self._flush_timer = None
+            if not self._dirty:
+                return
+            _ensure_data_dir_exists()
+            with FileLock(self.filepath + ".lock"):
+                tournaments = self._tournaments
+                if not self._replace_all and _file_signature(self.filepath) != self._signature:
+                    # Un altro worker ha scritto nel frattempo: riapplichiamo solo i nostri tornei modificati
+                    pending = {tid: self._tournaments[self._index[tid]] for tid in self._dirty_ids}
+                    tournaments = []
+                    for t in _read_json_file(self.filepath):
+                        tid = t.get("id")
+                        if tid in self._deleted_ids:
+                            continue
+                        tournaments.append(pending.pop(tid, t))
+                    tournaments.extend(pending.values())
+                _write_json_file(self.filepath, tournaments)
+                signature = _file_signature(self.filepath)
+            self._set(tournaments, signature)
+            self._dirty_ids.clear()
+            self._deleted_ids.clear()
+            self._replace_all = False
+            self.flushes += 1
+
+    def get_all(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._ensure_fresh()
+            return [_copy_tournament(t) for t in self._tournaments]
+
+    def get(self, tournament_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._ensure_fresh()
+            i = self._index.get(tournament_id)
+            return _copy_tournament(self._tournaments[i]) if i is not None else None
+
+    def put(self, tournament_id: str, tournament_data: Dict[str, Any], create: bool = False) -> Optional[Dict[str, Any]]:
+        # Normalizziamo come farebbe un round-trip su disco (datetime -> str, ecc.)
+        stored = json.loads(json.dumps(tournament_data, default=str))
+        with self._lock:
+            self._ensure_fresh()
+            i = self._index.get(tournament_id)
+            if i is None:
+                if not create:
+                    return None
+                self._index[tournament_id] = len(self._tournaments)
+                self._tournaments.append(stored)
+            else:
+                self._tournaments[i] = stored
+            self._dirty_ids.add(tournament_id)
+            self._deleted_ids.discard(tournament_id)
+            self._schedule_flush()
+        return tournament_data
+
+    def delete(self, tournament_id: str) -> bool:
+        with self._lock:
+            self._ensure_fresh()
+            if tournament_id not in self._index:
+                return False
+            tournaments = [t for t in self._tournaments if t.get("id") != tournament_id]
+            self._set(tournaments, self._signature)
+            self._dirty_ids.discard(tournament_id)
+            self._deleted_ids.add(tournament_id)
+            self._schedule_flush()
+            return True
+
+    def replace_all(self, tournaments: List[Dict[str, Any]]):
+        stored = json.loads(json.dumps(tournaments, default=str))
+        with self._lock:
+            self._set(stored, self._signature)
+            self._replace_all = True
+            self._schedule_flush()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "flushes": self.flushes,
+                "pending_writes": len(self._dirty_ids) + len(self._deleted_ids),
+            }
 
 
 # --- Funzioni specifiche per i Tornei ---
 
 
+_tournament_cache = _TournamentCache(TOURNAMENTS_FILE, TOURNAMENT_CACHE_FLUSH_DELAY)
+atexit.register(_tournament_cache.flush)
+
+
 def load_tournaments() -> List[Dict[str, Any]]:
-    """Carica tutti i tornei."""
-    return _load_data(TOURNAMENTS_FILE)
+    """Carica tutti i tornei (dalla cache in memoria)."""
+    return _tournament_cache.get_all()
 
 
 def save_tournaments(tournaments: List[Dict[str, Any]]):
     """Salva la lista di tornei."""
-    _save_data(TOURNAMENTS_FILE, tournaments)
+    _tournament_cache.replace_all(tournaments)
+
+
+def flush_tournaments():
+    """Forza la scrittura su disco delle modifiche ai tornei ancora in cache."""
+    _tournament_cache.flush()
+
+
+def get_tournament_cache_stats() -> Dict[str, Any]:
+    """Contatori hit/miss della cache dei tornei (GET /api/health, tramite database_adapter)."""
+    return _tournament_cache.stats()
 
 
 def get_all_tournaments_db() -> List[Dict[str, Any]]:
@@ -73,38 +281,20 @@ def get_all_tournaments_db() -> List[Dict[str, Any]]:
 
 
 def get_tournament_db(tournament_id: str) -> Optional[Dict[str, Any]]:
-    tournaments = load_tournaments()
-    for t in tournaments:
-        if t.get("id") == tournament_id:
-            return t
-    return None
+    # Copia del torneo in cache: le modifiche vanno salvate con update_tournament_db
+    return _tournament_cache.get(tournament_id)
 
 
 def create_tournament_db(tournament_data: Dict[str, Any]) -> Dict[str, Any]:
-    tournaments = load_tournaments()
-    tournaments.append(tournament_data)
-    save_tournaments(tournaments)
-    return tournament_data
+    return _tournament_cache.put(tournament_data.get("id"), tournament_data, create=True)
 
 
 def update_tournament_db(tournament_id: str, tournament_update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-    tournaments = load_tournaments()
-    for i, t in enumerate(tournaments):
-        if t.get("id") == tournament_id:
-            tournaments[i] = tournament_update_data
-            save_tournaments(tournaments)
-            return tournament_update_data
-    return None
+    return _tournament_cache.put(tournament_id, tournament_update_data)
 
 
 def delete_tournament_db(tournament_id: str) -> bool:
-    tournaments = load_tournaments()
-    original_length = len(tournaments)
-    tournaments = [t for t in tournaments if t.get("id") != tournament_id]
-    if len(tournaments) < original_length:
-        save_tournaments(tournaments)
-        return True
-    return False
+    return _tournament_cache.delete(tournament_id)
 
 
 def record_match_result_db(tournament_id: str, match_id: str, winner_id: str) -> Optional[Dict[str, Any]]:
@@ -208,29 +398,81 @@ def _save_users(users: List[Dict[str, Any]]):
     _save_data(USERS_FILE, users)
 
 
+class _UserIndex:
+    """
+    Indici in memoria di users.json (email -> utente, id -> utente) per il percorso di
+    autenticazione. Ogni lookup costa un os.stat: se inode/mtime/dimensione del file sono
+    cambiati (es. registrazione su un altro worker) gli indici vengono ricostruiti.
+    Lo stato e' una tupla sostituita in blocco, quindi le letture non prendono lock.
+    """
+
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self._write_lock = threading.Lock()
+        # (firma del file, lista utenti, email -> utente, id -> utente)
+        self._state: tuple = (None, [], {}, {})
+
+    def _build(self, users: List[Dict[str, Any]], signature: Optional[tuple]) -> tuple:
+        by_email: Dict[str, Dict[str, Any]] = {}
+        by_id: Dict[str, Dict[str, Any]] = {}
+        for user in users:
+            # A parita' di chiave vince il primo utente del file, come con la scansione lineare
+            if user.get("email"):
+                by_email.setdefault(user["email"].lower(), user)
+            by_id.setdefault(user.get("id"), user)
+        self._state = (signature, users, by_email, by_id)
+        return self._state
+
+    def _current(self) -> tuple:
+        state = self._state
+        if _file_signature(self.filepath) != state[0]:
+            users, signature = _read_json_file_with_signature(self.filepath)
+            state = self._build(users, signature)
+        return state
+
+    def get_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        user = self._current()[2].get(email.lower())
+        return dict(user) if user else None
+
+    def get_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
+        user = self._current()[3].get(user_id)
+        return dict(user) if user else None
+
+    def modify(self, mutate) -> Optional[Dict[str, Any]]:
+        """
+        Read-modify-write di users.json sotto file lock. `mutate(users, by_email, by_id)` riceve
+        una copia della lista (gli utenti esistenti non vanno modificati in place, si sostituiscono)
+        e restituisce l'utente scritto, oppure None per non scrivere nulla.
+        """
+        _ensure_data_dir_exists()
+        with self._write_lock, FileLock(self.filepath + ".lock"):
+            _, users, by_email, by_id = self._current()
+            users = list(users)
+            user = mutate(users, by_email, by_id)
+            if user is None:
+                return None
+            _write_json_file(self.filepath, users)
+            self._build(users, _file_signature(self.filepath))
+        return dict(user)
+
+
+_user_index = _UserIndex(USERS_FILE)
+
+
 def get_user_by_email_db(email: str) -> Optional[Dict[str, Any]]:
     """
-    Recupera un utente per email dal 'database' (users.json).
+    Recupera un utente per email dal 'database' (users.json), tramite l'indice in memoria.
     """
     if not email:
         return None
-    users = _load_users()
-    email_lower = email.lower()
-    for user in users:
-        if user.get("email") and user.get("email").lower() == email_lower:
-            return user
-    return None
+    return _user_index.get_by_email(email)
 
 
 def get_user_by_id_db(user_id: str) -> Optional[Dict[str, Any]]:
     """
-    Recupera un utente per ID dal 'database' (users.json).
+    Recupera un utente per ID dal 'database' (users.json), tramite l'indice in memoria.
     """
-    users = _load_users()
-    for user in users:
-        if user.get("id") == user_id:
-            return user
-    return None
+    return _user_index.get_by_id(user_id)
 
 
 def create_user_db(user_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -238,24 +480,24 @@ def create_user_db(user_data: Dict[str, Any]) -> Dict[str, Any]:
     Crea un nuovo utente nel 'database' (users.json).
     Assumes user_data is a dict representation of the User model.
     """
-    users = _load_users()
     user_data["email"] = user_data["email"].lower()
-    # The caller (e.g., registration endpoint in main.py) should ensure email uniqueness before calling this.
-    # However, a check here can be a safeguard.
-    existing_user = get_user_by_email_db(user_data.get("email"))
-    if existing_user and existing_user.get("id") != user_data.get("id"):  # Different user with same email
-        # This situation should ideally be prevented by the calling logic.
-        # If it happens, it indicates a problem. For now, we'll log or raise.
-        print(
-            f"Error: Attempting to create user with email {user_data.get('email')} that already exists for another user.")
-        return None  # Or raise an exception
-
     # Ensure ID is present (Pydantic model default_factory should handle this)
     if not user_data.get("id"):
         user_data["id"] = str(uuid.uuid4())  # Should be done by User model
 
-    users.append(user_data)
-    _save_users(users)
+    def add(users, by_email, by_id):
+        # The caller (e.g., registration endpoint in main.py) should ensure email uniqueness before calling this.
+        # However, a check here (under the file lock) is a safeguard.
+        existing_user = by_email.get(user_data["email"])
+        if existing_user and existing_user.get("id") != user_data.get("id"):  # Different user with same email
+            print(
+                f"Error: Attempting to create user with email {user_data.get('email')} that already exists for another user.")
+            return None
+        users.append(user_data)
+        return user_data
+
+    if _user_index.modify(add) is None:
+        return None
     return user_data
 
 
@@ -264,26 +506,19 @@ def update_user_db(user_id: str, user_update_data: Dict[str, Any]) -> Optional[D
     Aggiorna un utente esistente nel 'database' (users.json).
     user_update_data è un dizionario con i campi da aggiornare.
     """
-    users = _load_users()
-    user_found = False
-    updated_user = None
-    for i, user in enumerate(users):
-        if user.get("id") == user_id:
-            # Merge existing user data with update data
-            # Ensure not to overwrite 'id' from update_data if it's there by mistake
-            original_id = user["id"]
-            users[i].update(user_update_data)
-            users[i]["id"] = original_id  # Preserve original ID
-            if 'email' in users[i]:
-                users[i]['email'] = users[i]['email'].lower()
-            updated_user = users[i]
-            user_found = True
-            break
-
-    if user_found:
-        _save_users(users)
+    def update(users, by_email, by_id):
+        user = by_id.get(user_id)
+        if user is None:
+            return None  # User not found
+        # Merge existing user data with update data, preserving the original ID
+        updated_user = dict(user, **user_update_data)
+        updated_user["id"] = user["id"]
+        if updated_user.get("email"):
+            updated_user["email"] = updated_user["email"].lower()
+        users[next(i for i, u in enumerate(users) if u is user)] = updated_user
         return updated_user
-    return None  # User not found
+
+    return _user_index.modify(update)
 
 
 def save_feedback_db(feedback_data: Dict[str, Any]) -> Dict[str, Any]:
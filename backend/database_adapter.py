@@ -0,0 +1,254 @@
+"""
+Punto di accesso unico allo storage, usato da router e auth.
+
+Il backend viene scelto da DATABASE_URL:
+- non impostata: file JSON in jsondata/ (journal + snapshot, vedi journal.py);
+  con JSON_STORAGE_LAYOUT=sharded lo snapshot usa un file per torneo (db_sharded.py)
+- sqlite:///percorso.db: SQLite in modalita' WAL (db_sqlite.py), per deployment su singola VM
+- postgresql://...: PostgreSQL tramite i modelli di db_postgres.py, senza file lock
+"""
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import tournament_events
+from storage_backend import StorageBackend, VersionConflict  # noqa: F401 (rilanciata ai router)
+
+DATABASE_URL = os.getenv("DATABASE_URL", "")
+JSON_STORAGE_LAYOUT = os.getenv("JSON_STORAGE_LAYOUT", "monolithic")
+# Le chiamate ai backend sono bloccanti (file, sqlite3, psycopg2): l'API async le esegue in un
+# pool di thread limitato, cosi' una scrittura lenta non ferma l'event loop del worker.
+# STORAGE_THREADS=0 le esegue direttamente nell'event loop.
+STORAGE_THREADS = int(os.getenv("STORAGE_THREADS", "8"))
+
+# Chiamate con l'id dell'utente dopo ogni update_user_db riuscito (es. invalidazione della cache di auth)
+user_update_listeners: List[Callable[[str], None]] = []
+# Chiamate con ogni evento di un torneo scritto con successo, con la versione assegnata dallo
+# storage (es. aggiornamenti in tempo reale, vedi live_updates.py). Gli update completi e le
+# eliminazioni arrivano come eventi senza contenuto: chi li riceve rilegge il torneo
+tournament_event_listeners: List[Callable[[Dict[str, Any]], None]] = []
+
+
+class JsonBackend(StorageBackend):
+    def __init__(self, layout: str = JSON_STORAGE_LAYOUT):
+        import database
+        from journal import TournamentJournal
+
+        if layout == "sharded":
+            import db_sharded
+
+            db_sharded.migrate_from_monolithic()
+            store = db_sharded
+        else:
+            store = database
+        self._db = database
+        self._journal = TournamentJournal(store)
+        # Le funzioni utenti/feedback di database.py fanno read-modify-write dell'intero file:
+        # con il pool di thread vanno serializzate all'interno del processo
+        self._write_lock = threading.Lock()
+
+    def get_all_tournaments(self):
+        return self._journal.get_all_tournaments()
+
+    def get_tournament(self, tournament_id):
+        return self._journal.get_tournament(tournament_id)
+
+    def get_tournament_version(self, tournament_id):
+        return self._journal.get_tournament_version(tournament_id)
+
+    def list_tournament_summaries(self, limit, cursor=None, user_id=None, email=None):
+        return self._journal.list_tournament_summaries(limit, cursor, user_id, email)
+
+    def create_tournament(self, tournament_data):
+        return self._journal.create_tournament(tournament_data)
+
+    def update_tournament(self, tournament_id, tournament_data, expected_version=None):
+        return self._journal.update_tournament(tournament_id, tournament_data, expected_version)
+
+    def delete_tournament(self, tournament_id):
+        return self._journal.delete_tournament(tournament_id)
+
+    def record_event(self, event):
+        return self._journal.record_event(event)
+
+    def cache_stats(self):
+        # Con il layout sharded lo snapshot non passa dalla cache di database.py
+        return self._db.get_tournament_cache_stats() if self._journal.store is self._db else None
+
+    def get_user_by_email(self, email):
+        return self._db.get_user_by_email_db(email)
+
+    def get_user_by_id(self, user_id):
+        return self._db.get_user_by_id_db(user_id)
+
+    def create_user(self, user_data):
+        with self._write_lock:
+            return self._db.create_user_db(user_data)
+
+    def update_user(self, user_id, user_update_data):
+        with self._write_lock:
+            return self._db.update_user_db(user_id, user_update_data)
+
+    def save_feedback(self, feedback_data):
+        with self._write_lock:
+            return self._db.save_feedback_db(feedback_data)
+
+    def get_all_feedback(self):
+        return self._db.get_all_feedback_db()
+
+
+def get_backend(database_url: str = DATABASE_URL) -> StorageBackend:
+    if not database_url:
+        return JsonBackend()
+    if database_url.startswith("sqlite:///"):
+        from db_sqlite import SqliteBackend
+
+        return SqliteBackend(database_url[len("sqlite:///"):])
+    if database_url.startswith(("postgres://", "postgresql://", "postgresql+")):
+        from db_postgres import PostgresBackend
+
+        return PostgresBackend()
+    raise ValueError(f"Unsupported DATABASE_URL scheme: {database_url.split(':', 1)[0]}")
+
+
+backend = get_backend()
+_executor = ThreadPoolExecutor(max_workers=STORAGE_THREADS, thread_name_prefix="storage") if STORAGE_THREADS > 0 else None
+
+
+async def _run(fn: Callable, *args, **kwargs):
+    if _executor is None:
+        return fn(*args, **kwargs)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(fn, *args, **kwargs))
+
+
+def _notify(event: Dict[str, Any], tournament: Optional[Dict[str, Any]]) -> None:
+    if tournament is None:
+        return
+    event = dict(event, version=tournament.get("version", 0))
+    event.pop("expected_version", None)
+    for listener in tournament_event_listeners:
+        listener(event)
+
+
+# --- API async usata da router e auth (il backend sincrono resta disponibile come `backend`) ---
+
+
+async def get_all_tournaments_db() -> List[Dict[str, Any]]:
+    return await _run(backend.get_all_tournaments)
+
+
+async def get_tournament_db(tournament_id: str) -> Optional[Dict[str, Any]]:
+    return await _run(backend.get_tournament, tournament_id)
+
+
+async def create_tournament_db(tournament_data: Dict[str, Any]) -> Dict[str, Any]:
+    return await _run(backend.create_tournament, tournament_data)
+
+
+async def update_tournament_db(
+    tournament_id: str, tournament_update_data: Dict[str, Any], expected_version: Optional[int] = None
+) -> Optional[Dict[str, Any]]:
+    """Con expected_version solleva VersionConflict se il torneo e' stato modificato dopo la lettura."""
+    tournament = await _run(backend.update_tournament, tournament_id, tournament_update_data, expected_version)
+    _notify({"type": tournament_events.TOURNAMENT_SAVED, "tournament_id": tournament_id}, tournament)
+    return tournament
+
+
+async def delete_tournament_db(tournament_id: str) -> bool:
+    deleted = await _run(backend.delete_tournament, tournament_id)
+    if deleted:
+        _notify({"type": tournament_events.TOURNAMENT_DELETED, "tournament_id": tournament_id}, {})
+    return deleted
+
+
+async def get_tournament_info_db(tournament_id: str) -> Optional[Dict[str, Any]]:
+    return await _run(backend.get_tournament_info, tournament_id)
+
+
+async def get_tournament_version_db(tournament_id: str) -> Optional[int]:
+    return await _run(backend.get_tournament_version, tournament_id)
+
+
+async def list_tournament_summaries_db(
+    limit: int, cursor: Optional[str] = None, user_id: Optional[str] = None, email: Optional[str] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Pagina dei riepiloghi dei tornei e cursore della pagina successiva (None se e' l'ultima)."""
+    return await _run(backend.list_tournament_summaries, limit, cursor, user_id, email)
+
+
+async def get_matches_db(
+    tournament_id: str, match_day: Optional[int] = None, phase: Optional[str] = None
+) -> Optional[List[Dict[str, Any]]]:
+    return await _run(backend.get_matches, tournament_id, match_day=match_day, phase=phase)
+
+
+async def record_result_db(
+    tournament_id: str,
+    matches: List[Dict[str, Any]],
+    changes: Optional[Dict[str, Any]] = None,
+    expected_version: Optional[int] = None,
+    standings: Optional[Dict[str, Any]] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Salva solo i match modificati da un risultato (match giocato ed eventuale turno successivo)
+    e le righe della classifica che cambiano, unite a quelle salvate.
+    """
+    event = tournament_events.result_recorded(tournament_id, matches, changes, expected_version, standings)
+    tournament = await _run(backend.record_event, event)
+    _notify(event, tournament)
+    return tournament
+
+
+async def add_participant_db(
+    tournament_id: str, participant: Dict[str, Any], expected_version: Optional[int] = None
+) -> Optional[Dict[str, Any]]:
+    event = tournament_events.participant_joined(tournament_id, participant, expected_version)
+    tournament = await _run(backend.record_event, event)
+    _notify(event, tournament)
+    return tournament
+
+
+async def record_playoffs_db(
+    tournament_id: str,
+    playoff_matches: List[Dict[str, Any]],
+    changes: Optional[Dict[str, Any]] = None,
+    expected_version: Optional[int] = None,
+) -> Optional[Dict[str, Any]]:
+    """Sostituisce i match di playoff del torneo con quelli appena generati."""
+    event = tournament_events.playoffs_generated(tournament_id, playoff_matches, changes, expected_version)
+    tournament = await _run(backend.record_event, event)
+    _notify(event, tournament)
+    return tournament
+
+
+async def get_user_by_email_db(email: str) -> Optional[Dict[str, Any]]:
+    return await _run(backend.get_user_by_email, email)
+
+
+async def get_user_by_id_db(user_id: str) -> Optional[Dict[str, Any]]:
+    return await _run(backend.get_user_by_id, user_id)
+
+
+async def create_user_db(user_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    return await _run(backend.create_user, user_data)
+
+
+async def update_user_db(user_id: str, user_update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    user = await _run(backend.update_user, user_id, user_update_data)
+    if user is None:
+        return None
+    for listener in user_update_listeners:
+        listener(user_id)
+    return user
+
+
+async def save_feedback_db(feedback_data: Dict[str, Any]) -> Dict[str, Any]:
+    return await _run(backend.save_feedback, feedback_data)
+
+
+async def get_all_feedback_db() -> List[Dict[str, Any]]:
+    return await _run(backend.get_all_feedback)
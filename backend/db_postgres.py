@@ -1,8 +1,17 @@
 import os
-from sqlalchemy import create_engine, Column, String, JSON, text
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import (
+    create_engine, func, inspect, or_, tuple_, BigInteger, Boolean, Column, ForeignKey, Index, Integer, String, JSON, text,
+)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
+from storage_backend import (
+    SUMMARY_FIELDS, StorageBackend, VersionConflict, _to_json, parse_summary_cursor, summary_cursor,
+)
+from tournament_events import PARTICIPANT_JOINED, PLAYOFFS_GENERATED, RESULT_RECORDED
+
 DATABASE_URL = os.getenv("DATABASE_URL", "")
 
 if DATABASE_URL:
@@ -14,14 +23,75 @@ if DATABASE_URL:
         __tablename__ = "tournaments"
         id = Column(String, primary_key=True)
         user_id = Column(String, index=True)
+        version = Column(Integer, nullable=False, default=0, server_default="0")
+        # Copia di data["created_seq"] (non cambia dopo la creazione) per l'ordine dell'elenco
+        created_seq = Column(BigInteger, nullable=False, default=0, server_default="0")
+        # Solo i campi del torneo: partecipanti, squadre e match hanno tabelle proprie
         data = Column(JSON)
 
+        __table_args__ = (Index("ix_tournaments_created", "created_seq", "id"),)
+
+    class ParticipantDB(Base):
+        __tablename__ = "participants"
+        tournament_id = Column(String, ForeignKey("tournaments.id", ondelete="CASCADE"), primary_key=True)
+        id = Column(String, primary_key=True)
+        position = Column(Integer, nullable=False)
+        name = Column(String)
+        email = Column(String, index=True)
+        ranking = Column(Integer)
+
+    class TeamDB(Base):
+        __tablename__ = "teams"
+        tournament_id = Column(String, ForeignKey("tournaments.id", ondelete="CASCADE"), primary_key=True)
+        id = Column(String, primary_key=True)
+        position = Column(Integer, nullable=False)
+        player1_id = Column(String)
+        player2_id = Column(String)
+        name = Column(String)
+
+    class MatchDB(Base):
+        __tablename__ = "matches"
+        tournament_id = Column(String, ForeignKey("tournaments.id", ondelete="CASCADE"), primary_key=True)
+        id = Column(String, primary_key=True)
+        position = Column(Integer, nullable=False)
+        round_number = Column(Integer)
+        match_number = Column(Integer)
+        match_day = Column(Integer)
+        phase = Column(String)
+        scheduled_date = Column(String)
+        participant1_id = Column(String)
+        participant2_id = Column(String)
+        winner_id = Column(String)
+        score_participant1 = Column(Integer)
+        score_participant2 = Column(Integer)
+        set1_score_participant1 = Column(Integer)
+        set1_score_participant2 = Column(Integer)
+        set2_score_participant1 = Column(Integer)
+        set2_score_participant2 = Column(Integer)
+        set3_score_participant1 = Column(Integer)
+        set3_score_participant2 = Column(Integer)
+        is_bye = Column(Boolean, default=False)
+        status = Column(String)
+
+        __table_args__ = (
+            Index("ix_matches_tournament_position", "tournament_id", "position"),
+            Index("ix_matches_tournament_match_day", "tournament_id", "match_day"),
+            Index("ix_matches_tournament_phase_round", "tournament_id", "phase", "round_number"),
+            Index("ix_matches_tournament_phase_status", "tournament_id", "phase", "status"),
+        )
+
     class UserDB(Base):
         __tablename__ = "users"
         id = Column(String, primary_key=True)
         email = Column(String, unique=True, index=True)
         data = Column(JSON)
 
+    class FeedbackDB(Base):
+        __tablename__ = "feedback"
+        id = Column(String, primary_key=True)
+        user_id = Column(String, index=True)
+        data = Column(JSON)
+
     Base.metadata.create_all(bind=engine)
 
     def get_db():
@@ -30,3 +100,313 @@ if DATABASE_URL:
             yield db
         finally:
             db.close()
+
+
+TOURNAMENT_CHILDREN = ("participants", "teams", "matches")
+
+
+def _fields(data: dict) -> dict:
+    """Contenuto della colonna `data`: versione e figli hanno colonne/tabelle proprie."""
+    return {k: v for k, v in data.items() if k not in TOURNAMENT_CHILDREN and k != "version"}
+
+
+def _columns(model) -> list:
+    return [c.name for c in model.__table__.columns if c.name not in ("tournament_id", "position")]
+
+
+def _row(model, tournament_id: str, position: int, data: dict):
+    return model(tournament_id=tournament_id, position=position, **{c: data.get(c) for c in _columns(model)})
+
+
+def _to_dict(model, row) -> dict:
+    return {c: getattr(row, c) for c in _columns(model)}
+
+
+class PostgresBackend(StorageBackend):
+    """
+    Schema normalizzato: il torneo e' una riga (campi in `data`), partecipanti, squadre e
+    match hanno tabelle proprie. Un risultato aggiorna una sola riga di `matches` piu' la
+    versione del torneo, con un UPDATE condizionale (compare-and-swap) invece di SELECT FOR UPDATE.
+    """
+
+    indexed_match_queries = True  # indici di matches su (tournament_id, match_day) e (tournament_id, phase, ...)
+
+    def __init__(self):
+        self.Session = SessionLocal
+        self._migrate_legacy_rows()
+
+    def _migrate_legacy_rows(self):
+        """Sposta nelle tabelle figlie i tornei salvati come unico documento JSON."""
+        columns = {c["name"] for c in inspect(engine).get_columns("tournaments")}
+        with engine.begin() as conn:
+            if "version" not in columns:
+                conn.execute(text("ALTER TABLE tournaments ADD COLUMN version INTEGER NOT NULL DEFAULT 0"))
+            if "created_seq" not in columns:
+                conn.execute(text("ALTER TABLE tournaments ADD COLUMN created_seq BIGINT NOT NULL DEFAULT 0"))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_tournaments_created ON tournaments (created_seq, id)"))
+        with self.Session() as session:
+            for row in session.query(TournamentDB).all():
+                if not any(k in (row.data or {}) for k in TOURNAMENT_CHILDREN):
+                    continue
+                self._write_children(session, row.id, row.data)
+                row.data = _fields(row.data)
+            session.commit()
+
+    def _write_children(self, session, tournament_id: str, data: dict):
+        for model, key in ((ParticipantDB, "participants"), (TeamDB, "teams"), (MatchDB, "matches")):
+            session.query(model).filter(model.tournament_id == tournament_id).delete()
+            session.add_all(_row(model, tournament_id, i, item) for i, item in enumerate(data.get(key) or []))
+
+    def _load(self, session, rows) -> List[Dict[str, Any]]:
+        tournaments = {}
+        for row in rows:
+            t = dict(row.data or {}, id=row.id, version=row.version)
+            for key in TOURNAMENT_CHILDREN:
+                t[key] = []
+            tournaments[row.id] = t
+        if not tournaments:
+            return []
+        ids = list(tournaments)
+        for model, key in ((ParticipantDB, "participants"), (TeamDB, "teams"), (MatchDB, "matches")):
+            children = (
+                session.query(model)
+                .filter(model.tournament_id.in_(ids))
+                .order_by(model.tournament_id, model.position)
+            )
+            for child in children:
+                tournaments[child.tournament_id][key].append(_to_dict(model, child))
+        return list(tournaments.values())
+
+    def get_all_tournaments(self):
+        with self.Session() as session:
+            return self._load(session, session.query(TournamentDB).all())
+
+    def get_tournament(self, tournament_id):
+        with self.Session() as session:
+            row = session.get(TournamentDB, tournament_id)
+            return self._load(session, [row])[0] if row else None
+
+    def get_tournament_info(self, tournament_id):
+        with self.Session() as session:
+            row = session.get(TournamentDB, tournament_id)
+            return dict(row.data or {}, id=row.id, version=row.version) if row else None
+
+    def get_tournament_version(self, tournament_id):
+        with self.Session() as session:
+            return session.query(TournamentDB.version).filter(TournamentDB.id == tournament_id).scalar()
+
+    def list_tournament_summaries(self, limit, cursor=None, user_id=None, email=None):
+        with self.Session() as session:
+            query = session.query(TournamentDB)
+            if cursor is not None:
+                query = query.filter(
+                    tuple_(TournamentDB.created_seq, TournamentDB.id) > tuple_(*parse_summary_cursor(cursor))
+                )
+            conditions = []
+            if user_id is not None:
+                conditions.append(TournamentDB.user_id == user_id)
+            if email is not None:
+                participant = session.query(ParticipantDB.tournament_id).filter(ParticipantDB.email == email)
+                conditions.append(TournamentDB.id.in_(participant))
+            if conditions:
+                query = query.filter(or_(*conditions))
+            rows = query.order_by(TournamentDB.created_seq, TournamentDB.id).limit(limit + 1).all()
+            page = rows[:limit]
+            ids = [row.id for row in page]
+            joined = set()
+            if email is not None:
+                joined = {tournament_id for tournament_id, in session.query(ParticipantDB.tournament_id).filter(
+                    ParticipantDB.tournament_id.in_(ids), ParticipantDB.email == email
+                )}
+            # Conteggi per tutta la pagina con due GROUP BY sugli indici delle tabelle figlie
+            participant_counts = dict(
+                session.query(ParticipantDB.tournament_id, func.count())
+                .filter(ParticipantDB.tournament_id.in_(ids))
+                .group_by(ParticipantDB.tournament_id)
+            )
+            match_counts: Dict[str, Dict[str, int]] = {}
+            for tournament_id, match_status, count in (
+                session.query(MatchDB.tournament_id, MatchDB.status, func.count())
+                .filter(MatchDB.tournament_id.in_(ids), MatchDB.phase == "group")
+                .group_by(MatchDB.tournament_id, MatchDB.status)
+            ):
+                match_counts.setdefault(tournament_id, {})[match_status] = count
+            summaries = []
+            for row in page:
+                counts = match_counts.get(row.id, {})
+                data = row.data or {}
+                summary = {f: data[f] for f in SUMMARY_FIELDS if f in data}
+                summary.update(
+                    id=row.id,
+                    version=row.version,
+                    participant_count=participant_counts.get(row.id, 0),
+                    total_group_matches=sum(counts.values()),
+                    completed_group_matches=counts.get("completed", 0),
+                    created_seq=row.created_seq,
+                    joined=row.id in joined,
+                )
+                summaries.append(summary)
+        return summaries, summary_cursor(summaries[-1]) if len(rows) > limit else None
+
+    def get_matches(self, tournament_id, match_day=None, phase=None):
+        with self.Session() as session:
+            if session.get(TournamentDB, tournament_id) is None:
+                return None
+            query = session.query(MatchDB).filter(MatchDB.tournament_id == tournament_id)
+            if match_day is not None:
+                query = query.filter(MatchDB.match_day == match_day)
+            if phase is not None:
+                query = query.filter(MatchDB.phase == phase)
+            return [_to_dict(MatchDB, m) for m in query.order_by(MatchDB.position)]
+
+    def create_tournament(self, tournament_data):
+        tournament_data = dict(tournament_data, version=tournament_data.get("version") or 0)
+        data = _to_json(tournament_data)
+        with self.Session() as session:
+            session.add(
+                TournamentDB(
+                    id=data["id"],
+                    user_id=data.get("user_id"),
+                    version=data["version"],
+                    created_seq=data.get("created_seq") or 0,
+                    data=_fields(data),
+                )
+            )
+            session.flush()
+            self._write_children(session, data["id"], data)
+            session.commit()
+        return tournament_data
+
+    def _bump_version(self, session, tournament_id: str, expected_version: Optional[int]) -> Optional[int]:
+        """
+        Incrementa la versione con un UPDATE condizionale, che tiene il lock della riga fino al
+        commit. Restituisce la nuova versione (None se il torneo non esiste).
+        """
+        query = session.query(TournamentDB).filter(TournamentDB.id == tournament_id)
+        if expected_version is not None:
+            query = query.filter(TournamentDB.version == expected_version)
+        updated = query.update({TournamentDB.version: TournamentDB.version + 1}, synchronize_session=False)
+        version = session.query(TournamentDB.version).filter(TournamentDB.id == tournament_id).scalar()
+        if not updated and version is not None:
+            raise VersionConflict(tournament_id, expected_version, version)
+        return version
+
+    def update_tournament(self, tournament_id, tournament_data, expected_version=None):
+        data = _to_json(tournament_data)
+        with self.Session() as session:
+            version = self._bump_version(session, tournament_id, expected_version)
+            if version is None:
+                return None
+            session.query(TournamentDB).filter(TournamentDB.id == tournament_id).update(
+                {TournamentDB.data: _fields(data), TournamentDB.user_id: data.get("user_id")},
+                synchronize_session=False,
+            )
+            self._write_children(session, tournament_id, data)
+            session.commit()
+        return dict(tournament_data, version=version)
+
+    def delete_tournament(self, tournament_id):
+        with self.Session() as session:
+            row = session.get(TournamentDB, tournament_id)
+            if row is None:
+                return False
+            for model in (ParticipantDB, TeamDB, MatchDB):
+                session.query(model).filter(model.tournament_id == tournament_id).delete()
+            session.delete(row)
+            session.commit()
+        return True
+
+    def _next_position(self, session, model, tournament_id: str) -> int:
+        current = session.query(func.max(model.position)).filter(model.tournament_id == tournament_id).scalar()
+        return 0 if current is None else current + 1
+
+    def record_event(self, event):
+        event_type = event["type"]
+        if event_type not in (RESULT_RECORDED, PARTICIPANT_JOINED, PLAYOFFS_GENERATED):
+            return super().record_event(event)
+
+        event = _to_json(event)
+        tournament_id = event["tournament_id"]
+        with self.Session() as session:
+            if self._bump_version(session, tournament_id, event.get("expected_version")) is None:
+                return None
+            if event_type == PARTICIPANT_JOINED:
+                participant = event["participant"]
+                if session.get(ParticipantDB, (tournament_id, participant["id"])) is None:
+                    position = self._next_position(session, ParticipantDB, tournament_id)
+                    session.add(_row(ParticipantDB, tournament_id, position, participant))
+            else:
+                if event_type == PLAYOFFS_GENERATED:
+                    session.query(MatchDB).filter(
+                        MatchDB.tournament_id == tournament_id, MatchDB.phase == "playoff"
+                    ).delete()
+                position = None
+                for match in event["matches"]:
+                    values = {c: match.get(c) for c in _columns(MatchDB) if c != "id"}
+                    updated = (
+                        session.query(MatchDB)
+                        .filter(MatchDB.tournament_id == tournament_id, MatchDB.id == match["id"])
+                        .update(values)
+                    )
+                    if not updated:
+                        if position is None:
+                            position = self._next_position(session, MatchDB, tournament_id)
+                        session.add(_row(MatchDB, tournament_id, position, match))
+                        position += 1
+            changes = event.get("changes") or {}
+            standings = event.get("standings")
+            if changes or standings:
+                row = session.get(TournamentDB, tournament_id)
+                data = dict(row.data or {}, **changes)
+                if standings:
+                    data["standings"] = dict(data.get("standings") or {}, **standings)
+                if data != row.data:
+                    row.data = data
+            session.commit()
+        return self.get_tournament(tournament_id)
+
+    def get_user_by_email(self, email):
+        if not email:
+            return None
+        with self.Session() as session:
+            row = session.query(UserDB).filter(UserDB.email == email.lower()).first()
+            return row.data if row else None
+
+    def get_user_by_id(self, user_id):
+        with self.Session() as session:
+            row = session.get(UserDB, user_id)
+            return row.data if row else None
+
+    def create_user(self, user_data):
+        user_data["email"] = user_data["email"].lower()
+        if self.get_user_by_email(user_data["email"]):
+            print(f"Error: Attempting to create user with email {user_data['email']} that already exists.")
+            return None
+        with self.Session() as session:
+            session.add(UserDB(id=user_data["id"], email=user_data["email"], data=_to_json(user_data)))
+            session.commit()
+        return user_data
+
+    def update_user(self, user_id, user_update_data):
+        with self.Session() as session:
+            row = session.get(UserDB, user_id, with_for_update=True)
+            if row is None:
+                return None
+            data = dict(row.data, **user_update_data)
+            data["id"] = user_id
+            if data.get("email"):
+                data["email"] = data["email"].lower()
+            row.data = _to_json(data)
+            row.email = data.get("email")
+            session.commit()
+        return data
+
+    def save_feedback(self, feedback_data):
+        with self.Session() as session:
+            session.add(FeedbackDB(id=feedback_data["id"], user_id=feedback_data.get("user_id"), data=_to_json(feedback_data)))
+            session.commit()
+        return feedback_data
+
+    def get_all_feedback(self):
+        with self.Session() as session:
+            return [row.data for row in session.query(FeedbackDB).all()]
@@ -0,0 +1,169 @@
+"""
+Layout "sharded" per i tornei: un file JSON per torneo (jsondata/tournaments/<id>.json),
+ognuno con il proprio lock, piu' un piccolo manifest con l'elenco degli ID.
+
+Una scrittura riscrive solo il file del torneo interessato, e scritture su tornei diversi
+non si serializzano piu' dietro un unico lock globale.
+"""
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+from filelock import FileLock
+
+from database import (
+    DATA_DIR,
+    TOURNAMENTS_FILE,
+    _copy_tournament,
+    _file_signature,
+    _read_json_file,
+    _read_json_file_with_signature,
+    _write_json_file,
+    flush_tournaments,
+)
+
+SHARDS_DIR = os.path.join(DATA_DIR, "tournaments")
+MANIFEST_FILE = os.path.join(SHARDS_DIR, "manifest.json")
+
+# Cache dei file gia' letti: id -> (firma del file, dati). Invalidata su inode/mtime/dimensione.
+_shard_cache: Dict[str, tuple] = {}
+_shard_cache_lock = threading.Lock()
+
+
+def _ensure_shards_dir_exists():
+    if not os.path.exists(SHARDS_DIR):
+        os.makedirs(SHARDS_DIR, exist_ok=True)
+
+
+def _shard_path(tournament_id: str) -> str:
+    # Gli ID sono UUID: rifiutiamo qualsiasi cosa possa uscire dalla directory
+    if not tournament_id or os.sep in tournament_id or tournament_id.startswith("."):
+        raise ValueError(f"Invalid tournament id: {tournament_id!r}")
+    return os.path.join(SHARDS_DIR, f"{tournament_id}.json")
+
+
+def _read_shard(tournament_id: str) -> Optional[Dict[str, Any]]:
+    """Copia del torneo (vedi database._copy_tournament): chi la modifica non altera la cache."""
+    path = _shard_path(tournament_id)
+    signature = _file_signature(path)
+    if signature is None:
+        return None
+    with _shard_cache_lock:
+        cached = _shard_cache.get(tournament_id)
+    if cached and cached[0] == signature:
+        return _copy_tournament(cached[1])
+    data, signature = _read_json_file_with_signature(path)
+    if not data:
+        return None
+    with _shard_cache_lock:
+        _shard_cache[tournament_id] = (signature, data)
+    return _copy_tournament(data)
+
+
+def _write_shard(tournament_id: str, tournament_data: Dict[str, Any]):
+    _ensure_shards_dir_exists()
+    path = _shard_path(tournament_id)
+    with FileLock(path + ".lock"):
+        # Niente indentazione: il costo di scrittura resta proporzionale al singolo torneo
+        _write_json_file(path, tournament_data, indent=None)
+    with _shard_cache_lock:
+        _shard_cache.pop(tournament_id, None)
+
+
+def _load_manifest() -> List[str]:
+    return _read_json_file(MANIFEST_FILE)
+
+
+def _update_manifest(add: Optional[str] = None, remove: Optional[str] = None):
+    _ensure_shards_dir_exists()
+    with FileLock(MANIFEST_FILE + ".lock"):
+        ids = _read_json_file(MANIFEST_FILE)
+        if add and add not in ids:
+            ids.append(add)
+        if remove and remove in ids:
+            ids.remove(remove)
+        _write_json_file(MANIFEST_FILE, ids, indent=None)
+
+
+def get_all_tournaments_db() -> List[Dict[str, Any]]:
+    tournaments = []
+    for tournament_id in _load_manifest():
+        t = _read_shard(tournament_id)
+        if t is not None:
+            tournaments.append(t)
+    return tournaments
+
+
+def get_tournament_db(tournament_id: str) -> Optional[Dict[str, Any]]:
+    try:
+        return _read_shard(tournament_id)
+    except ValueError:
+        return None
+
+
+def create_tournament_db(tournament_data: Dict[str, Any]) -> Dict[str, Any]:
+    tournament_id = tournament_data["id"]
+    _write_shard(tournament_id, tournament_data)
+    _update_manifest(add=tournament_id)
+    return tournament_data
+
+
+def update_tournament_db(tournament_id: str, tournament_update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    try:
+        path = _shard_path(tournament_id)
+    except ValueError:
+        return None
+    if not os.path.exists(path):
+        return None
+    _write_shard(tournament_id, tournament_update_data)
+    return tournament_update_data
+
+
+def delete_tournament_db(tournament_id: str) -> bool:
+    try:
+        path = _shard_path(tournament_id)
+    except ValueError:
+        return False
+    with FileLock(path + ".lock"):
+        if not os.path.exists(path):
+            return False
+        os.remove(path)
+    with _shard_cache_lock:
+        _shard_cache.pop(tournament_id, None)
+    _update_manifest(remove=tournament_id)
+    return True
+
+
+def migrate_from_monolithic() -> int:
+    """
+    Migrazione una tantum da jsondata/tournaments.json al layout sharded.
+    Non fa nulla se il manifest esiste gia'. Il file originale viene rinominato
+    in tournaments.json.migrated. Restituisce il numero di tornei migrati.
+    """
+    _ensure_shards_dir_exists()
+    if os.path.exists(MANIFEST_FILE) or not os.path.exists(TOURNAMENTS_FILE):
+        return 0
+
+    flush_tournaments()
+    with FileLock(TOURNAMENTS_FILE + ".lock"):
+        # Un altro worker avviato insieme puo' aver completato la migrazione nel frattempo
+        if os.path.exists(MANIFEST_FILE) or not os.path.exists(TOURNAMENTS_FILE):
+            return 0
+        tournaments = _read_json_file(TOURNAMENTS_FILE)
+        ids = []
+        for t in tournaments:
+            tournament_id = t.get("id")
+            if not tournament_id:
+                continue
+            _write_shard(tournament_id, t)
+            ids.append(tournament_id)
+        with FileLock(MANIFEST_FILE + ".lock"):
+            _write_json_file(MANIFEST_FILE, ids, indent=None)
+        if os.path.exists(TOURNAMENTS_FILE):
+            os.replace(TOURNAMENTS_FILE, TOURNAMENTS_FILE + ".migrated")
+    print(f"Migrated {len(ids)} tournaments to {SHARDS_DIR}")
+    return len(ids)
+
+
+if __name__ == "__main__":
+    migrate_from_monolithic()
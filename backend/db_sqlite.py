@@ -0,0 +1,438 @@
+"""
+Backend SQLite (modalita' WAL): opzione di produzione senza dipendenze esterne per
+deployment su una singola VM.
+
+Tornei, partecipanti, match, utenti e feedback hanno tabelle proprie; in WAL i lettori non
+bloccano mai lo scrittore. Le query sono stringhe costanti con parametri, quindi sqlite3 le
+compila una volta sola e le riusa dalla cache degli statement di ogni connessione.
+Il controllo della versione del torneo e la scrittura avvengono nella stessa transazione
+BEGIN IMMEDIATE, quindi il compare-and-swap e' atomico anche tra worker diversi.
+"""
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from storage_backend import (
+    SUMMARY_FIELDS, StorageBackend, VersionConflict, _to_json, parse_summary_cursor, summary_cursor,
+)
+from tournament_events import PARTICIPANT_JOINED, PLAYOFFS_GENERATED, RESULT_RECORDED
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tournaments (
+    id TEXT PRIMARY KEY,
+    user_id TEXT,
+    name TEXT,
+    tournament_type TEXT,
+    format TEXT,
+    status TEXT,
+    registration_open INTEGER,
+    invitation_link TEXT,
+    playoff_participants INTEGER,
+    total_matchdays INTEGER,
+    end_date TEXT,
+    due_date TEXT,
+    version INTEGER NOT NULL DEFAULT 0,
+    created_seq INTEGER NOT NULL DEFAULT 0,
+    teams TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_tournaments_user_id ON tournaments (user_id);
+CREATE INDEX IF NOT EXISTS ix_tournaments_invitation_link ON tournaments (invitation_link);
+
+CREATE TABLE IF NOT EXISTS participants (
+    tournament_id TEXT NOT NULL REFERENCES tournaments (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    name TEXT,
+    email TEXT,
+    ranking INTEGER,
+    PRIMARY KEY (tournament_id, id)
+);
+CREATE INDEX IF NOT EXISTS ix_participants_position ON participants (tournament_id, position);
+CREATE INDEX IF NOT EXISTS ix_participants_email ON participants (email);
+
+CREATE TABLE IF NOT EXISTS matches (
+    tournament_id TEXT NOT NULL REFERENCES tournaments (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    round_number INTEGER,
+    match_number INTEGER,
+    match_day INTEGER,
+    phase TEXT,
+    scheduled_date TEXT,
+    participant1_id TEXT,
+    participant2_id TEXT,
+    winner_id TEXT,
+    score_participant1 INTEGER,
+    score_participant2 INTEGER,
+    set1_score_participant1 INTEGER,
+    set1_score_participant2 INTEGER,
+    set2_score_participant1 INTEGER,
+    set2_score_participant2 INTEGER,
+    set3_score_participant1 INTEGER,
+    set3_score_participant2 INTEGER,
+    is_bye INTEGER,
+    status TEXT,
+    PRIMARY KEY (tournament_id, id)
+);
+CREATE INDEX IF NOT EXISTS ix_matches_position ON matches (tournament_id, position);
+CREATE INDEX IF NOT EXISTS ix_matches_tournament_day ON matches (tournament_id, match_day);
+CREATE INDEX IF NOT EXISTS ix_matches_tournament_phase ON matches (tournament_id, phase, round_number);
+CREATE INDEX IF NOT EXISTS ix_matches_tournament_phase_status ON matches (tournament_id, phase, status);
+
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    email TEXT UNIQUE,
+    username TEXT,
+    name TEXT,
+    hashed_password TEXT,
+    is_active INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS feedback (
+    id TEXT PRIMARY KEY,
+    user_id TEXT,
+    user_email TEXT,
+    feedback TEXT,
+    created_at TEXT
+);
+"""
+
+TOURNAMENT_COLUMNS = (
+    "id", "user_id", "name", "tournament_type", "format", "status", "registration_open",
+    "invitation_link", "playoff_participants", "total_matchdays", "end_date", "due_date", "version",
+    "created_seq",
+)
+PARTICIPANT_COLUMNS = ("id", "name", "email", "ranking")
+MATCH_COLUMNS = (
+    "id", "round_number", "match_number", "match_day", "phase", "scheduled_date",
+    "participant1_id", "participant2_id", "winner_id", "score_participant1", "score_participant2",
+    "set1_score_participant1", "set1_score_participant2", "set2_score_participant1",
+    "set2_score_participant2", "set3_score_participant1", "set3_score_participant2", "is_bye", "status",
+)
+USER_COLUMNS = ("id", "email", "username", "name", "hashed_password", "is_active")
+FEEDBACK_COLUMNS = ("id", "user_id", "user_email", "feedback", "created_at")
+BOOL_COLUMNS = {"registration_open", "is_bye", "is_active"}
+
+
+def _placeholders(columns) -> str:
+    return ", ".join("?" for _ in columns)
+
+
+SELECT_TOURNAMENT = f"SELECT {', '.join(TOURNAMENT_COLUMNS)}, teams, extra FROM tournaments"
+SELECT_PARTICIPANTS = f"SELECT tournament_id, {', '.join(PARTICIPANT_COLUMNS)} FROM participants"
+SELECT_MATCHES = f"SELECT tournament_id, {', '.join(MATCH_COLUMNS)} FROM matches"
+UPSERT_TOURNAMENT = (
+    f"INSERT OR REPLACE INTO tournaments ({', '.join(TOURNAMENT_COLUMNS)}, teams, extra) "
+    f"VALUES ({_placeholders(TOURNAMENT_COLUMNS)}, ?, ?)"
+)
+INSERT_PARTICIPANT = (
+    f"INSERT OR IGNORE INTO participants (tournament_id, position, {', '.join(PARTICIPANT_COLUMNS)}) "
+    f"VALUES (?, ?, {_placeholders(PARTICIPANT_COLUMNS)})"
+)
+INSERT_MATCH = (
+    f"INSERT INTO matches (tournament_id, position, {', '.join(MATCH_COLUMNS)}) "
+    f"VALUES (?, ?, {_placeholders(MATCH_COLUMNS)})"
+)
+UPSERT_MATCH = INSERT_MATCH + " ON CONFLICT (tournament_id, id) DO UPDATE SET " + ", ".join(
+    f"{c} = excluded.{c}" for c in MATCH_COLUMNS[1:]
+)
+# Riepiloghi per l'elenco: i conteggi usano solo gli indici dei figli, senza leggere i match.
+# Il filtro per utente (?4/?5) e il cursore (?1, ?2) sono opzionali; keyset su (created_seq, id).
+SUMMARY_COLUMNS = SUMMARY_FIELDS + ("participant_count", "total_group_matches", "completed_group_matches", "joined")
+SELECT_SUMMARIES = f"""
+SELECT {', '.join('t.' + c for c in SUMMARY_FIELDS)},
+    (SELECT COUNT(*) FROM participants p WHERE p.tournament_id = t.id),
+    (SELECT COUNT(*) FROM matches m WHERE m.tournament_id = t.id AND m.phase = 'group'),
+    (SELECT COUNT(*) FROM matches m WHERE m.tournament_id = t.id AND m.phase = 'group' AND m.status = 'completed'),
+    EXISTS (SELECT 1 FROM participants p WHERE p.tournament_id = t.id AND p.email = ?5)
+FROM tournaments t
+WHERE (?1 IS NULL OR (t.created_seq, t.id) > (?1, ?2))
+    AND ((?4 IS NULL AND ?5 IS NULL) OR t.user_id = ?4
+         OR EXISTS (SELECT 1 FROM participants p WHERE p.tournament_id = t.id AND p.email = ?5))
+ORDER BY t.created_seq, t.id
+LIMIT ?3 + 1
+"""
+NEXT_MATCH_POSITION = "SELECT COALESCE(MAX(position), -1) + 1 FROM matches WHERE tournament_id = ?"
+NEXT_PARTICIPANT_POSITION = "SELECT COALESCE(MAX(position), -1) + 1 FROM participants WHERE tournament_id = ?"
+
+
+_bool_columns_of = {cols: [c for c in cols if c in BOOL_COLUMNS] for cols in (
+    TOURNAMENT_COLUMNS, PARTICIPANT_COLUMNS, MATCH_COLUMNS, USER_COLUMNS, FEEDBACK_COLUMNS,
+)}
+
+
+def _row_to_dict(columns, row) -> Dict[str, Any]:
+    d = dict(zip(columns, row))
+    for c in _bool_columns_of[columns]:
+        if d[c] is not None:
+            d[c] = bool(d[c])
+    return d
+
+
+class SqliteBackend(StorageBackend):
+    indexed_match_queries = True  # indici di matches su (tournament_id, match_day) e (tournament_id, phase, ...)
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        conn = self._conn()
+        conn.executescript(SCHEMA)
+        # Database creati prima dell'introduzione delle versioni e dell'ordine di creazione
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(tournaments)")}
+        for column in ("version", "created_seq"):
+            if column not in columns:
+                conn.execute(f"ALTER TABLE tournaments ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_tournaments_created ON tournaments (created_seq, id)")
+
+    def _conn(self) -> sqlite3.Connection:
+        # Una connessione per thread: sqlite3 non condivide le connessioni tra thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, cached_statements=256)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        with self._write_lock:
+            conn = self._conn()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    # --- Tornei ---
+
+    def _load_tournaments(self, tournament_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        conn = self._conn()
+        params = (tournament_id,) if tournament_id else ()
+        where = "WHERE id = ?" if tournament_id else ""
+        child_where = "WHERE tournament_id = ?" if tournament_id else ""
+        # Snapshot coerente delle tre tabelle: in WAL la lettura non blocca gli scrittori
+        conn.execute("BEGIN")
+        try:
+            rows = conn.execute(f"{SELECT_TOURNAMENT} {where}", params).fetchall()
+            participant_rows = conn.execute(f"{SELECT_PARTICIPANTS} {child_where} ORDER BY tournament_id, position", params).fetchall()
+            match_rows = conn.execute(f"{SELECT_MATCHES} {child_where} ORDER BY tournament_id, position", params).fetchall()
+        finally:
+            conn.execute("COMMIT")
+
+        tournaments = {}
+        for row in rows:
+            t = _row_to_dict(TOURNAMENT_COLUMNS, row[:-2])
+            t["teams"] = json.loads(row[-2]) if row[-2] else []
+            t.update(json.loads(row[-1]) if row[-1] else {})
+            t["participants"] = []
+            t["matches"] = []
+            tournaments[t["id"]] = t
+        for row in participant_rows:
+            t = tournaments.get(row[0])
+            if t is not None:
+                t["participants"].append(_row_to_dict(PARTICIPANT_COLUMNS, row[1:]))
+        for row in match_rows:
+            t = tournaments.get(row[0])
+            if t is not None:
+                t["matches"].append(_row_to_dict(MATCH_COLUMNS, row[1:]))
+        return list(tournaments.values())
+
+    def _write_tournament(self, conn: sqlite3.Connection, tournament_id: str, data: Dict[str, Any]):
+        data = _to_json(data)
+        known = set(TOURNAMENT_COLUMNS) | {"teams", "participants", "matches"}
+        extra = {k: v for k, v in data.items() if k not in known}
+        conn.execute(
+            UPSERT_TOURNAMENT,
+            tuple(tournament_id if c == "id" else data.get(c) for c in TOURNAMENT_COLUMNS)
+            + (json.dumps(data.get("teams") or []), json.dumps(extra) if extra else None),
+        )
+        conn.execute("DELETE FROM participants WHERE tournament_id = ?", (tournament_id,))
+        conn.executemany(
+            INSERT_PARTICIPANT,
+            [(tournament_id, i) + tuple(p.get(c) for c in PARTICIPANT_COLUMNS)
+             for i, p in enumerate(data.get("participants") or [])],
+        )
+        conn.execute("DELETE FROM matches WHERE tournament_id = ?", (tournament_id,))
+        conn.executemany(
+            INSERT_MATCH,
+            [(tournament_id, i) + tuple(m.get(c) for c in MATCH_COLUMNS) for i, m in enumerate(data.get("matches") or [])],
+        )
+
+    def _exists(self, conn: sqlite3.Connection, tournament_id: str) -> bool:
+        return conn.execute("SELECT 1 FROM tournaments WHERE id = ?", (tournament_id,)).fetchone() is not None
+
+    def _bump_version(self, conn: sqlite3.Connection, tournament_id: str, expected_version: Optional[int]) -> Optional[int]:
+        """Compare-and-swap sulla versione (dentro la transazione): nuova versione, None se il torneo non esiste."""
+        row = conn.execute("SELECT version FROM tournaments WHERE id = ?", (tournament_id,)).fetchone()
+        if row is None:
+            return None
+        if expected_version is not None and row[0] != expected_version:
+            raise VersionConflict(tournament_id, expected_version, row[0])
+        conn.execute("UPDATE tournaments SET version = ? WHERE id = ?", (row[0] + 1, tournament_id))
+        return row[0] + 1
+
+    def get_all_tournaments(self):
+        return self._load_tournaments()
+
+    def get_tournament(self, tournament_id):
+        tournaments = self._load_tournaments(tournament_id)
+        return tournaments[0] if tournaments else None
+
+    def get_tournament_info(self, tournament_id):
+        row = self._conn().execute(f"{SELECT_TOURNAMENT} WHERE id = ?", (tournament_id,)).fetchone()
+        if row is None:
+            return None
+        t = _row_to_dict(TOURNAMENT_COLUMNS, row[:-2])
+        t.update(json.loads(row[-1]) if row[-1] else {})
+        return t
+
+    def get_tournament_version(self, tournament_id):
+        row = self._conn().execute("SELECT version FROM tournaments WHERE id = ?", (tournament_id,)).fetchone()
+        return None if row is None else row[0]
+
+    def list_tournament_summaries(self, limit, cursor=None, user_id=None, email=None):
+        created_seq, after_id = parse_summary_cursor(cursor) if cursor is not None else (None, None)
+        rows = self._conn().execute(SELECT_SUMMARIES, (created_seq, after_id, limit, user_id, email)).fetchall()
+        page = [dict(zip(SUMMARY_COLUMNS, row), joined=bool(row[-1])) for row in rows[:limit]]
+        return page, summary_cursor(page[-1]) if len(rows) > limit else None
+
+    def get_matches(self, tournament_id, match_day=None, phase=None):
+        conn = self._conn()
+        if not self._exists(conn, tournament_id):
+            return None
+        where, params = "WHERE tournament_id = ?", [tournament_id]
+        if match_day is not None:
+            where += " AND match_day = ?"
+            params.append(match_day)
+        if phase is not None:
+            where += " AND phase = ?"
+            params.append(phase)
+        rows = conn.execute(f"{SELECT_MATCHES} {where} ORDER BY position", params).fetchall()
+        return [_row_to_dict(MATCH_COLUMNS, row[1:]) for row in rows]
+
+    def create_tournament(self, tournament_data):
+        tournament_data = dict(tournament_data, version=tournament_data.get("version") or 0)
+        with self._transaction() as conn:
+            self._write_tournament(conn, tournament_data["id"], tournament_data)
+        return tournament_data
+
+    def update_tournament(self, tournament_id, tournament_data, expected_version=None):
+        with self._transaction() as conn:
+            version = self._bump_version(conn, tournament_id, expected_version)
+            if version is None:
+                return None
+            tournament_data = dict(tournament_data, version=version)
+            self._write_tournament(conn, tournament_id, tournament_data)
+        return tournament_data
+
+    def delete_tournament(self, tournament_id):
+        with self._transaction() as conn:
+            cursor = conn.execute("DELETE FROM tournaments WHERE id = ?", (tournament_id,))
+        return cursor.rowcount > 0
+
+    def record_event(self, event):
+        """Gli eventi toccano solo le righe interessate (un match, un partecipante...)."""
+        tournament_id = event["tournament_id"]
+        event_type = event["type"]
+        if event_type not in (RESULT_RECORDED, PARTICIPANT_JOINED, PLAYOFFS_GENERATED):
+            return super().record_event(event)
+
+        event = _to_json(event)
+        with self._transaction() as conn:
+            if self._bump_version(conn, tournament_id, event.get("expected_version")) is None:
+                return None
+            if event_type == PARTICIPANT_JOINED:
+                position = conn.execute(NEXT_PARTICIPANT_POSITION, (tournament_id,)).fetchone()[0]
+                p = event["participant"]
+                conn.execute(INSERT_PARTICIPANT, (tournament_id, position) + tuple(p.get(c) for c in PARTICIPANT_COLUMNS))
+            else:
+                if event_type == PLAYOFFS_GENERATED:
+                    conn.execute("DELETE FROM matches WHERE tournament_id = ? AND phase = 'playoff'", (tournament_id,))
+                position = conn.execute(NEXT_MATCH_POSITION, (tournament_id,)).fetchone()[0]
+                conn.executemany(
+                    UPSERT_MATCH,
+                    [(tournament_id, position + i) + tuple(m.get(c) for c in MATCH_COLUMNS)
+                     for i, m in enumerate(event["matches"])],
+                )
+            changes = event.get("changes") or {}
+            columns = {k: v for k, v in changes.items() if k in TOURNAMENT_COLUMNS[1:]}
+            if columns:
+                conn.execute(
+                    f"UPDATE tournaments SET {', '.join(f'{c} = ?' for c in columns)} WHERE id = ?",
+                    tuple(columns.values()) + (tournament_id,),
+                )
+            extra = {k: v for k, v in changes.items() if k not in TOURNAMENT_COLUMNS}
+            standings = event.get("standings")
+            if extra or standings:
+                # Campi senza colonna propria (es. la classifica): merge nel JSON `extra`
+                row = conn.execute("SELECT extra FROM tournaments WHERE id = ?", (tournament_id,)).fetchone()
+                extra = dict(json.loads(row[0]) if row[0] else {}, **extra)
+                if standings:
+                    extra["standings"] = dict(extra.get("standings") or {}, **standings)
+                conn.execute("UPDATE tournaments SET extra = ? WHERE id = ?", (json.dumps(extra), tournament_id))
+        return self.get_tournament(tournament_id)
+
+    # --- Utenti ---
+
+    def _get_user(self, where: str, value: str) -> Optional[Dict[str, Any]]:
+        row = self._conn().execute(f"SELECT {', '.join(USER_COLUMNS)} FROM users WHERE {where} = ?", (value,)).fetchone()
+        return _row_to_dict(USER_COLUMNS, row) if row else None
+
+    def get_user_by_email(self, email):
+        if not email:
+            return None
+        return self._get_user("email", email.lower())
+
+    def get_user_by_id(self, user_id):
+        return self._get_user("id", user_id)
+
+    def create_user(self, user_data):
+        user_data["email"] = user_data["email"].lower()
+        try:
+            with self._transaction() as conn:
+                conn.execute(
+                    f"INSERT INTO users ({', '.join(USER_COLUMNS)}) VALUES ({_placeholders(USER_COLUMNS)})",
+                    tuple(user_data.get(c) for c in USER_COLUMNS),
+                )
+        except sqlite3.IntegrityError:
+            print(f"Error: Attempting to create user with email {user_data['email']} that already exists.")
+            return None
+        return user_data
+
+    def update_user(self, user_id, user_update_data):
+        with self._transaction() as conn:
+            row = conn.execute(f"SELECT {', '.join(USER_COLUMNS)} FROM users WHERE id = ?", (user_id,)).fetchone()
+            if row is None:
+                return None
+            user = _row_to_dict(USER_COLUMNS, row)
+            user.update({k: v for k, v in user_update_data.items() if k in USER_COLUMNS})
+            user["id"] = user_id
+            if user.get("email"):
+                user["email"] = user["email"].lower()
+            conn.execute(
+                f"UPDATE users SET {', '.join(f'{c} = ?' for c in USER_COLUMNS[1:])} WHERE id = ?",
+                tuple(user[c] for c in USER_COLUMNS[1:]) + (user_id,),
+            )
+        return user
+
+    # --- Feedback ---
+
+    def save_feedback(self, feedback_data):
+        with self._transaction() as conn:
+            conn.execute(
+                f"INSERT INTO feedback ({', '.join(FEEDBACK_COLUMNS)}) VALUES ({_placeholders(FEEDBACK_COLUMNS)})",
+                tuple(feedback_data.get(c) for c in FEEDBACK_COLUMNS),
+            )
+        return feedback_data
+
+    def get_all_feedback(self):
+        rows = self._conn().execute(f"SELECT {', '.join(FEEDBACK_COLUMNS)} FROM feedback").fetchall()
+        return [_row_to_dict(FEEDBACK_COLUMNS, row) for row in rows]
@@ -0,0 +1,305 @@
+"""
+Journal append-only (JSONL) degli eventi sui tornei, con compattazione periodica.
+
+Ogni mutazione aggiunge una riga fsync'ata a jsondata/journal.jsonl invece di riscrivere
+l'intero torneo. Lo stato corrente e' lo snapshot (il normale store dei tornei) piu' gli
+eventi in coda; un compattatore in background ripiega gli eventi nello snapshot e ruota il
+journal. All'avvio (e quando un altro worker scrive) lo stato viene ricostruito da
+snapshot + coda. Gli eventi sono idempotenti (vedi tournament_events), quindi riapplicare
+una coda gia' compattata nello snapshot produce lo stesso stato finale.
+
+Il compare-and-swap sulla versione avviene sotto il file lock del journal, dopo aver letto
+le righe scritte dagli altri worker: il controllo e l'append sono quindi atomici.
+"""
+import json
+import os
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from filelock import FileLock
+
+from database import DATA_DIR, _copy_tournament, _ensure_data_dir_exists, _file_signature
+from storage_backend import SummaryEntry, VersionConflict, paginate_summaries, tournament_summary
+from tournament_events import TOURNAMENT_CREATED, TOURNAMENT_DELETED, TOURNAMENT_SAVED, apply_event
+
+JOURNAL_FILE = os.path.join(DATA_DIR, "journal.jsonl")
+# Compatta quando il journal supera questa dimensione, o comunque ogni intervallo (secondi)
+JOURNAL_COMPACT_BYTES = int(os.getenv("JOURNAL_COMPACT_BYTES", str(1024 * 1024)))
+JOURNAL_COMPACT_INTERVAL = float(os.getenv("JOURNAL_COMPACT_INTERVAL", "30"))
+# Prima riga di ogni journal: identifica la generazione del file, perche' l'inode di un
+# journal ruotato puo' essere riusato da quello nuovo
+JOURNAL_EPOCH = "journal_epoch"
+
+
+def _epoch_line() -> bytes:
+    return (json.dumps({"type": JOURNAL_EPOCH, "epoch": uuid.uuid4().hex}, separators=(",", ":")) + "\n").encode()
+
+
+def _read_epoch(filepath: str) -> Optional[bytes]:
+    """Prima riga completa del journal (None se non c'e' ancora)."""
+    try:
+        with open(filepath, "rb") as f:
+            line = f.readline(4096)
+    except FileNotFoundError:
+        return None
+    # Nei journal senza intestazione la prima riga e' un evento: ne basta l'inizio
+    return line if line.endswith(b"\n") or len(line) == 4096 else None
+
+
+class TournamentJournal:
+    def __init__(self, store, filepath: str = JOURNAL_FILE):
+        # store: modulo con l'API dei tornei (database o db_sharded) usato come snapshot
+        self.store = store
+        self.filepath = filepath
+        self._file_lock = FileLock(filepath + ".lock")
+        self._lock = threading.RLock()
+        self._signature: Optional[tuple] = None  # (inode, mtime, dimensione) all'ultima lettura
+        self._epoch: Optional[bytes] = None  # prima riga del journal letto
+        self._offset = 0
+        # Stato materializzato dei tornei toccati dalla coda: id -> dict (None = eliminato)
+        self._overlay: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._created: List[str] = []
+        # Indice dei riepiloghi per l'elenco: id -> voce, aggiornato a ogni evento applicato.
+        # None = da ricostruire (prima lettura, o journal ruotato da un altro worker)
+        self._summaries: Optional[Dict[str, SummaryEntry]] = None
+        self._compactor: Optional[threading.Thread] = None
+        self._compacting = False  # compattazione per dimensione gia' avviata (vedi append)
+        self._stop = threading.Event()
+
+    # --- Lettura della coda ---
+
+    def _reset(self):
+        self._offset = 0
+        self._overlay = {}
+        self._created = []
+
+    def _current(self, tournament_id: str) -> Optional[Dict[str, Any]]:
+        if tournament_id in self._overlay:
+            return self._overlay[tournament_id]
+        return self.store.get_tournament_db(tournament_id)
+
+    def _apply(self, event: Dict[str, Any]):
+        tournament_id = event["tournament_id"]
+        current = self._current(tournament_id)
+        if current is None and tournament_id not in self._overlay and event["type"] == TOURNAMENT_CREATED:
+            self._created.append(tournament_id)
+        tournament = self._overlay[tournament_id] = apply_event(current, event)
+        if self._summaries is not None:
+            if tournament is None:
+                self._summaries.pop(tournament_id, None)
+            else:
+                self._summaries[tournament_id] = tournament_summary(tournament)
+
+    def _catch_up(self):
+        """Applica le righe complete aggiunte al journal dall'ultima lettura (anche da altri worker)."""
+        signature = _file_signature(self.filepath)
+        if signature == self._signature:
+            return  # nessuna scrittura dall'ultima lettura
+        epoch = _read_epoch(self.filepath)
+        rotated = (
+            signature is None
+            or signature[2] < self._offset
+            or (self._epoch is not None and epoch != self._epoch)
+        )
+        if rotated or self._signature is None:
+            # Journal ruotato da una compattazione: lo snapshot contiene gia' la vecchia coda.
+            # Se l'ha ruotato un altro worker, la coda puo' contenere eventi mai letti da questo
+            # processo e l'indice va ricostruito (compact() azzera prima la firma e lo mantiene)
+            if self._signature is not None:
+                self._summaries = None
+            self._reset()
+        self._signature = signature
+        self._epoch = epoch
+        if signature is None or signature[2] <= self._offset:
+            return
+        with open(self.filepath, "rb") as f:
+            f.seek(self._offset)
+            chunk = f.read()
+        end = chunk.rfind(b"\n") + 1  # una riga non terminata e' un append ancora in corso
+        for line in chunk[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                event = json.loads(line)
+            except ValueError:
+                # Resto di un append interrotto da un crash prima del troncamento (vedi append)
+                print(f"Warning: skipping undecodable line in {self.filepath}: {line[:80]!r}")
+                continue
+            if event.get("type") == JOURNAL_EPOCH:
+                continue
+            self._apply(event)
+        self._offset += end
+
+    def _truncate_torn_tail(self):
+        """
+        Da chiamare con il file lock, dopo _catch_up: nessun altro sta scrivendo, quindi i byte
+        oltre l'ultima riga completa sono un append interrotto (crash a meta' scrittura). Vanno
+        tolti prima di aggiungere la riga successiva, che altrimenti verrebbe saldata a quella
+        troncata.
+        """
+        signature = _file_signature(self.filepath)
+        if signature is not None and signature[2] > self._offset:
+            print(f"Warning: truncating {signature[2] - self._offset} bytes of an interrupted append to {self.filepath}")
+            os.truncate(self.filepath, self._offset)
+
+    # --- Scrittura ---
+
+    def append(self, event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Scrive l'evento e restituisce il torneo risultante. Gli eventi su un torneo inesistente
+        non vengono scritti (None); se la versione attesa non corrisponde solleva VersionConflict.
+        """
+        tournament_id = event["tournament_id"]
+        _ensure_data_dir_exists()
+        with self._lock, self._file_lock:
+            self._catch_up()
+            if event["type"] != TOURNAMENT_CREATED:
+                current = self._current(tournament_id)
+                if current is None:
+                    return None
+                version = current.get("version", 0)
+                expected_version = event.get("expected_version")
+                if expected_version is not None and expected_version != version:
+                    raise VersionConflict(tournament_id, expected_version, version)
+                event = dict(event, version=version + 1)
+            event = dict(event, ts=datetime.now(timezone.utc).isoformat())
+            line = (json.dumps(event, default=str, separators=(",", ":")) + "\n").encode()
+            self._truncate_torn_tail()
+            if self._offset == 0:
+                line = _epoch_line() + line
+            fd = os.open(self.filepath, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            self._catch_up()
+            tournament = self._overlay.get(tournament_id)
+            if tournament is not None:
+                tournament = _copy_tournament(tournament)
+            # Una sola compattazione per dimensione alla volta: gli append successivi che
+            # trovano il journal ancora grande la lasciano finire (o al compattatore periodico)
+            compact_now = self._offset >= JOURNAL_COMPACT_BYTES and not self._compacting
+            if compact_now:
+                self._compacting = True
+        self.start_compactor()
+        if compact_now:
+            threading.Thread(target=self._compact_once, daemon=True).start()
+        return tournament
+
+    def _compact_once(self):
+        try:
+            self.compact()
+        except Exception as e:
+            print(f"Warning: journal compaction failed: {e}")
+        finally:
+            with self._lock:
+                self._compacting = False
+
+    def compact(self):
+        """Ripiega la coda nello snapshot e ruota il journal."""
+        with self._lock, self._file_lock:
+            self._catch_up()
+            if not self._overlay:
+                return
+            for tournament_id, tournament in self._overlay.items():
+                if tournament is None:
+                    self.store.delete_tournament_db(tournament_id)
+                elif self.store.update_tournament_db(tournament_id, tournament) is None:
+                    self.store.create_tournament_db(tournament)
+            flush = getattr(self.store, "flush_tournaments", None)
+            if flush:
+                flush()
+            # Nuovo inode: gli altri worker scartano la vecchia coda e rileggono lo snapshot
+            tmp_path = self.filepath + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(_epoch_line())
+            os.replace(tmp_path, self.filepath)
+            self._signature = None
+            self._catch_up()
+
+    def start_compactor(self):
+        if self._compactor is not None:
+            return
+
+        def run():
+            while not self._stop.wait(JOURNAL_COMPACT_INTERVAL):
+                try:
+                    self.compact()
+                except Exception as e:
+                    print(f"Warning: journal compaction failed: {e}")
+
+        self._compactor = threading.Thread(target=run, daemon=True)
+        self._compactor.start()
+
+    # --- API dei tornei ---
+
+    def get_tournament(self, tournament_id: str) -> Optional[Dict[str, Any]]:
+        """Copia del torneo (vedi database._copy_tournament): chi la modifica non altera l'overlay."""
+        with self._lock:
+            self._catch_up()
+            if tournament_id in self._overlay:
+                tournament = self._overlay[tournament_id]
+                return None if tournament is None else _copy_tournament(tournament)
+        return self.store.get_tournament_db(tournament_id)
+
+    def get_all_tournaments(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._catch_up()
+            overlay = dict(self._overlay)
+            created = list(self._created)
+        tournaments = []
+        for t in self.store.get_all_tournaments_db():
+            tournament_id = t.get("id")
+            if tournament_id in overlay:
+                t = overlay[tournament_id]
+                if t is not None:
+                    t = _copy_tournament(t)
+            if t is not None:
+                tournaments.append(t)
+        tournaments.extend(_copy_tournament(overlay[tid]) for tid in created if overlay.get(tid) is not None)
+        return tournaments
+
+    def _summary_index(self) -> Dict[str, SummaryEntry]:
+        """Indice dei riepiloghi aggiornato alla coda del journal (da chiamare con self._lock)."""
+        self._catch_up()
+        if self._summaries is None:
+            self._summaries = {t["id"]: tournament_summary(t) for t in self.get_all_tournaments()}
+        return self._summaries
+
+    def get_tournament_version(self, tournament_id: str) -> Optional[int]:
+        """Dall'indice dei riepiloghi, senza leggere il torneo dallo snapshot."""
+        with self._lock:
+            entry = self._summary_index().get(tournament_id)
+        return None if entry is None else entry[0].get("version", 0)
+
+    def list_tournament_summaries(
+        self, limit: int, cursor: Optional[str] = None, user_id: Optional[str] = None, email: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        with self._lock:
+            entries = list(self._summary_index().values())
+        return paginate_summaries(entries, limit, cursor, user_id, email)
+
+    def create_tournament(self, tournament_data: Dict[str, Any]) -> Dict[str, Any]:
+        self.append({"type": TOURNAMENT_CREATED, "tournament_id": tournament_data["id"], "tournament": tournament_data})
+        return tournament_data
+
+    def update_tournament(
+        self, tournament_id: str, tournament_update_data: Dict[str, Any], expected_version: Optional[int] = None
+    ) -> Optional[Dict[str, Any]]:
+        return self.append({
+            "type": TOURNAMENT_SAVED, "tournament_id": tournament_id, "tournament": tournament_update_data,
+            "expected_version": expected_version,
+        })
+
+    def delete_tournament(self, tournament_id: str) -> bool:
+        if self.get_tournament(tournament_id) is None:
+            return False
+        self.append({"type": TOURNAMENT_DELETED, "tournament_id": tournament_id})
+        return True
+
+    def record_event(self, event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Aggiunge un evento di dominio (risultato, iscrizione, playoff) e restituisce il torneo aggiornato."""
+        return self.append(event)
@@ -0,0 +1,296 @@
+"""
+Aggiornamenti in tempo reale dei tornei, inviati ai client come Server-Sent Events.
+
+Dopo ogni scrittura riuscita database_adapter notifica l'evento di dominio (vedi
+tournament_events) con la versione assegnata dallo storage; qui diventa un delta per i client
+(match modificati, righe di classifica cambiate, nuovo partecipante, playoff generati) e
+viene serializzato una sola volta, poi distribuito alla coda di ogni client collegato a quel
+torneo. Update completi ed eliminazioni arrivano senza contenuto: il client rilegge il torneo.
+
+Il client applica un delta solo se la sua versione e' quella immediatamente precedente;
+altrimenti (evento perso, coda piena, riconnessione) rilegge il torneo con un GET condizionale.
+
+Con piu' worker (LIVE_BROKER=file) ogni evento viene anche aggiunto a un file append-only
+condiviso che ogni worker con client collegati rilegge ogni LIVE_POLL_INTERVAL secondi:
+sostituto locale di un broker esterno (Redis pub/sub, LISTEN/NOTIFY di PostgreSQL) con la
+stessa interfaccia publish/subscribe.
+"""
+import asyncio
+import json
+import os
+import queue
+import threading
+import uuid
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from filelock import FileLock
+
+import tournament_events
+from database import DATA_DIR, _ensure_data_dir_exists
+from database_adapter import tournament_event_listeners
+
+LIVE_BROKER = os.getenv("LIVE_BROKER", "local")
+LIVE_EVENTS_FILE = os.path.join(DATA_DIR, "live_events.jsonl")
+# Eventi in attesa per client: oltre, il client riceve `resync` e rilegge il torneo
+LIVE_QUEUE_SIZE = int(os.getenv("LIVE_QUEUE_SIZE", "64"))
+# Commento SSE inviato senza eventi, perche' proxy e load balancer non chiudano la connessione
+LIVE_HEARTBEAT_INTERVAL = float(os.getenv("LIVE_HEARTBEAT_INTERVAL", "15"))
+LIVE_POLL_INTERVAL = float(os.getenv("LIVE_POLL_INTERVAL", "0.1"))
+# Il file condiviso viene ricreato vuoto oltre questa dimensione
+LIVE_EVENTS_MAX_BYTES = int(os.getenv("LIVE_EVENTS_MAX_BYTES", str(1024 * 1024)))
+# Attesa suggerita a EventSource prima di riconnettersi (millisecondi)
+LIVE_RETRY_MS = 3000
+
+RESYNC = "resync"
+HELLO = "hello"
+
+# (tipo dell'evento, messaggio SSE gia' serializzato)
+Frame = Tuple[str, str]
+
+
+def to_delta(event: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Evento di dominio -> delta per i client. Gli eventi portano gia' solo le parti cambiate
+    (per un risultato: i match e le righe della classifica toccati), senza expected_version.
+    """
+    return {k: v for k, v in event.items() if k != "expected_version"}
+
+
+def format_sse(event_type: str, data: Dict[str, Any], event_id: Optional[int] = None, retry: Optional[int] = None) -> str:
+    lines = []
+    if retry is not None:
+        lines.append(f"retry: {retry}")
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event_type}")
+    lines.append("data: " + json.dumps(data, default=str, separators=(",", ":")))
+    return "\n".join(lines) + "\n\n"
+
+
+def to_frame(delta: Dict[str, Any]) -> Frame:
+    event_id = None if delta["type"] == tournament_events.TOURNAMENT_DELETED else delta.get("version")
+    return delta["type"], format_sse(delta["type"], delta, event_id)
+
+
+class Subscription:
+    """Coda limitata di un client: se si riempie gli eventi vengono scartati e il client riceve `resync`."""
+
+    def __init__(self, tournament_id: str, maxsize: int = LIVE_QUEUE_SIZE):
+        self.tournament_id = tournament_id
+        self._queue: "asyncio.Queue[Frame]" = asyncio.Queue(maxsize)
+        self._overflowed = False
+
+    def put(self, frame: Frame):
+        if self._overflowed:
+            return
+        try:
+            self._queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            self._overflowed = True
+
+    async def get(self) -> Frame:
+        if self._overflowed:
+            # La coda e' piena, quindi nessuno e' in attesa su get(): si puo' sostituire
+            self._queue = asyncio.Queue(self._queue.maxsize)
+            self._overflowed = False
+            return RESYNC, format_sse(RESYNC, {"tournament_id": self.tournament_id})
+        return await self._queue.get()
+
+
+class LiveBroker:
+    """Fan-out in-process: gli eventi di un torneo vanno alle code dei client collegati a quel torneo."""
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+
+    def subscribe(self, tournament_id: str) -> Subscription:
+        subscription = Subscription(tournament_id)
+        self._subscribers.setdefault(tournament_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscribers = self._subscribers.get(subscription.tournament_id)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.tournament_id]
+
+    def subscriber_count(self, tournament_id: str) -> int:
+        return len(self._subscribers.get(tournament_id, ()))
+
+    def publish(self, event: Dict[str, Any]):
+        """Listener di database_adapter: chiamato nell'event loop dopo ogni scrittura riuscita."""
+        self.deliver(to_delta(event))
+
+    def deliver(self, delta: Dict[str, Any]):
+        subscribers = self._subscribers.get(delta["tournament_id"])
+        if not subscribers:
+            return
+        frame = to_frame(delta)  # serializzato una volta per tutti i client
+        for subscription in list(subscribers):
+            subscription.put(frame)
+
+
+class FileBroker(LiveBroker):
+    """
+    LiveBroker condiviso tra worker tramite un file append-only: ogni worker consegna subito
+    i propri eventi ai suoi client e legge quelli degli altri worker (campo `origin`).
+    Nell'event loop resta solo la consegna alle code: le righe vengono scritte da un thread
+    dedicato (uno solo, cosi' restano nell'ordine delle versioni) e lette in un thread del pool.
+    """
+
+    def __init__(self, filepath: str = LIVE_EVENTS_FILE):
+        super().__init__()
+        self.filepath = filepath
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._file_lock = FileLock(filepath + ".lock")
+        self._inode: Optional[int] = None
+        self._offset = 0
+        self._follower: Optional["asyncio.Task[None]"] = None
+        self._pending: "queue.SimpleQueue[bytes]" = queue.SimpleQueue()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+
+    def subscribe(self, tournament_id: str) -> Subscription:
+        self._start_follower()
+        return super().subscribe(tournament_id)
+
+    def publish(self, event: Dict[str, Any]):
+        delta = to_delta(event)
+        self.deliver(delta)
+        self._start_writer()
+        self._pending.put((json.dumps({"origin": self.origin, "event": delta}, default=str, separators=(",", ":")) + "\n").encode())
+
+    def _append(self, data: bytes):
+        _ensure_data_dir_exists()
+        with self._file_lock:
+            # Nessun fsync: gli eventi persi in un crash si recuperano rileggendo il torneo
+            fd = os.open(self.filepath, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, data)
+                size = os.fstat(fd).st_size
+            finally:
+                os.close(fd)
+            if size >= LIVE_EVENTS_MAX_BYTES:
+                tmp_path = self.filepath + ".tmp"
+                open(tmp_path, "wb").close()
+                os.replace(tmp_path, self.filepath)
+
+    def _start_writer(self):
+        if self._writer is not None:
+            return
+
+        def run():
+            while True:
+                lines = [self._pending.get()]
+                # Le righe accumulate nel frattempo vanno nello stesso append
+                while True:
+                    try:
+                        lines.append(self._pending.get_nowait())
+                    except queue.Empty:
+                        break
+                try:
+                    self._append(b"".join(lines))
+                except Exception as e:
+                    print(f"Warning: live events append failed: {e}")
+
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=run, daemon=True)
+                self._writer.start()
+
+    def refresh(self):
+        """Consegna gli eventi aggiunti dagli altri worker dall'ultima lettura."""
+        for delta in self._read_new():
+            self.deliver(delta)
+
+    def _read_new(self) -> List[Dict[str, Any]]:
+        """Delta scritti dagli altri worker dall'ultima lettura (I/O su file, fuori dall'event loop)."""
+        try:
+            st = os.stat(self.filepath)
+        except FileNotFoundError:
+            return []
+        if st.st_ino != self._inode:
+            # File ricreato: le righe non ancora lette del vecchio sono perse, e i client
+            # interessati lo scoprono dal salto di versione
+            self._inode, self._offset = st.st_ino, 0
+        if st.st_size <= self._offset:
+            return []
+        with open(self.filepath, "rb") as f:
+            f.seek(self._offset)
+            chunk = f.read()
+        end = chunk.rfind(b"\n") + 1  # una riga non terminata e' un append ancora in corso
+        self._offset += end
+        deltas = []
+        for line in chunk[:end].splitlines():
+            if not line.strip():
+                continue
+            # Una riga illeggibile viene saltata, senza perdere le altre del blocco
+            try:
+                entry = json.loads(line)
+                if entry["origin"] != self.origin:
+                    deltas.append(entry["event"])
+            except (ValueError, KeyError, TypeError) as e:
+                print(f"Warning: skipping bad live event line: {e}")
+        return deltas
+
+    def _start_follower(self):
+        if self._follower is not None:
+            return
+        # Si parte dalla fine: gli eventi precedenti non interessano ai client appena collegati
+        try:
+            st = os.stat(self.filepath)
+            self._inode, self._offset = st.st_ino, st.st_size
+        except FileNotFoundError:
+            self._inode, self._offset = None, 0
+
+        async def run():
+            loop = asyncio.get_running_loop()
+            while True:
+                await asyncio.sleep(LIVE_POLL_INTERVAL)
+                if not self._subscribers:
+                    continue
+                try:
+                    deltas = await loop.run_in_executor(None, self._read_new)
+                except Exception as e:
+                    print(f"Warning: live events refresh failed: {e}")
+                    continue
+                for delta in deltas:
+                    self.deliver(delta)
+
+        self._follower = asyncio.get_running_loop().create_task(run())
+
+
+def get_broker(kind: str = LIVE_BROKER) -> LiveBroker:
+    if kind == "file":
+        return FileBroker()
+    if kind == "local":
+        return LiveBroker()
+    raise ValueError(f"Unsupported LIVE_BROKER: {kind}")
+
+
+broker = get_broker()
+tournament_event_listeners.append(broker.publish)
+
+
+async def event_stream(subscription: Subscription, version: int) -> AsyncIterator[str]:
+    """
+    Flusso SSE di un client: `hello` con la versione corrente, poi i delta del torneo. Il
+    client va iscritto prima di leggere la versione, cosi' nessuna scrittura resta nel mezzo
+    (i delta con versione gia' nota vengono ignorati dal client).
+    """
+    try:
+        yield format_sse(
+            HELLO, {"tournament_id": subscription.tournament_id, "version": version}, version, LIVE_RETRY_MS
+        )
+        while True:
+            try:
+                event_type, frame = await asyncio.wait_for(subscription.get(), LIVE_HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            yield frame
+            if event_type == tournament_events.TOURNAMENT_DELETED:
+                return
+    finally:
+        broker.unsubscribe(subscription)
@@ -5,6 +5,10 @@ load_dotenv()
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
+from auth import get_auth_cache_stats
+from compression import CompressionMiddleware
+from database_adapter import backend
+from passwords import get_password_executor_stats
 from routers import tournaments, users, feedback
 
 app = FastAPI(
@@ -15,8 +19,10 @@ app = FastAPI(
 
 @app.middleware("http")
 async def add_no_cache_header(request: Request, call_next):
+    # Default per le GET senza una politica propria (dati per utente, elenchi): no-store.
+    # Le GET di un torneo impostano Cache-Control ed ETag (vedi routers/tournaments.py)
     response = await call_next(request)
-    if request.method == "GET":
+    if request.method == "GET" and "cache-control" not in response.headers:
         response.headers["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0"
         response.headers["Pragma"] = "no-cache"
         response.headers["Expires"] = "0"
@@ -35,7 +41,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
+# Ultimo aggiunto = piu' esterno: comprime le risposte gia' complete di tutti gli header
+app.add_middleware(CompressionMiddleware)
 
 app.include_router(tournaments.router, prefix="/api/tournaments", tags=["tournaments"])
 app.include_router(users.router, prefix="/api/users", tags=["users"])
@@ -45,6 +54,16 @@ app.include_router(feedback.router, prefix="/api/feedback", tags=["feedback"])
 def read_root():
     return {"message": "Backend is running!"}
 
+@app.get("/api/health")
+def health():
+    # Contatori del worker che risponde (uno per processo uvicorn), per il monitoraggio
+    return {
+        "status": "ok",
+        "password_hashing": get_password_executor_stats(),
+        "auth_cache": get_auth_cache_stats(),
+        "tournament_cache": backend.cache_stats(),
+    }
+
 if __name__ == "__main__":
     import uvicorn
 
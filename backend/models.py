@@ -1,7 +1,20 @@
+import os
 import uuid
 from datetime import datetime
-from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator
-from typing import List, Literal, Optional
+from pydantic import BaseModel, EmailStr, Field, TypeAdapter, field_validator, model_validator
+from typing import Any, Dict, List, Literal, Optional, Type, TypeVar, get_args, get_origin
+
+# I dati letti dallo storage sono stati validati in scrittura: vengono caricati senza
+# rivalidazione (vedi construct_trusted). TRUSTED_STORAGE_LOADS=0 torna alla validazione completa.
+TRUSTED_STORAGE_LOADS = os.getenv("TRUSTED_STORAGE_LOADS", "1") == "1"
+
+
+# Criteri di classifica del girone, applicati in ordine (vedi services/standings_engine.py)
+Tiebreaker = Literal['wins', 'head_to_head', 'set_ratio', 'score_diff', 'score_for']
+DEFAULT_TIEBREAKERS = ['wins', 'score_diff']
+
+MatchPhase = Literal['group', 'playoff']
+MatchStatus = Literal['pending', 'in_progress', 'completed', 'cancelled']
 
 
 class Participant(BaseModel):
@@ -27,7 +40,7 @@ class Match(BaseModel):
     round_number: Optional[int] = None
     match_number: Optional[int] = None
     match_day: Optional[int] = None  # For round robin scheduling
-    phase: Literal['group', 'playoff'] = 'group'  # Tournament phase
+    phase: MatchPhase = 'group'  # Tournament phase
     scheduled_date: Optional[datetime] = None  # Scheduled match time
     participant1_id: Optional[str] = None  # For singles or team1_id for doubles
     participant2_id: Optional[str] = None  # For singles or team2_id for doubles
@@ -41,7 +54,16 @@ class Match(BaseModel):
     set3_score_participant1: Optional[int] = None
     set3_score_participant2: Optional[int] = None
     is_bye: bool = False
-    status: Literal['pending', 'in_progress', 'completed', 'cancelled'] = 'pending'
+    status: MatchStatus = 'pending'
+
+
+class Standing(BaseModel):
+    """Totali di girone di un partecipante (o squadra), aggiornati a ogni risultato."""
+    played: int = 0
+    wins: int = 0
+    losses: int = 0
+    score_for: int = 0
+    score_against: int = 0
 
 
 class MatchResult(BaseModel):
@@ -106,6 +128,8 @@ class TournamentCreate(BaseModel):
     format: Literal['round_robin'] = 'round_robin'
     end_date: Optional[datetime] = None
     playoff_participants: int = 4
+    tiebreakers: List[Tiebreaker] = DEFAULT_TIEBREAKERS
+    double_round_robin: bool = False  # Andata e ritorno, con casa/trasferta bilanciate
 
     class Config:
         from_attributes = True
@@ -127,6 +151,114 @@ class Tournament(BaseModel):
     invitation_link: Optional[str] = None
     playoff_participants: int = 4
     total_matchdays: Optional[int] = None
+    double_round_robin: bool = False
+    # Classifica del girone per id partecipante/squadra; None = torneo salvato prima
+    # dell'aggregato, viene ricalcolata dai match al primo risultato
+    standings: Optional[Dict[str, Standing]] = None
+    tiebreakers: List[Tiebreaker] = DEFAULT_TIEBREAKERS
+    version: int = 0  # Incrementata dallo storage a ogni scrittura (compare-and-swap)
+    # Istante di creazione (ns): ordine stabile dell'elenco paginato; 0 = torneo creato prima
+    created_seq: int = 0
 
     class Config:
         from_attributes = True
+
+
+class TournamentSummary(BaseModel):
+    """Riga dell'elenco dei tornei: niente partecipanti ne' match, solo conteggi."""
+    id: str
+    user_id: str
+    name: str
+    tournament_type: Literal['single', 'double']
+    format: Literal['elimination', 'round_robin'] = 'round_robin'
+    status: Literal['open', 'group_stage', 'playoffs', 'completed'] = 'open'
+    participant_count: int = 0
+    total_group_matches: int = 0
+    completed_group_matches: int = 0
+    version: int = 0
+    joined: bool = False  # L'utente autenticato e' tra i partecipanti
+
+
+class TournamentPage(BaseModel):
+    items: List[TournamentSummary]
+    next_cursor: Optional[str] = None  # Da passare come `cursor` per la pagina successiva
+
+
+class MatchPage(BaseModel):
+    items: List[Match]
+    next_cursor: Optional[str] = None  # Da passare come `cursor` per la pagina successiva
+
+
+# --- Caricamento dallo storage senza rivalidazione ---
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+_datetime_adapter = TypeAdapter(datetime)
+_load_plans: Dict[type, tuple] = {}
+
+
+def _load_plan(cls) -> tuple:
+    """Per ogni modello: campi, campi datetime e campi annidati (liste/dict di modelli o liste da copiare)."""
+    plan = _load_plans.get(cls)
+    if plan is None:
+        datetime_fields, nested = [], []
+        for name, field in cls.model_fields.items():
+            annotation = field.annotation
+            if get_origin(annotation) is not None and type(None) in get_args(annotation):  # Optional[X]
+                annotation = next(a for a in get_args(annotation) if a is not type(None))
+            origin, args = get_origin(annotation), get_args(annotation)
+            if annotation is datetime:
+                datetime_fields.append(name)
+            elif origin is list:
+                item = args[0] if args else None
+                nested.append((name, list, item if isinstance(item, type) and issubclass(item, BaseModel) else None))
+            elif origin is dict and args and isinstance(args[1], type) and issubclass(args[1], BaseModel):
+                nested.append((name, dict, args[1]))
+        plan = _load_plans[cls] = (tuple(cls.model_fields), frozenset(cls.model_fields), datetime_fields, nested)
+    return plan
+
+
+def construct_trusted(cls: Type[ModelT], data: Dict[str, Any]) -> ModelT:
+    """
+    Costruisce il modello da un dict letto dallo storage senza rivalidarlo: nessun parsing di
+    EmailStr, Literal o validator, per torneo e per ogni partecipante e match. I campi mancanti
+    (dati salvati prima che esistessero) prendono il default, le chiavi sconosciute vengono
+    ignorate e le date salvate come stringa ISO vengono convertite. I dict annidati vengono
+    copiati, quindi modificare il modello non tocca le cache dello storage.
+
+    Solo per dati gia' validati in scrittura: l'input degli utenti passa sempre dai modelli.
+    """
+    if not TRUSTED_STORAGE_LOADS:
+        return cls.model_validate(data)
+    names, name_set, datetime_fields, nested = _load_plan(cls)
+    if len(data) == len(names) and data.keys() >= name_set:
+        values = dict(data)  # Caso comune: dict prodotto da model_dump, stesse chiavi nello stesso ordine
+        fields_set = set(name_set)
+    elif data.keys() >= name_set:
+        values = {name: data[name] for name in names}
+        fields_set = set(name_set)
+    else:
+        fields = cls.model_fields
+        values = {
+            name: data[name] if name in data else fields[name].get_default(call_default_factory=True)
+            for name in names
+        }
+        fields_set = name_set.intersection(data)
+    for name in datetime_fields:
+        if isinstance(values[name], str):
+            values[name] = _datetime_adapter.validate_python(values[name])
+    for name, kind, item_cls in nested:
+        value = values[name]
+        if value is None:
+            continue
+        if kind is dict:
+            values[name] = {k: construct_trusted(item_cls, v) for k, v in value.items()}
+        elif item_cls is not None:
+            values[name] = [construct_trusted(item_cls, v) for v in value]
+        else:
+            values[name] = list(value)
+    obj = cls.__new__(cls)
+    object.__setattr__(obj, "__dict__", values)
+    object.__setattr__(obj, "__pydantic_fields_set__", fields_set)
+    object.__setattr__(obj, "__pydantic_extra__", None)
+    object.__setattr__(obj, "__pydantic_private__", None)
+    return obj
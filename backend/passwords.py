@@ -0,0 +1,95 @@
+"""
+Hash e verifica delle password (bcrypt) fuori dall'event loop.
+
+bcrypt costa centinaia di millisecondi per chiamata: login e registrazioni vengono eseguiti in
+un pool di processi dedicato e limitato (PASSWORD_HASH_WORKERS), separato dal pool dello
+storage, cosi' un'ondata di login non blocca le altre richieste ne' occupa i thread dello
+storage. Le richieste oltre la capacita' del pool restano in coda: profondita' della coda e
+attese sono esposte da get_password_executor_stats() (GET /api/health).
+
+Il modulo importa solo passlib, perche' i processi del pool lo reimportano all'avvio.
+"""
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional
+
+from passlib.context import CryptContext
+
+# Fattore di costo di bcrypt (2^rounds iterazioni): vale per i nuovi hash, quelli esistenti
+# vengono verificati con il costo con cui sono stati creati
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# 0 = hash nell'event loop (solo per test e benchmark)
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+
+def verify_password(plain_password, hashed_password):
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def get_password_hash(password):
+    return pwd_context.hash(password)
+
+
+def _timed(fn, *args):
+    """Eseguita nel processo del pool: restituisce anche l'istante di inizio, per misurare l'attesa in coda."""
+    return time.time(), fn(*args)
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+_stats = {"in_flight": 0, "peak_in_flight": 0, "completed": 0, "total_wait": 0.0, "max_wait": 0.0}
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn: i processi partono puliti, senza ereditare thread e lock del worker uvicorn
+        _executor = ProcessPoolExecutor(
+            max_workers=PASSWORD_HASH_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+async def _run(fn, *args):
+    if PASSWORD_HASH_WORKERS <= 0:
+        return fn(*args)
+    loop = asyncio.get_running_loop()
+    _stats["in_flight"] += 1
+    _stats["peak_in_flight"] = max(_stats["peak_in_flight"], _stats["in_flight"])
+    submitted = time.time()
+    try:
+        started, result = await loop.run_in_executor(_get_executor(), _timed, fn, *args)
+    finally:
+        _stats["in_flight"] -= 1
+    wait = max(0.0, started - submitted)
+    _stats["completed"] += 1
+    _stats["total_wait"] += wait
+    _stats["max_wait"] = max(_stats["max_wait"], wait)
+    return result
+
+
+async def verify_password_async(plain_password, hashed_password) -> bool:
+    return await _run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password) -> str:
+    return await _run(get_password_hash, password)
+
+
+def get_password_executor_stats() -> Dict[str, Any]:
+    """Profondita' della coda (richieste oltre i processi disponibili) e tempi di attesa."""
+    completed = _stats["completed"]
+    return {
+        "workers": PASSWORD_HASH_WORKERS,
+        "bcrypt_rounds": BCRYPT_ROUNDS,
+        "in_flight": _stats["in_flight"],
+        "queue_depth": max(0, _stats["in_flight"] - PASSWORD_HASH_WORKERS),
+        "peak_queue_depth": max(0, _stats["peak_in_flight"] - PASSWORD_HASH_WORKERS),
+        "completed": completed,
+        "avg_queue_wait_ms": _stats["total_wait"] / completed * 1000 if completed else 0.0,
+        "max_queue_wait_ms": _stats["max_wait"] * 1000,
+    }
@@ -0,0 +1,182 @@
+"""
+Registro dei token revocati (logout), indicizzato per `jti`.
+
+Il controllo a ogni richiesta autenticata e' una lookup in un dict in memoria (jti -> exp) e
+non tocca mai il disco. Ogni revoca viene aggiunta come riga JSON a un file append-only; un
+thread in background rilegge ogni REVOKED_TOKENS_REFRESH_INTERVAL secondi le righe scritte
+dagli altri worker, scarta le voci gia' scadute (un token scaduto viene comunque rifiutato da
+jwt.decode) e riscrive il file quando e' composto soprattutto da voci scadute.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from filelock import FileLock
+from jose import JWTError, jwt
+
+REVOKED_TOKENS_FILE = "revoked_tokens.jsonl"
+LEGACY_REVOKED_TOKENS_FILE = "revoked_tokens.json"  # Lista di JWT completi, mai potata
+REVOKED_TOKENS_REFRESH_INTERVAL = float(os.getenv("REVOKED_TOKENS_REFRESH_INTERVAL", "1"))
+# Il file viene compattato solo oltre questo numero di righe, se meno della meta' e' ancora valida
+REVOKED_TOKENS_COMPACT_MIN_LINES = 1000
+
+
+def token_id(token: str, claims: Dict[str, Any]) -> str:
+    """jti del token; i token emessi prima dell'introduzione del jti sono identificati dal loro hash."""
+    return claims.get("jti") or hashlib.sha256(token.encode()).hexdigest()
+
+
+class RevokedTokenRegistry:
+    def __init__(self, filepath: str = REVOKED_TOKENS_FILE, legacy_filepath: Optional[str] = LEGACY_REVOKED_TOKENS_FILE):
+        self.filepath = filepath
+        self._file_lock = FileLock(filepath + ".lock")
+        self._lock = threading.Lock()
+        self._revoked: Dict[str, float] = {}
+        self._inode: Optional[int] = None
+        self._offset = 0
+        self._lines = 0
+        self._refresher: Optional[threading.Thread] = None
+        if legacy_filepath:
+            self._migrate_legacy(legacy_filepath)
+        self.refresh()
+
+    def _migrate_legacy(self, legacy_filepath: str):
+        """Converte il vecchio revoked_tokens.json (token completi) in righe jti/exp, tenendo solo quelle valide."""
+        if not os.path.exists(legacy_filepath):
+            return
+        with self._file_lock:
+            try:
+                with open(legacy_filepath, "r") as f:
+                    tokens = json.load(f)
+            except FileNotFoundError:
+                return  # Gia' migrato da un altro worker
+            except json.JSONDecodeError:
+                tokens = []
+            now = time.time()
+            with open(self.filepath, "a") as f:
+                for token in tokens:
+                    try:
+                        claims = jwt.get_unverified_claims(token)
+                    except JWTError:
+                        continue
+                    if claims.get("exp", 0) > now:
+                        f.write(json.dumps({"jti": token_id(token, claims), "exp": claims["exp"]}) + "\n")
+            os.replace(legacy_filepath, legacy_filepath + ".migrated")
+
+    # --- API ---
+
+    def is_revoked(self, jti: str) -> bool:
+        self._start_refresher()
+        return jti in self._revoked
+
+    def revoke(self, jti: str, exp: float):
+        if exp <= time.time():
+            return  # Gia' scaduto: jwt.decode lo rifiuta comunque
+        with self._file_lock:
+            self._append(jti, exp)
+        with self._lock:
+            self._revoked[jti] = exp
+        self._start_refresher()
+
+    def revoke_if_active(self, jti: str, exp: float, *related: str) -> bool:
+        """
+        Revoca jti solo se ne' lui ne' le chiavi `related` (es. la famiglia di un refresh token)
+        sono gia' revocati. Controllo e revoca avvengono in un unico passo sotto il lock del file,
+        dopo aver riletto le righe aggiunte dagli altri worker: di due richieste concorrenti con
+        lo stesso token ne passa una sola. Restituisce False se era gia' revocato.
+        Scrive su disco con fsync: dal codice async va chiamato fuori dall'event loop.
+        """
+        with self._file_lock:
+            with self._lock:
+                self._read_new_lines(time.time())
+                if any(key in self._revoked for key in (jti,) + related):
+                    return False
+                if exp > time.time():
+                    self._append(jti, exp)
+                    self._revoked[jti] = exp
+        self._start_refresher()
+        return True
+
+    def _append(self, jti: str, exp: float):
+        """Aggiunge una revoca al file (chiamato con self._file_lock)."""
+        with open(self.filepath, "a") as f:
+            f.write(json.dumps({"jti": jti, "exp": exp}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    # --- Sincronizzazione con il file ---
+    # Ordine dei lock: prima self._file_lock, poi self._lock.
+
+    def refresh(self):
+        """Legge le revoche aggiunte da altri worker, pota le voci scadute e compatta il file se serve."""
+        with self._lock:
+            now = time.time()
+            self._read_new_lines(now)
+            self._revoked = {jti: exp for jti, exp in self._revoked.items() if exp > now}
+            compact = self._lines >= REVOKED_TOKENS_COMPACT_MIN_LINES and len(self._revoked) * 2 < self._lines
+        if compact:
+            self._compact(now)
+
+    def _read_new_lines(self, now: float):
+        """Applica le righe complete aggiunte al file dall'ultima lettura (chiamato con self._lock)."""
+        try:
+            st = os.stat(self.filepath)
+        except FileNotFoundError:
+            st = None
+        inode = st.st_ino if st else None
+        if inode != self._inode:
+            # File riscritto da una compattazione: si rilegge dall'inizio (le revoche in memoria restano)
+            self._inode, self._offset, self._lines = inode, 0, 0
+        if st is not None and st.st_size > self._offset:
+            with open(self.filepath, "rb") as f:
+                f.seek(self._offset)
+                chunk = f.read()
+            end = chunk.rfind(b"\n") + 1  # una riga non terminata e' un append ancora in corso
+            for line in chunk[:end].splitlines():
+                if line.strip():
+                    entry = json.loads(line)
+                    self._lines += 1
+                    if entry["exp"] > now:
+                        self._revoked[entry["jti"]] = entry["exp"]
+            self._offset += end
+
+    def _compact(self, now: float):
+        """Riscrive il file con le sole revoche ancora valide."""
+        with self._file_lock:
+            live: Dict[str, float] = {}
+            with open(self.filepath, "r") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        if entry["exp"] > now:
+                            live[entry["jti"]] = entry["exp"]
+            tmp_path = self.filepath + ".tmp"
+            with open(tmp_path, "w") as f:
+                f.writelines(json.dumps({"jti": jti, "exp": exp}) + "\n" for jti, exp in live.items())
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.filepath)
+            st = os.stat(self.filepath)
+            with self._lock:
+                self._revoked.update(live)
+                self._inode, self._offset, self._lines = st.st_ino, st.st_size, len(live)
+
+    def _start_refresher(self):
+        if self._refresher is not None:
+            return
+
+        def run():
+            while True:
+                time.sleep(REVOKED_TOKENS_REFRESH_INTERVAL)
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"Warning: revoked tokens refresh failed: {e}")
+
+        with self._lock:
+            if self._refresher is None:
+                self._refresher = threading.Thread(target=run, daemon=True)
+                self._refresher.start()
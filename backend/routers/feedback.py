@@ -32,9 +32,9 @@ async def submit_feedback(
         "feedback": feedback_data.feedback,
         "created_at": datetime.now(timezone.utc).isoformat(),
     }
-    save_feedback_db(feedback_entry)
+    await save_feedback_db(feedback_entry)
     return {"message": "Feedback submitted successfully"}
 
 @router.get("/", response_model=List[Feedback])
 async def get_all_feedback(current_user: User = Depends(get_current_active_user)):
-    return get_all_feedback_db() #TODO: implement
+    return await get_all_feedback_db() #TODO: implement
@@ -1,29 +1,187 @@
+import asyncio
+import functools
+import random
+import time
 import uuid
-from typing import List, Optional, Dict
-from fastapi import APIRouter, Body, Depends, HTTPException, Path, status
+from typing import Any, Iterable, List, Optional, Dict
+from fastapi import APIRouter, Body, Depends, HTTPException, Path, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 
+import live_updates
 from auth import get_current_active_user, get_optional_current_active_user
 from database_adapter import (
+    add_participant_db,
+    backend,
     create_tournament_db,
     delete_tournament_db,
     get_all_tournaments_db,
+    get_matches_db,
     get_tournament_db,
+    get_tournament_info_db,
+    get_tournament_version_db,
+    list_tournament_summaries_db,
+    record_playoffs_db,
+    record_result_db,
     update_tournament_db,
+    VersionConflict,
 )
 from models import (
     Match,
+    MatchPage,
+    MatchPhase,
     MatchResult,
+    MatchStatus,
     Participant,
     Team,
     Tournament,
     TournamentCreate,
+    TournamentPage,
+    TournamentSummary,
     User,
+    construct_trusted,
 )
-from services.playoff_service import _generate_playoffs_from_standings
-from services.standings_service import _calculate_standings
+from responses import FastJSONResponse
+from services.playoff_service import _generate_playoffs_from_standings, advance_playoffs
+from services.schedule_service import Pairing, round_robin_matchdays, round_robin_pairings
+from services.match_index import MATCH_INDEX_THREAD_SIZE, MatchIndex, cache_index, cached_index
+from services.match_store import MatchStore
+from services.standings_service import _calculate_standings, apply_result_delta, delta_rows, standings_need_matches
 
 router = APIRouter()
 
+# Tentativi di una mutazione quando il torneo cambia tra la lettura e la scrittura; tra un
+# tentativo e l'altro si attende un intervallo casuale che raddoppia fino a un massimo (secondi)
+MAX_VERSION_CONFLICT_RETRIES = 12
+VERSION_CONFLICT_MAX_BACKOFF = 0.2
+# Dimensione massima di una pagina dell'elenco dei tornei e di una pagina di match
+MAX_PAGE_SIZE = 200
+MAX_MATCH_PAGE_SIZE = 500
+# Cache-Control delle GET di un torneo: la risposta si puo' conservare ma va rivalidata a ogni
+# uso con If-None-Match. Le altre GET ricevono il no-store di default (vedi main.py)
+TOURNAMENT_CACHE_CONTROL = "no-cache"
+
+
+def retry_on_version_conflict(endpoint):
+    """
+    Le scritture passano la versione letta (compare-and-swap): se un'altra richiesta ha
+    modificato il torneo nel frattempo, l'endpoint viene rieseguito da capo (rilettura,
+    validazione, scrittura). Dopo MAX_VERSION_CONFLICT_RETRIES tentativi risponde 409.
+    """
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        for attempt in range(MAX_VERSION_CONFLICT_RETRIES):
+            try:
+                return await endpoint(*args, **kwargs)
+            except VersionConflict:
+                await asyncio.sleep(random.uniform(0, min(VERSION_CONFLICT_MAX_BACKOFF, 0.005 * 2 ** attempt)))
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Tournament was modified concurrently, please retry",
+        )
+
+    return wrapper
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Confronto debole di If-None-Match (lista di ETag o `*`), come richiesto per le GET."""
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    return "*" in candidates or etag in (c[2:] if c.startswith("W/") else c for c in candidates)
+
+
+async def tournament_version(
+    tournament_id: str = Path(..., description="ID del torneo"),
+) -> int:
+    """Versione corrente del torneo, letta senza caricarlo (una sola volta per richiesta)."""
+    version = await get_tournament_version_db(tournament_id)
+    if version is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Tournament not found"
+        )
+    return version
+
+
+async def tournament_etag(
+    request: Request,
+    response: Response,
+    tournament_id: str = Path(..., description="ID del torneo"),
+    version: int = Depends(tournament_version),
+):
+    """
+    Dipendenza delle GET di un torneo: ETag forte dalla versione, che ogni scrittura incrementa.
+    La versione si legge senza caricare il torneo; se il client ha gia' questa versione
+    (If-None-Match) risponde subito 304, prima di caricare o serializzare qualsiasi cosa.
+    """
+    headers = {"ETag": f'"{tournament_id}-{version}"', "Cache-Control": TOURNAMENT_CACHE_CONTROL}
+    if _etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    # Per gli endpoint che restituiscono direttamente una Response (FastJSONResponse)
+    return headers
+
+
+def match_filters(
+    match_status: Optional[MatchStatus] = Query(None, alias="status", description="Stato dei match"),
+    phase: Optional[MatchPhase] = Query(None, description="Fase del torneo"),
+    matchday: Optional[int] = Query(None, ge=1, description="Giornata del girone"),
+    round_number: Optional[int] = Query(None, alias="round", ge=1, description="Turno"),
+    participant_id: Optional[str] = Query(
+        None, description="Solo i match di un partecipante (nel doppio anche quelli della sua squadra)"
+    ),
+) -> Dict[str, Any]:
+    return {
+        "status": match_status, "phase": phase, "match_day": matchday,
+        "round_number": round_number, "participant_id": participant_id,
+    }
+
+
+async def _build_index(tournament_dict: Dict[str, Any]) -> MatchIndex:
+    if len(tournament_dict.get("matches") or []) >= MATCH_INDEX_THREAD_SIZE:
+        return await run_in_threadpool(MatchIndex, tournament_dict)
+    return MatchIndex(tournament_dict)
+
+
+async def _match_index(tournament_id: str, version: int, filters: Dict[str, Any]) -> MatchIndex:
+    """
+    Indici dei match su cui eseguire la query. Sui backend SQL giornata e fase vengono filtrate
+    dalla query sugli indici della tabella dei match e l'indice copre solo le righe restituite
+    (participant_id richiede le squadre del torneo completo, per il doppio). Sugli store JSON:
+    indici dell'intero torneo, costruiti alla prima query dopo ogni scrittura.
+    """
+    if backend.indexed_match_queries and filters.get("participant_id") is None:
+        tournament_info = await get_tournament_info_db(tournament_id)
+        matches = None
+        if tournament_info is not None:
+            matches = await get_matches_db(
+                tournament_id, match_day=filters.get("match_day"), phase=filters.get("phase")
+            )
+        if matches is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Tournament not found"
+            )
+        return await _build_index(dict(tournament_info, matches=matches))
+    index = cached_index(tournament_id, version)
+    if index is None:
+        tournament_dict = await get_tournament_db(tournament_id)
+        if not tournament_dict:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Tournament not found"
+            )
+        index = cache_index(tournament_id, await _build_index(tournament_dict))
+    return index
+
+
+def _query_matches(index: MatchIndex, filters: Dict[str, Any], limit: Optional[int], cursor: Optional[str]):
+    try:
+        items, next_cursor = index.query(filters, limit, cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+    return [construct_trusted(Match, m) for m in items], next_cursor
+
+
 @router.post(
     "/",
     response_model=Tournament,
@@ -35,7 +193,7 @@ async def create_tournament(
     current_user: User = Depends(get_current_active_user),
 ):
     new_tournament_data = Tournament(
-        **tournament_payload.model_dump(), user_id=current_user.id
+        **tournament_payload.model_dump(), user_id=current_user.id, created_seq=time.time_ns()
     )
 
     if current_user.email:
@@ -49,128 +207,49 @@ async def create_tournament(
         invite_code = str(uuid.uuid4())
         new_tournament_data.invitation_link = f"/join/{invite_code}"
 
-    created_tournament_dict = create_tournament_db(new_tournament_data.model_dump())
-    return Tournament(**created_tournament_dict)
+    created_tournament_dict = await create_tournament_db(new_tournament_data.model_dump())
+    return construct_trusted(Tournament, created_tournament_dict)
 
 
 @router.get(
     "/",
-    response_model=List[Tournament],
-    summary="Ottieni tutti i tornei",
+    response_model=TournamentPage,
+    summary="Elenco paginato dei tornei (solo riepiloghi)",
 )
 async def get_all_tournaments(
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE, description="Tornei per pagina"),
+    cursor: Optional[str] = Query(None, description="next_cursor della pagina precedente"),
     current_user: Optional[User] = Depends(get_optional_current_active_user),
 ):
-    all_tournaments_db = get_all_tournaments_db()
-
-    if current_user and current_user.email:
-        user_tournaments_dict = {}
-        for t_dict in all_tournaments_db:
-            tournament = Tournament(**t_dict)
-
-            if tournament.user_id == current_user.id:
-                user_tournaments_dict[tournament.id] = tournament
-                continue
-
-            for participant in tournament.participants:
-                if participant.email == current_user.email:
-                    user_tournaments_dict[tournament.id] = tournament
-                    break
-
-        return list(user_tournaments_dict.values())
-    else:
-        return [Tournament(**t) for t in all_tournaments_db]
+    # Con un utente autenticato: solo i tornei che ha creato o a cui partecipa
+    try:
+        if current_user and current_user.email:
+            items, next_cursor = await list_tournament_summaries_db(limit, cursor, current_user.id, current_user.email)
+        else:
+            items, next_cursor = await list_tournament_summaries_db(limit, cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+    return TournamentPage(items=[construct_trusted(TournamentSummary, t) for t in items], next_cursor=next_cursor)
 
 
 @router.get(
     "/{tournament_id}",
     response_model=Tournament,
     summary="Ottieni un torneo specifico",
+    dependencies=[Depends(tournament_etag)],
 )
 async def get_tournament(
     tournament_id: str = Path(..., description="ID del torneo da recuperare"),
 ):
-    tournament_db = get_tournament_db(tournament_id)
+    # Lettura pura: l'avanzamento dei playoff avviene quando si registra il risultato
+    tournament_db = await get_tournament_db(tournament_id)
     if not tournament_db:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Tournament not found"
         )
-    
-    tournament = Tournament(**tournament_db)
-    
-    # Check if we need to generate next playoff round
-    if tournament.status == 'playoffs':
-        playoff_matches = [m for m in tournament.matches if m.phase == 'playoff']
-        if playoff_matches:
-            rounds = {}
-            for m in playoff_matches:
-                if m.round_number not in rounds:
-                    rounds[m.round_number] = []
-                rounds[m.round_number].append(m)
-            
-            max_round = max(rounds.keys())
-            current_round_matches = rounds[max_round]
-            
-            if all(m.status == 'completed' for m in current_round_matches):
-                winners = [m.winner_id for m in current_round_matches if m.winner_id]
-                
-                if len(winners) == 2:
-                    # Generate final match
-                    next_round = max_round + 1
-                    match_num = max(m.match_number for m in tournament.matches) + 1
-                    
-                    final_match = Match(
-                        participant1_id=winners[0],
-                        participant2_id=winners[1],
-                        match_number=match_num,
-                        round_number=next_round,
-                        phase='playoff',
-                    )
-                    tournament.matches.append(final_match)
-                    update_tournament_db(tournament_id, tournament.model_dump(mode='json'))
-                elif len(winners) == 1:
-                    tournament.status = 'completed'
-                    # Find and display the winner
-                    winner = next(
-                        (p for p in tournament.participants if p.id == winners[0]),
-                        None,
-                    )
-                    if winner:
-                        print(f"🏆 TOURNAMENT WINNER: {winner.name} 🏆")
-                    update_tournament_db(tournament_id, tournament.model_dump(mode='json'))
-                elif len(winners) > 2:
-                    next_round = max_round + 1
-                    match_num = max(m.match_number for m in tournament.matches) + 1
-                    
-                    for i in range(0, len(winners), 2):
-                        if i + 1 < len(winners):
-                            new_match = Match(
-                                participant1_id=winners[i],
-                                participant2_id=winners[i + 1],
-                                match_number=match_num,
-                                round_number=next_round,
-                                phase='playoff',
-                            )
-                            tournament.matches.append(new_match)
-                            match_num += 1
-                        else:
-                            # Odd number of winners, create bye match
-                            new_match = Match(
-                                participant1_id=winners[i],
-                                participant2_id=None,
-                                match_number=match_num,
-                                round_number=next_round,
-                                phase='playoff',
-                                is_bye=True,
-                                winner_id=winners[i],
-                                status='completed'
-                            )
-                            tournament.matches.append(new_match)
-                            match_num += 1
-                    
-                    update_tournament_db(tournament_id, tournament.model_dump(mode='json'))
-    
-    return tournament
+    return construct_trusted(Tournament, tournament_db)
 
 
 @router.put(
@@ -179,6 +258,7 @@ async def get_tournament(
     status_code=status.HTTP_200_OK,
     summary="Aggiorna un torneo esistente",
 )
+@retry_on_version_conflict
 async def update_tournament(
     tournament_id: str = Path(..., description="ID del torneo da aggiornare"),
     tournament_update_payload: TournamentCreate = Body(
@@ -186,13 +266,13 @@ async def update_tournament(
     ),
     current_user: User = Depends(get_current_active_user),
 ):
-    existing_tournament_dict = get_tournament_db(tournament_id)
+    existing_tournament_dict = await get_tournament_db(tournament_id)
     if not existing_tournament_dict:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Tournament not found"
         )
 
-    existing_tournament = Tournament(**existing_tournament_dict)
+    existing_tournament = construct_trusted(Tournament, existing_tournament_dict)
 
     if existing_tournament.user_id != current_user.id:
         raise HTTPException(
@@ -207,15 +287,15 @@ async def update_tournament(
         invite_code = str(uuid.uuid4())
         updated_tournament.invitation_link = f"/join/{invite_code}"
 
-    tournament_db = update_tournament_db(
-        tournament_id, updated_tournament.model_dump()
+    tournament_db = await update_tournament_db(
+        tournament_id, updated_tournament.model_dump(), existing_tournament.version
     )
     if not tournament_db:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Tournament not found during update process",
         )
-    return Tournament(**tournament_db)
+    return construct_trusted(Tournament, tournament_db)
 
 
 @router.delete(
@@ -227,7 +307,7 @@ async def delete_tournament(
     tournament_id: str = Path(..., description="ID del torneo da eliminare"),
     current_user: User = Depends(get_current_active_user),
 ):
-    tournament_to_delete = get_tournament_db(tournament_id)
+    tournament_to_delete = await get_tournament_db(tournament_id)
     if not tournament_to_delete:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Tournament not found"
@@ -239,7 +319,7 @@ async def delete_tournament(
             detail="Not authorized to delete this tournament",
         )
 
-    if not delete_tournament_db(tournament_id):
+    if not await delete_tournament_db(tournament_id):
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to delete tournament from database",
@@ -248,20 +328,49 @@ async def delete_tournament(
     return
 
 
+@router.get(
+    "/{tournament_id}/events",
+    summary="Aggiornamenti in tempo reale del torneo (Server-Sent Events)",
+    response_class=StreamingResponse,
+)
+async def get_tournament_events(
+    tournament_id: str = Path(..., description="ID del torneo"),
+):
+    """
+    Evento `hello` con la versione corrente, poi un delta per ogni scrittura (result_recorded,
+    participant_joined, playoffs_generated; tournament_saved e resync = rileggere il torneo;
+    tournament_deleted chiude il flusso). Vedi live_updates.py.
+    """
+    subscription = live_updates.broker.subscribe(tournament_id)
+    version = await get_tournament_version_db(tournament_id)
+    if version is None:
+        live_updates.broker.unsubscribe(subscription)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Tournament not found"
+        )
+    return StreamingResponse(
+        live_updates.event_stream(subscription, version),
+        media_type="text/event-stream",
+        # X-Accel-Buffering: nginx inoltra subito ogni evento invece di accumularli
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get(
     "/{tournament_id}/participants/",
     response_model=List[Participant],
     summary="Ottieni i partecipanti di un torneo",
+    dependencies=[Depends(tournament_etag)],
 )
 async def get_tournament_participants(
     tournament_id: str = Path(..., description="ID del torneo"),
 ):
-    tournament_dict = get_tournament_db(tournament_id)
+    tournament_dict = await get_tournament_db(tournament_id)
     if not tournament_dict:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Tournament not found"
         )
-    tournament = Tournament(**tournament_dict)
+    tournament = construct_trusted(Tournament, tournament_dict)
     return tournament.participants
 
 
@@ -275,11 +384,11 @@ async def get_tournament_by_invite_code(
         ..., description="The invitation code (UUID part of the link)"
     ),
 ):
-    all_tournaments = get_all_tournaments_db()
+    all_tournaments = await get_all_tournaments_db()
     for t_dict in all_tournaments:
         stored_invite_link = t_dict.get("invitation_link")
         if stored_invite_link and stored_invite_link.endswith(f"/{invite_code}"):
-            return Tournament(**t_dict)
+            return construct_trusted(Tournament, t_dict)
     raise HTTPException(
         status_code=status.HTTP_404_NOT_FOUND,
         detail="Tournament not found or invalid invite code.",
@@ -291,18 +400,19 @@ async def get_tournament_by_invite_code(
     status_code=status.HTTP_204_NO_CONTENT,
     summary="Rimuovi un partecipante da un torneo",
 )
+@retry_on_version_conflict
 async def remove_participant_from_tournament(
     tournament_id: str = Path(..., description="ID del torneo"),
     participant_id: str = Path(..., description="ID del partecipante da rimuovere"),
     current_user: User = Depends(get_current_active_user),
 ):
-    tournament_dict = get_tournament_db(tournament_id)
+    tournament_dict = await get_tournament_db(tournament_id)
     if not tournament_dict:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Tournament not found"
         )
 
-    tournament = Tournament(**tournament_dict)
+    tournament = construct_trusted(Tournament, tournament_dict)
 
     if tournament.user_id != current_user.id:
         raise HTTPException(
@@ -334,7 +444,7 @@ async def remove_participant_from_tournament(
         p for p in tournament.participants if p.id != participant_id
     ]
 
-    update_tournament_db(tournament_id, tournament.model_dump())
+    await update_tournament_db(tournament_id, tournament.model_dump(), tournament.version)
     return
 
 
@@ -344,17 +454,18 @@ async def remove_participant_from_tournament(
     status_code=status.HTTP_201_CREATED,
     summary="Join a tournament as an authenticated user",
 )
+@retry_on_version_conflict
 async def join_tournament_authenticated(
     tournament_id: str = Path(..., description="ID of the tournament to join"),
     current_user: User = Depends(get_current_active_user),
 ):
-    tournament_dict = get_tournament_db(tournament_id)
+    tournament_dict = await get_tournament_db(tournament_id)
     if not tournament_dict:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Tournament not found"
         )
 
-    tournament = Tournament(**tournament_dict)
+    tournament = construct_trusted(Tournament, tournament_dict)
 
     if tournament.status != 'open':
         raise HTTPException(
@@ -368,8 +479,7 @@ async def join_tournament_authenticated(
 
     participant_name = current_user.name or current_user.email
     new_participant = Participant(name=participant_name, email=current_user.email)
-    tournament.participants.append(new_participant)
-    update_tournament_db(tournament_id, tournament.model_dump())
+    await add_participant_db(tournament_id, new_participant.model_dump(mode='json'), tournament.version)
     return {"participant": new_participant, "tournament_id": tournament_id}
 
 
@@ -379,17 +489,18 @@ async def join_tournament_authenticated(
     status_code=status.HTTP_201_CREATED,
     summary="Join a tournament as an unauthenticated user",
 )
+@retry_on_version_conflict
 async def join_tournament_unauthenticated(
     tournament_id: str = Path(..., description="ID of the tournament to join"),
     participant_data: Participant = Body(..., description="Participant details"),
 ):
-    tournament_dict = get_tournament_db(tournament_id)
+    tournament_dict = await get_tournament_db(tournament_id)
     if not tournament_dict:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Tournament not found"
         )
 
-    tournament = Tournament(**tournament_dict)
+    tournament = construct_trusted(Tournament, tournament_dict)
 
     if tournament.status != 'open':
         raise HTTPException(
@@ -405,26 +516,39 @@ async def join_tournament_unauthenticated(
             )
 
     new_participant = Participant(name=participant_data.name, email=participant_data.email)
-    tournament.participants.append(new_participant)
-    update_tournament_db(tournament_id, tournament.model_dump())
+    await add_participant_db(tournament_id, new_participant.model_dump(mode='json'), tournament.version)
     return {"participant": new_participant, "tournament_id": tournament_id}
 
 
+def _group_match_dicts(pairings: Iterable[Pairing]) -> List[Dict[str, Any]]:
+    """
+    Match del girone come dict con le chiavi di Match.model_dump, senza costruire e validare
+    un Match per accoppiamento: id e accoppiamento cambiano, il resto sono i default.
+    """
+    template = Match(phase='group').model_dump()
+    return [
+        dict(template, id=str(uuid.uuid4()), match_day=match_day, match_number=match_number,
+             participant1_id=participant1_id, participant2_id=participant2_id)
+        for match_day, match_number, participant1_id, participant2_id in pairings
+    ]
+
+
 @router.post(
     "/{tournament_id}/matches/generate",
     summary="Genera bracket/calendario per un torneo",
 )
+@retry_on_version_conflict
 async def generate_matches_for_tournament(
     tournament_id: str = Path(..., description="ID del torneo"),
     current_user: User = Depends(get_current_active_user),
 ):
-    tournament_dict = get_tournament_db(tournament_id)
+    tournament_dict = await get_tournament_db(tournament_id)
     if not tournament_dict:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Tournament not found"
         )
 
-    tournament = Tournament(**tournament_dict)
+    tournament = construct_trusted(Tournament, tournament_dict)
 
     if tournament.user_id != current_user.id:
         raise HTTPException(
@@ -439,6 +563,7 @@ async def generate_matches_for_tournament(
         )
 
     tournament.matches = []
+    tournament.standings = {}
     tournament.status = "group_stage"
     tournament.registration_open = False
     
@@ -461,106 +586,46 @@ async def generate_matches_for_tournament(
                     name=f"{participants[i].name} / {participants[i + 1].name}"
                 )
                 tournament.teams.append(team)
-            
-            # Generate matches between teams
-            teams = tournament.teams[:]
-            num_teams = len(teams)
-            
-            total_matches = (num_teams * (num_teams - 1)) // 2
-            matches_per_day = num_teams // 2
-            tournament.total_matchdays = (total_matches + matches_per_day - 1) // matches_per_day
-            
-            if num_teams % 2 == 1:
-                teams.append(None)
-                num_teams += 1
-            
-            match_num = 1
-            
-            for matchday in range(num_teams - 1):
-                for i in range(num_teams // 2):
-                    t1_idx = i
-                    t2_idx = num_teams - 1 - i
-                    
-                    t1 = teams[t1_idx]
-                    t2 = teams[t2_idx]
-                    
-                    if t1 is not None and t2 is not None:
-                        match = Match(
-                            participant1_id=t1.id,  # team1_id
-                            participant2_id=t2.id,  # team2_id
-                            match_number=match_num,
-                            match_day=matchday + 1,
-                            phase='group',
-                        )
-                        tournament.matches.append(match)
-                        match_num += 1
-                
-                teams = [teams[0]] + [teams[-1]] + teams[1:-1]
+            entrant_ids = [team.id for team in tournament.teams]  # team ids as participant ids
         else:
-            # Singles logic
-            participants = tournament.participants[:]
-            num_participants = len(participants)
-            
-            total_matches = (num_participants * (num_participants - 1)) // 2
-            matches_per_day = num_participants // 2
-            tournament.total_matchdays = (total_matches + matches_per_day - 1) // matches_per_day
-            
-            if num_participants % 2 == 1:
-                participants.append(None)
-                num_participants += 1
-            
-            match_num = 1
-            
-            for matchday in range(num_participants - 1):
-                for i in range(num_participants // 2):
-                    p1_idx = i
-                    p2_idx = num_participants - 1 - i
-                    
-                    p1 = participants[p1_idx]
-                    p2 = participants[p2_idx]
-                    
-                    if p1 is not None and p2 is not None:
-                        match = Match(
-                            participant1_id=p1.id,
-                            participant2_id=p2.id,
-                            match_number=match_num,
-                            match_day=matchday + 1,
-                            phase='group',
-                        )
-                        tournament.matches.append(match)
-                        match_num += 1
-                
-                participants = [participants[0]] + [participants[-1]] + participants[1:-1]
+            entrant_ids = [p.id for p in tournament.participants]
+
+        legs = 2 if tournament.double_round_robin else 1
+        tournament.total_matchdays = round_robin_matchdays(len(entrant_ids), legs)
+        matches = _group_match_dicts(
+            round_robin_pairings(entrant_ids, legs, balance_home_away=tournament.double_round_robin)
+        )
     else:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Only round_robin format is supported.",
         )
 
-    update_tournament_db(tournament_id, tournament.model_dump())
+    await update_tournament_db(tournament_id, dict(tournament.model_dump(), matches=matches), tournament.version)
     return {
         "message": "Group stage matches generated",
         "tournament_id": tournament_id,
         "total_matchdays": tournament.total_matchdays,
-        "matches": tournament.matches,
+        "matches": matches,
     }
 
 
 @router.get(
     "/{tournament_id}/matches",
-    response_model=List[Match],
-    summary="Ottieni i match di un torneo",
+    response_model=MatchPage,
+    summary="Ottieni i match di un torneo (filtrati e paginati)",
+    dependencies=[Depends(tournament_etag)],
 )
 async def get_tournament_matches(
     tournament_id: str = Path(..., description="ID del torneo"),
+    filters: Dict[str, Any] = Depends(match_filters),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_MATCH_PAGE_SIZE, description="Match per pagina (default: tutti)"),
+    cursor: Optional[str] = Query(None, description="next_cursor della pagina precedente"),
+    version: int = Depends(tournament_version),
 ):
-    tournament_dict = get_tournament_db(tournament_id)
-    if not tournament_dict:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Tournament not found"
-        )
-    tournament = Tournament(**tournament_dict)
-    return tournament.matches
+    index = await _match_index(tournament_id, version, filters)
+    items, next_cursor = _query_matches(index, filters, limit, cursor)
+    return MatchPage(items=items, next_cursor=next_cursor)
 
 
 @router.post(
@@ -568,19 +633,20 @@ async def get_tournament_matches(
     response_model=Match,
     summary="Inserisci/Aggiorna il risultato di un match",
 )
+@retry_on_version_conflict
 async def record_match_result(
     tournament_id: str = Path(..., description="ID del torneo"),
     match_id: str = Path(..., description="ID del match"),
     result_data: MatchResult = Body(...),
     current_user: User = Depends(get_current_active_user),
 ):
-    tournament_dict = get_tournament_db(tournament_id)
+    tournament_dict = await get_tournament_db(tournament_id)
     if not tournament_dict:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Tournament not found"
         )
 
-    tournament = Tournament(**tournament_dict)
+    tournament = construct_trusted(Tournament, tournament_dict)
     match_to_update = None
     match_index = -1
 
@@ -643,6 +709,9 @@ async def record_match_result(
             detail="You are not authorized to record results for this match.",
         )
 
+    # Previous version of the match, to take its contribution out of the standings
+    previous_match = match_to_update.model_copy()
+
     # Update scores from the payload
     match_to_update.set1_score_participant1 = result_data.set1_score_participant1
     match_to_update.set1_score_participant2 = result_data.set1_score_participant2
@@ -674,11 +743,18 @@ async def record_match_result(
         match_to_update.status = "pending"
 
     tournament.matches[match_index] = match_to_update
+    # Only the table rows this result changes are saved (the whole table on the first recompute)
+    standings_rows = None if tournament.standings is None else delta_rows(previous_match, match_to_update)
+    apply_result_delta(tournament, previous_match, match_to_update)
+    # Only the matches touched by this result are journaled, not the whole tournament
+    changed_matches = [match_to_update]
+    playoffs_generated = False
 
     if tournament.status == 'group_stage':
         group_matches = [m for m in tournament.matches if m.phase == 'group']
         if all(m.status == 'completed' for m in group_matches):
             tournament = _generate_playoffs_from_standings(tournament)
+            playoffs_generated = True
 
     if match_to_update.phase == 'playoff' and match_to_update.status == 'completed':
         current_round = match_to_update.round_number
@@ -715,16 +791,15 @@ async def record_match_result(
                         if m.id == target_match.id:
                             tournament.matches[idx] = target_match
                             break
+                    changed_matches.append(target_match)
                             
             except ValueError:
                 print(f"Error: Current match {match_to_update.id} not found in round {current_round}")
         else:
-            # No next round matches -> This was the Final
-            # Implicitly handled below by tournament.status = "completed" check if needed,
-            # but usually we mark tournament complete here
-            if len(current_round_matches) == 1:
-                # If there's only 1 match in this round, it's definitively the final
-                tournament.status = "completed"
+            # No next round matches -> this was the final, or the last round of a bracket
+            # created one round at a time: completes the tournament or adds the next round
+            changed_matches += advance_playoffs(tournament)
+            if tournament.status == "completed":
                 winner = next((p for p in tournament.participants if p.id == match_to_update.winner_id), None)
                 if winner:
                    print(f"🏆 TOURNAMENT WINNER: {winner.name} 🏆")
@@ -746,7 +821,19 @@ async def record_match_result(
                         "message": f"🏆 {winner.name} wins the tournament! 🏆"
                     }
     
-    update_tournament_db(tournament_id, tournament.model_dump())
+    if playoffs_generated:
+        # Risultato e tabellone dei playoff in un'unica scrittura (una sola versione)
+        changed_matches += [m for m in tournament.matches if m.phase == 'playoff']
+    await record_result_db(
+        tournament_id,
+        [m.model_dump(mode='json') for m in changed_matches],
+        {"status": tournament.status},
+        tournament.version,
+        {
+            k: v.model_dump() for k, v in tournament.standings.items()
+            if standings_rows is None or k in standings_rows
+        },
+    )
     return response_data if "tournament_winner" in response_data else match_to_update
 
 
@@ -756,23 +843,24 @@ async def record_match_result(
 )
 async def get_tournament_bracket(
     tournament_id: str = Path(..., description="ID del torneo"),
+    cache_headers: Dict[str, str] = Depends(tournament_etag),
 ):
-    tournament_dict = get_tournament_db(tournament_id)
+    tournament_dict = await get_tournament_db(tournament_id)
     if not tournament_dict:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Tournament not found"
         )
-    tournament = Tournament(**tournament_dict)
+    tournament = construct_trusted(Tournament, tournament_dict)
     if tournament.format != "elimination":
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Bracket view is for elimination tournaments only.",
         )
-    return {
+    return FastJSONResponse({
         "tournament_id": tournament.id,
         "name": tournament.name,
         "matches": tournament.matches,
-    }
+    }, headers=cache_headers)
 
 
 @router.get(
@@ -781,23 +869,32 @@ async def get_tournament_bracket(
 )
 async def get_tournament_schedule(
     tournament_id: str = Path(..., description="ID del torneo"),
+    filters: Dict[str, Any] = Depends(match_filters),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_MATCH_PAGE_SIZE, description="Match per pagina (default: tutti)"),
+    cursor: Optional[str] = Query(None, description="next_cursor della pagina precedente"),
+    version: int = Depends(tournament_version),
+    cache_headers: Dict[str, str] = Depends(tournament_etag),
 ):
-    tournament_dict = get_tournament_db(tournament_id)
-    if not tournament_dict:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Tournament not found"
-        )
-    tournament = Tournament(**tournament_dict)
-    if tournament.format != "round_robin":
+    index = await _match_index(tournament_id, version, filters)
+    if index.info.get("format", "round_robin") != "round_robin":
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Schedule view is for round-robin tournaments only.",
         )
-    return {
-        "tournament_id": tournament.id,
-        "name": tournament.name,
-        "matches": tournament.matches,
-    }
+    items, next_cursor = _query_matches(index, filters, limit, cursor)
+    return FastJSONResponse({
+        "tournament_id": tournament_id,
+        "name": index.info.get("name"),
+        "matches": items,
+        "next_cursor": next_cursor,
+    }, headers=cache_headers)
+
+
+def _standings_of(tournament_dict: Dict) -> List[Dict]:
+    # Matches are loaded (as columns) only if the stored table is not enough
+    tournament = construct_trusted(Tournament, dict(tournament_dict, matches=[]))
+    matches = MatchStore.from_dicts(tournament_dict.get("matches") or []) if standings_need_matches(tournament) else None
+    return _calculate_standings(tournament, matches=matches)
 
 
 @router.get(
@@ -806,44 +903,43 @@ async def get_tournament_schedule(
 )
 async def get_tournament_standings(
     tournament_id: str = Path(..., description="ID del torneo"),
+    cache_headers: Dict[str, str] = Depends(tournament_etag),
 ):
-    tournament_dict = get_tournament_db(tournament_id)
+    tournament_dict = await get_tournament_db(tournament_id)
     if not tournament_dict:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Tournament not found"
         )
 
-    tournament = Tournament(**tournament_dict)
-    sorted_standings = _calculate_standings(tournament)
-    return {"standings": sorted_standings}
+    return FastJSONResponse({"standings": _standings_of(tournament_dict)}, headers=cache_headers)
 
 
 @router.get(
     "/{tournament_id}/progress",
     summary="Get tournament progress (group stage completion)",
+    dependencies=[Depends(tournament_etag)],
 )
 async def get_tournament_progress(
     tournament_id: str = Path(..., description="ID del torneo"),
 ):
-    tournament_dict = get_tournament_db(tournament_id)
+    tournament_dict = await get_tournament_db(tournament_id)
     if not tournament_dict:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Tournament not found"
         )
 
-    tournament = Tournament(**tournament_dict)
+    matches = MatchStore.from_dicts(tournament_dict.get("matches") or [])
     
     # Calculate group stage match progress
-    group_matches = [m for m in tournament.matches if m.phase == 'group']
-    total_group_matches = len(group_matches)
-    completed_group_matches = len([m for m in group_matches if m.status == 'completed'])
+    total_group_matches = matches.count(phase='group')
+    completed_group_matches = matches.count(phase='group', status='completed')
     remaining_group_matches = total_group_matches - completed_group_matches
     
     return {
         "total_group_matches": total_group_matches,
         "completed_group_matches": completed_group_matches,
         "remaining_group_matches": remaining_group_matches,
-        "status": tournament.status,
+        "status": tournament_dict.get("status", "open"),
     }
 
 
@@ -851,17 +947,18 @@ async def get_tournament_progress(
     "/{tournament_id}/generate-playoffs",
     summary="Generate playoff bracket from group stage",
 )
+@retry_on_version_conflict
 async def generate_playoffs(
     tournament_id: str = Path(..., description="ID del torneo"),
     current_user: User = Depends(get_current_active_user),
 ):
-    tournament_dict = get_tournament_db(tournament_id)
+    tournament_dict = await get_tournament_db(tournament_id)
     if not tournament_dict:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Tournament not found"
         )
 
-    tournament = Tournament(**tournament_dict)
+    tournament = construct_trusted(Tournament, tournament_dict)
 
     if tournament.user_id != current_user.id:
         raise HTTPException(
@@ -883,7 +980,12 @@ async def generate_playoffs(
         )
 
     tournament = _generate_playoffs_from_standings(tournament)
-    update_tournament_db(tournament_id, tournament.model_dump(mode='json'))
+    await record_playoffs_db(
+        tournament_id,
+        [m.model_dump(mode='json') for m in tournament.matches if m.phase == 'playoff'],
+        {"status": tournament.status},
+        tournament.version,
+    )
     
     return {
         "message": "Playoff bracket generated",
@@ -898,25 +1000,25 @@ async def generate_playoffs(
 async def get_matchday_matches(
     tournament_id: str = Path(..., description="ID del torneo"),
     matchday: int = Path(..., description="Matchday number"),
+    match_status: Optional[MatchStatus] = Query(None, alias="status", description="Stato dei match"),
+    participant_id: Optional[str] = Query(
+        None, description="Solo i match di un partecipante (nel doppio anche quelli della sua squadra)"
+    ),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_MATCH_PAGE_SIZE, description="Match per pagina (default: tutti)"),
+    cursor: Optional[str] = Query(None, description="next_cursor della pagina precedente"),
+    version: int = Depends(tournament_version),
+    cache_headers: Dict[str, str] = Depends(tournament_etag),
 ):
-    tournament_dict = get_tournament_db(tournament_id)
-    if not tournament_dict:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Tournament not found"
-        )
+    filters = {"match_day": matchday, "phase": "group", "status": match_status, "participant_id": participant_id}
+    index = await _match_index(tournament_id, version, filters)
+    items, next_cursor = _query_matches(index, filters, limit, cursor)
 
-    tournament = Tournament(**tournament_dict)
-    
-    matchday_matches = [
-        m for m in tournament.matches 
-        if m.match_day == matchday and m.phase == 'group'
-    ]
-    
-    return {
+    return FastJSONResponse({
         "matchday": matchday,
-        "total_matchdays": tournament.total_matchdays,
-        "matches": matchday_matches,
-    }
+        "total_matchdays": index.info.get("total_matchdays"),
+        "matches": items,
+        "next_cursor": next_cursor,
+    }, headers=cache_headers)
 
 
 @router.get(
@@ -925,18 +1027,20 @@ async def get_matchday_matches(
 )
 async def get_tournament_results(
     tournament_id: str = Path(..., description="ID del torneo"),
+    cache_headers: Dict[str, str] = Depends(tournament_etag),
 ):
-    tournament_dict = get_tournament_db(tournament_id)
+    tournament_dict = await get_tournament_db(tournament_id)
     if not tournament_dict:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Tournament not found"
         )
 
-    tournament = Tournament(**tournament_dict)
+    tournament = construct_trusted(Tournament, dict(tournament_dict, matches=[]))
+    matches = MatchStore.from_dicts(tournament_dict.get("matches") or [])
 
     results = []
     if tournament.status == "completed":
-        playoff_matches = [m for m in tournament.matches if m.phase == 'playoff']
+        playoff_matches = [matches.view(i) for i in matches.indices(phase='playoff')]
         if playoff_matches:
             final_match = max(playoff_matches, key=lambda m: m.round_number or 0)
             if final_match.winner_id:
@@ -947,8 +1051,7 @@ async def get_tournament_results(
                 if winner:
                     results.append({"participant": winner.name, "rank": 1})
     
-    standings_response = await get_tournament_standings(tournament_id)
-    for i, standing in enumerate(standings_response["standings"]):
+    for standing in _standings_of(tournament_dict):
         if not any(r["participant"] == standing["participant"].name for r in results):
             results.append({
                 "participant": standing["participant"].name,
@@ -956,7 +1059,7 @@ async def get_tournament_results(
                 "wins": standing["wins"],
             })
 
-    return results
+    return FastJSONResponse(results, headers=cache_headers)
 
 
 @router.post(
@@ -965,18 +1068,19 @@ async def get_tournament_results(
     status_code=status.HTTP_201_CREATED,
     summary="Create a team for doubles tournament",
 )
+@retry_on_version_conflict
 async def create_team(
     tournament_id: str = Path(..., description="ID of the tournament"),
     team_data: dict = Body(..., description="Team data with player1_id and player2_id"),
     current_user: User = Depends(get_current_active_user),
 ):
-    tournament_dict = get_tournament_db(tournament_id)
+    tournament_dict = await get_tournament_db(tournament_id)
     if not tournament_dict:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Tournament not found"
         )
 
-    tournament = Tournament(**tournament_dict)
+    tournament = construct_trusted(Tournament, tournament_dict)
 
     if tournament.tournament_type != "double":
         raise HTTPException(
@@ -1037,7 +1141,7 @@ async def create_team(
         tournament.teams = []
     tournament.teams.append(new_team)
 
-    update_tournament_db(tournament_id, tournament.model_dump())
+    await update_tournament_db(tournament_id, tournament.model_dump(), tournament.version)
     return new_team
 
 
@@ -1046,18 +1150,19 @@ async def create_team(
     status_code=status.HTTP_204_NO_CONTENT,
     summary="Delete a team from doubles tournament",
 )
+@retry_on_version_conflict
 async def delete_team(
     tournament_id: str = Path(..., description="ID of the tournament"),
     team_id: str = Path(..., description="ID of the team to delete"),
     current_user: User = Depends(get_current_active_user),
 ):
-    tournament_dict = get_tournament_db(tournament_id)
+    tournament_dict = await get_tournament_db(tournament_id)
     if not tournament_dict:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Tournament not found"
         )
 
-    tournament = Tournament(**tournament_dict)
+    tournament = construct_trusted(Tournament, tournament_dict)
 
     if tournament.tournament_type != "double":
         raise HTTPException(
@@ -1103,5 +1208,5 @@ async def delete_team(
     # Remove the team
     tournament.teams = [t for t in tournament.teams if t.id != team_id]
 
-    update_tournament_db(tournament_id, tournament.model_dump())
+    await update_tournament_db(tournament_id, tournament.model_dump(), tournament.version)
     return
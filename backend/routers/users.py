@@ -2,19 +2,25 @@ from datetime import timedelta
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from fastapi.security import OAuth2PasswordRequestForm
+from starlette.concurrency import run_in_threadpool
 
 from auth import (
     ACCESS_TOKEN_EXPIRE_MINUTES,
+    LogoutRequest,
+    RefreshRequest,
     Token,
     create_access_token,
+    create_refresh_token,
     get_current_active_user,
-    get_password_hash,
+    get_password_hash_async,
     oauth2_scheme_optional,
+    revoke_refresh_token,
     revoke_token,
-    verify_password,
+    rotate_refresh_token,
+    verify_password_async,
 )
 from database_adapter import get_user_by_email_db, create_user_db
-from models import User, UserCreate
+from models import User, UserCreate, construct_trusted
 
 router = APIRouter()
 
@@ -22,7 +28,7 @@ router = APIRouter()
     "/token", response_model=Token, summary="Create access token for user login"
 )
 async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends()):
-    user_dict = get_user_by_email_db(form_data.username)
+    user_dict = await get_user_by_email_db(form_data.username)
 
     if not user_dict:
         raise HTTPException(
@@ -31,7 +37,7 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user_in_db = User(**user_dict)
+    user_in_db = construct_trusted(User, user_dict)
 
     if not user_in_db.hashed_password:
         raise HTTPException(
@@ -40,7 +46,8 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    if not verify_password(form_data.password, user_in_db.hashed_password):
+    # bcrypt takes hundreds of ms: it runs in the password process pool, off the event loop
+    if not await verify_password_async(form_data.password, user_in_db.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -56,11 +63,44 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
     access_token = create_access_token(
         data={"sub": user_in_db.email}, expires_delta=access_token_expires
     )
-    return {"access_token": access_token, "token_type": "bearer"}
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "refresh_token": create_refresh_token(user_in_db.email),
+    }
 
 
-@router.get("/logout", summary="Logout user")
+@router.post(
+    "/refresh", response_model=Token, summary="Exchange a refresh token for a new access token"
+)
+async def refresh_access_token(refresh_request: RefreshRequest):
+    # No password check here: the refresh token is rotated and a new pair is issued
+    rotated = await run_in_threadpool(rotate_refresh_token, refresh_request.refresh_token)
+    if rotated is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    email, refresh_token = rotated
+
+    user_dict = await get_user_by_email_db(email)
+    if not user_dict or not construct_trusted(User, user_dict).is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    access_token = create_access_token(
+        data={"sub": email}, expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
+
+@router.post("/logout", summary="Logout user")
 async def logout(
+    logout_request: Optional[LogoutRequest] = None,
     token: Optional[str] = Depends(oauth2_scheme_optional),
     token_query: Optional[str] = Query(None, alias="token"),
 ):
@@ -70,7 +110,11 @@ async def logout(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Authentication token is missing",
         )
-    revoke_token(final_token)
+    # Le revoche scrivono il registro su disco (fsync): fuori dall'event loop
+    await run_in_threadpool(revoke_token, final_token)
+    # Il refresh token arriva nel corpo (come per /refresh), non nella query string
+    if logout_request and logout_request.refresh_token:
+        await run_in_threadpool(revoke_refresh_token, logout_request.refresh_token)
     return {"message": "Successfully logged out"}
 
 
@@ -87,14 +131,14 @@ async def register_user(user_in: UserCreate):
             detail="Email is required for registration.",
         )
 
-    existing_user = get_user_by_email_db(user_in.email)
+    existing_user = await get_user_by_email_db(user_in.email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered. Please try logging in or use a different email.",
         )
 
-    hashed_password = get_password_hash(user_in.password)
+    hashed_password = await get_password_hash_async(user_in.password)
     new_user_data = User(
         email=user_in.email,
         hashed_password=hashed_password,
@@ -102,7 +146,7 @@ async def register_user(user_in: UserCreate):
         name=user_in.name # Make sure to pass the name
     )
     user_to_save_dict = new_user_data.model_dump()
-    created_user_dict = create_user_db(user_to_save_dict)
+    created_user_dict = await create_user_db(user_to_save_dict)
     return User(**created_user_dict)
 
 
@@ -0,0 +1,118 @@
+"""
+Per-tournament match indexes for filtered, paginated match queries.
+
+A MatchIndex is built once per tournament version from a single read of the tournament:
+posting lists (ascending match positions) by match day, round, entrant, status and phase.
+A query starts from the shortest posting list among its filters and checks the others on
+those candidates only. "Today's matches" or "my matches" in a 2,000-match round robin then
+touch a few dozen rows instead of scanning them all.
+
+In doubles the matches reference teams; the entrant list also indexes each team's players,
+so participant_id works with a player's own id.
+
+Pages are cut by position: the cursor is the position of the last match returned. Writes
+upsert matches in place and append new ones, so a cursor stays valid across versions (except
+when the matches are regenerated).
+
+Indexes are kept in a small LRU keyed by tournament id and checked against the current
+version, so a write invalidates them without any notification.
+"""
+import os
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+MATCH_INDEX_CACHE_SIZE = int(os.getenv("MATCH_INDEX_CACHE_SIZE", "16"))
+# Above this many matches callers should build the index off the event loop (~50 ms for 20k)
+MATCH_INDEX_THREAD_SIZE = 5000
+
+# Filters that compare one match field (the query parameter names the field), with the
+# value assumed when the field is missing
+FIELD_FILTERS = {"match_day": None, "round_number": None, "status": "pending", "phase": "group"}
+
+
+def _field(match: Dict[str, Any], name: str) -> Any:
+    return match.get(name) or FIELD_FILTERS[name]
+
+
+class MatchIndex:
+    def __init__(self, tournament: Dict[str, Any]):
+        self.version: int = tournament.get("version", 0)
+        # Everything but the matches, for the endpoints that need name, format, matchdays
+        self.info = {k: v for k, v in tournament.items() if k != "matches"}
+        self.matches: List[Dict[str, Any]] = tournament.get("matches") or []
+        self._players: Dict[str, Tuple[str, ...]] = {
+            t["id"]: tuple(p for p in (t.get("player1_id"), t.get("player2_id")) if p)
+            for t in tournament.get("teams") or []
+        }
+        self._postings: Dict[str, Dict[Any, List[int]]] = {name: {} for name in FIELD_FILTERS}
+        by_participant = self._postings["participant_id"] = {}
+        for position, match in enumerate(self.matches):
+            for name, postings in self._postings.items():
+                if name != "participant_id":
+                    postings.setdefault(_field(match, name), []).append(position)
+            for entrant in self._entrants(match):
+                by_participant.setdefault(entrant, []).append(position)
+
+    def _entrants(self, match: Dict[str, Any]) -> List[str]:
+        entrants = []
+        for entrant in (match.get("participant1_id"), match.get("participant2_id")):
+            if entrant and entrant not in entrants:
+                entrants.append(entrant)
+                entrants.extend(self._players.get(entrant, ()))
+        return entrants
+
+    def _matches_filter(self, position: int, name: str, value: Any) -> bool:
+        match = self.matches[position]
+        if name == "participant_id":
+            return value in self._entrants(match)
+        return _field(match, name) == value
+
+    def query(
+        self, filters: Dict[str, Any], limit: Optional[int] = None, cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Matches satisfying every non-None filter (match_day, round_number, status, phase,
+        participant_id), in storage order, and the cursor of the next page (None = last page).
+        Raises ValueError for a malformed cursor.
+        """
+        active = {name: value for name, value in filters.items() if value is not None}
+        if active:
+            lists = sorted(
+                ((self._postings[name].get(value, []), name) for name, value in active.items()), key=lambda p: len(p[0])
+            )
+            candidates = lists[0][0]
+            checks = [(name, active[name]) for _, name in lists[1:]]
+        else:
+            candidates, checks = range(len(self.matches)), []
+
+        start = 0 if cursor is None else bisect_right(candidates, int(cursor))
+        page: List[Dict[str, Any]] = []
+        last = None
+        for position in candidates[start:]:
+            if all(self._matches_filter(position, name, value) for name, value in checks):
+                if limit is not None and len(page) == limit:
+                    return page, str(last)
+                page.append(self.matches[position])
+                last = position
+        return page, None
+
+
+_indexes: "OrderedDict[str, MatchIndex]" = OrderedDict()
+
+
+def cached_index(tournament_id: str, version: int) -> Optional[MatchIndex]:
+    """The index of this version of the tournament, if it was already built."""
+    index = _indexes.get(tournament_id)
+    if index is None or index.version != version:
+        return None
+    _indexes.move_to_end(tournament_id)
+    return index
+
+
+def cache_index(tournament_id: str, index: MatchIndex) -> MatchIndex:
+    _indexes[tournament_id] = index
+    _indexes.move_to_end(tournament_id)
+    while len(_indexes) > MATCH_INDEX_CACHE_SIZE:
+        _indexes.popitem(last=False)
+    return index
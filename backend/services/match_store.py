@@ -0,0 +1,173 @@
+"""
+Compact column store for a tournament's matches.
+
+A Match is a pydantic object with 20 fields, and it sits next to the dict it was loaded
+from. For a 200-player round robin (~20k matches) that is tens of MB per request. The
+store keeps one typed column per field instead: `array` of int32/int8 for numbers, phase and
+status, and participant/winner ids interned in a small entrant table. Only the match id is
+a Python string. MatchView is a __slots__ view on one row, and Match objects are built only
+at the API boundary (to_match / to_matches).
+
+The numeric columns are contiguous buffers, so the standings engine reads them with
+numpy.frombuffer without copying.
+"""
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from models import Match, construct_trusted
+
+NONE = -1  # None in the numeric columns (scores, rounds and codes are never negative)
+PHASES = ('group', 'playoff')
+STATUSES = ('pending', 'in_progress', 'completed', 'cancelled')
+ENTRANT_FIELDS = ('participant1_id', 'participant2_id', 'winner_id')
+INT_FIELDS = (
+    'round_number', 'match_number', 'match_day', 'score_participant1', 'score_participant2',
+    'set1_score_participant1', 'set1_score_participant2', 'set2_score_participant1',
+    'set2_score_participant2', 'set3_score_participant1', 'set3_score_participant2',
+)
+_PHASE_CODES = {p: i for i, p in enumerate(PHASES)}
+_STATUS_CODES = {s: i for i, s in enumerate(STATUSES)}
+
+
+class MatchStore:
+    __slots__ = ('ids', 'entrants', '_entrant_codes', 'phase', 'status', 'is_bye', 'scheduled_date') + ENTRANT_FIELDS + INT_FIELDS
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.entrants: List[str] = []  # Code -> participant/team id
+        self._entrant_codes: Dict[str, int] = {}
+        for name in ENTRANT_FIELDS + INT_FIELDS:
+            setattr(self, name, array('i'))
+        self.phase = array('b')
+        self.status = array('b')
+        self.is_bye = array('b')
+        self.scheduled_date: Dict[int, Any] = {}  # Sparse: almost always None
+
+    @classmethod
+    def from_dicts(cls, matches: Iterable[Dict[str, Any]]) -> "MatchStore":
+        """From the match dicts read from storage, without building Match objects."""
+        store = cls()
+        matches = list(matches)
+        store.ids = [m['id'] for m in matches]
+        for name in ENTRANT_FIELDS:
+            getattr(store, name).extend(store._code(m.get(name)) for m in matches)
+        for name in INT_FIELDS:
+            getattr(store, name).extend(NONE if v is None else v for v in (m.get(name) for m in matches))
+        store.phase.extend(_PHASE_CODES[m.get('phase') or 'group'] for m in matches)
+        store.status.extend(_STATUS_CODES[m.get('status') or 'pending'] for m in matches)
+        store.is_bye.extend(1 if m.get('is_bye') else 0 for m in matches)
+        store.scheduled_date = {i: m['scheduled_date'] for i, m in enumerate(matches) if m.get('scheduled_date')}
+        return store
+
+    @classmethod
+    def from_matches(cls, matches: Iterable[Match]) -> "MatchStore":
+        return cls.from_dicts(m.__dict__ for m in matches)
+
+    def _code(self, entrant_id: Optional[str]) -> int:
+        if entrant_id is None:
+            return NONE
+        code = self._entrant_codes.get(entrant_id)
+        if code is None:
+            code = self._entrant_codes[entrant_id] = len(self.entrants)
+            self.entrants.append(entrant_id)
+        return code
+
+    # --- Queries ---
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __iter__(self) -> Iterator["MatchView"]:
+        return (MatchView(self, i) for i in range(len(self.ids)))
+
+    def view(self, index: int) -> "MatchView":
+        return MatchView(self, index)
+
+    def indices(self, phase: Optional[str] = None, status: Optional[str] = None, match_day: Optional[int] = None) -> List[int]:
+        phase_code = None if phase is None else _PHASE_CODES[phase]
+        status_code = None if status is None else _STATUS_CODES[status]
+        return [
+            i for i in range(len(self.ids))
+            if (phase_code is None or self.phase[i] == phase_code)
+            and (status_code is None or self.status[i] == status_code)
+            and (match_day is None or self.match_day[i] == match_day)
+        ]
+
+    def count(self, phase: Optional[str] = None, status: Optional[str] = None) -> int:
+        if phase is not None and status is None:
+            return self.phase.count(_PHASE_CODES[phase])
+        return len(self.indices(phase, status))
+
+    # --- API boundary ---
+
+    def to_dict(self, index: int) -> Dict[str, Any]:
+        data: Dict[str, Any] = {'id': self.ids[index]}
+        for name in ENTRANT_FIELDS:
+            code = getattr(self, name)[index]
+            data[name] = None if code == NONE else self.entrants[code]
+        for name in INT_FIELDS:
+            value = getattr(self, name)[index]
+            data[name] = None if value == NONE else value
+        data['phase'] = PHASES[self.phase[index]]
+        data['status'] = STATUSES[self.status[index]]
+        data['is_bye'] = bool(self.is_bye[index])
+        data['scheduled_date'] = self.scheduled_date.get(index)
+        return data
+
+    def to_match(self, index: int) -> Match:
+        return construct_trusted(Match, self.to_dict(index))
+
+    def to_matches(self, indices: Optional[Iterable[int]] = None) -> List[Match]:
+        return [self.to_match(i) for i in (range(len(self.ids)) if indices is None else indices)]
+
+
+class MatchView:
+    """Read-only view on one row of a MatchStore, with the same attribute names as Match."""
+    __slots__ = ('_store', '_index')
+
+    def __init__(self, store: MatchStore, index: int):
+        self._store = store
+        self._index = index
+
+    @property
+    def id(self) -> str:
+        return self._store.ids[self._index]
+
+    @property
+    def phase(self) -> str:
+        return PHASES[self._store.phase[self._index]]
+
+    @property
+    def status(self) -> str:
+        return STATUSES[self._store.status[self._index]]
+
+    @property
+    def is_bye(self) -> bool:
+        return bool(self._store.is_bye[self._index])
+
+    @property
+    def scheduled_date(self):
+        return self._store.scheduled_date.get(self._index)
+
+    def to_match(self) -> Match:
+        return self._store.to_match(self._index)
+
+
+def _entrant_property(name: str) -> property:
+    def get(self: MatchView) -> Optional[str]:
+        code = getattr(self._store, name)[self._index]
+        return None if code == NONE else self._store.entrants[code]
+    return property(get)
+
+
+def _int_property(name: str) -> property:
+    def get(self: MatchView) -> Optional[int]:
+        value = getattr(self._store, name)[self._index]
+        return None if value == NONE else value
+    return property(get)
+
+
+for _name in ENTRANT_FIELDS:
+    setattr(MatchView, _name, _entrant_property(_name))
+for _name in INT_FIELDS:
+    setattr(MatchView, _name, _int_property(_name))
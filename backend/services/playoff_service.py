@@ -158,3 +158,54 @@ def _generate_playoffs_from_standings(tournament_obj: Tournament) -> Tournament:
     tournament_obj.status = "playoffs"
     return tournament_obj
 
+
+
+def advance_playoffs(tournament_obj: Tournament) -> List[Match]:
+    """
+    Called after a playoff result when the match had no next-round slot to fill.
+    If the last round is fully completed, adds the next round built from its winners
+    (odd winner out gets a bye). When a single winner is left, marks the tournament completed.
+
+    Brackets from _generate_playoffs_from_standings already contain every round, so new
+    matches only appear for tournaments whose playoffs were created one round at a time.
+    Returns the added matches.
+    """
+    playoff_matches = [m for m in tournament_obj.matches if m.phase == 'playoff']
+    if not playoff_matches:
+        return []
+    last_round = max(m.round_number or 0 for m in playoff_matches)
+    last_round_matches = [m for m in playoff_matches if (m.round_number or 0) == last_round]
+    if not all(m.status == 'completed' for m in last_round_matches):
+        return []
+
+    winners = [m.winner_id for m in last_round_matches if m.winner_id]
+    if len(winners) == 1:
+        tournament_obj.status = "completed"
+        return []
+
+    match_num = max(m.match_number or 0 for m in tournament_obj.matches) + 1
+    new_matches = []
+    for i in range(0, len(winners), 2):
+        if i + 1 < len(winners):
+            match = Match(
+                participant1_id=winners[i],
+                participant2_id=winners[i + 1],
+                match_number=match_num,
+                round_number=last_round + 1,
+                phase='playoff',
+            )
+        else:
+            # Odd number of winners, create bye match
+            match = Match(
+                participant1_id=winners[i],
+                match_number=match_num,
+                round_number=last_round + 1,
+                phase='playoff',
+                is_bye=True,
+                winner_id=winners[i],
+                status='completed',
+            )
+        new_matches.append(match)
+        match_num += 1
+    tournament_obj.matches.extend(new_matches)
+    return new_matches
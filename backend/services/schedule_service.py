@@ -0,0 +1,65 @@
+from itertools import repeat
+from typing import Iterator, NamedTuple, Sequence
+
+
+class Pairing(NamedTuple):
+    match_day: int
+    match_number: int
+    participant1_id: str  # Home side when home/away balancing is enabled
+    participant2_id: str
+
+
+def round_robin_matchdays(num_entrants: int, legs: int = 1) -> int:
+    """Number of matchdays: n - 1 rounds for an even field, n for an odd one (everyone gets a bye)."""
+    if num_entrants < 2:
+        return 0
+    return (num_entrants - 1 + num_entrants % 2) * legs
+
+
+def round_robin_pairings(
+    entrant_ids: Sequence[str], legs: int = 1, balance_home_away: bool = False
+) -> Iterator[Pairing]:
+    """
+    Circle method schedule, streamed matchday by matchday.
+
+    Slot 0 is fixed and the other slots rotate by one position per matchday: each matchday
+    slices the rotated ring once and pairs its two halves, so every pairing costs O(1) and
+    only one matchday is held in memory. An odd field gets a phantom entrant (None) and
+    whoever meets it has a bye. Without balancing, the output is the same as the previous
+    router loop.
+
+    - legs=2 is a double round robin. The second leg repeats the first with home and away
+      swapped.
+    - balance_home_away alternates the fixed entrant between home and away. The rotation
+      already balances everyone else, so no entrant plays more than one extra home game.
+    """
+    n = len(entrant_ids)
+    if n < 2:
+        return
+    fixed = entrant_ids[0]
+    ring = list(entrant_ids[1:]) + [None] * (n % 2)
+    rotating = len(ring)
+    half = (rotating + 1) // 2
+    new_pairing = tuple.__new__  # Skips the Python-level NamedTuple constructor
+
+    match_number = 1
+    for leg in range(legs):
+        swap_all = leg % 2 == 1
+        for day in range(rotating):
+            match_day = leg * rotating + day + 1
+            swap_fixed = (balance_home_away and day % 2 == 1) != swap_all
+            # Slots 1..rotating on this day: the ring rotated right by `day`. Slot i plays
+            # slot rotating - i, the fixed entrant plays the last slot
+            slots = ring[rotating - day:] + ring[:rotating - day]
+            homes = [fixed] + slots[:half - 1]
+            aways = slots[half - 1:][::-1]
+            if swap_all:
+                homes, aways = aways, homes
+            if swap_fixed != swap_all:
+                homes[0], aways[0] = aways[0], homes[0]
+            if n % 2:
+                bye = homes.index(None) if None in homes else aways.index(None)
+                del homes[bye], aways[bye]
+            numbers = range(match_number, match_number + len(homes))
+            match_number += len(homes)
+            yield from map(new_pairing, repeat(Pairing), zip(repeat(match_day), numbers, homes, aways))
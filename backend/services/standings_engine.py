@@ -0,0 +1,246 @@
+"""
+Vectorized standings engine for large leagues.
+
+Completed group matches are encoded once as parallel arrays (entrant indices, winner/loser,
+total scores, set scores). Totals are then computed in batch with bincount and the ranking
+is a single lexsort over the tiebreak chain. The head-to-head criterion is a mini-table:
+among entrants still tied on the previous criteria, only the wins in the matches they played
+against each other count. All tie groups are resolved at once.
+
+NumPy is optional. Without it the same computation runs in pure Python, which is slower but
+gives the same results.
+"""
+from typing import Dict, List, NamedTuple, Optional, Sequence, Union, get_args
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+from models import Match, Tiebreaker
+from services.match_store import NONE, PHASES, STATUSES, MatchStore
+
+HAVE_NUMPY = np is not None
+
+# Ranking criteria, all in descending order. Ties left after the whole chain keep the
+# entrants' order
+TIEBREAKERS = get_args(Tiebreaker)
+# Criteria that only need the per-entrant totals, not the individual matches
+AGGREGATE_TIEBREAKERS = {"wins", "score_diff", "score_for"}
+SET_FIELDS = (
+    ("set1_score_participant1", "set1_score_participant2"),
+    ("set2_score_participant1", "set2_score_participant2"),
+    ("set3_score_participant1", "set3_score_participant2"),
+)
+COLUMNS = ("played", "wins", "losses", "score_for", "score_against", "sets_won", "sets_lost")
+
+
+class MatchArrays(NamedTuple):
+    """Completed group matches as parallel arrays. Indices refer to the entrant list, -1 = not an entrant."""
+    p1: Sequence[int]
+    p2: Sequence[int]
+    winner: Sequence[int]
+    loser: Sequence[int]
+    score1: Sequence[int]
+    score2: Sequence[int]
+    sets1: Sequence[int]  # Sets won by participant 1
+    sets2: Sequence[int]
+
+
+def encode_matches(
+    entrant_ids: List[str], matches: Union[List[Match], MatchStore], vectorized: bool = HAVE_NUMPY
+) -> MatchArrays:
+    index = {entrant_id: i for i, entrant_id in enumerate(entrant_ids)}.get
+    if isinstance(matches, MatchStore):
+        return _encode_store(matches, index, vectorized)
+    completed = [m for m in matches if m.phase == 'group' and m.status == 'completed']
+    if vectorized:
+        # One tuple per match and a single conversion: None becomes NaN in a float array
+        rows = np.array(
+            [
+                (index(m.participant1_id, -1), index(m.participant2_id, -1), index(m.winner_id, -1),
+                 bool(m.winner_id), m.winner_id == m.participant1_id, m.score_participant1, m.score_participant2,
+                 m.set1_score_participant1, m.set1_score_participant2, m.set2_score_participant1,
+                 m.set2_score_participant2, m.set3_score_participant1, m.set3_score_participant2)
+                for m in completed
+            ],
+            dtype=np.float64,
+        ).reshape(len(completed), 13)
+        p1, p2, winner = (rows[:, i].astype(np.int64) for i in range(3))
+        has_winner, winner_is_p1 = rows[:, 3] > 0, rows[:, 4] > 0
+        # Same rule as the incremental table: the loser is whoever is not the winner
+        loser = np.where(has_winner, np.where(winner_is_p1, p2, p1), -1)
+        scores = np.nan_to_num(rows[:, 5:7]).astype(np.int64)
+        set1, set2 = rows[:, 7::2], rows[:, 8::2]  # NaN comparisons are False: unplayed sets count for nobody
+        return MatchArrays(
+            p1, p2, winner, loser, scores[:, 0], scores[:, 1],
+            (set1 > set2).sum(axis=1), (set2 > set1).sum(axis=1),
+        )
+
+    p1 = [index(m.participant1_id, -1) for m in completed]
+    p2 = [index(m.participant2_id, -1) for m in completed]
+    winner = [index(m.winner_id, -1) for m in completed]
+    loser = [
+        (b if m.winner_id == m.participant1_id else a) if m.winner_id else -1
+        for m, a, b in zip(completed, p1, p2)
+    ]
+    score1 = [m.score_participant1 or 0 for m in completed]
+    score2 = [m.score_participant2 or 0 for m in completed]
+    sets1 = [0] * len(completed)
+    sets2 = [0] * len(completed)
+    for f1, f2 in SET_FIELDS:
+        for i, m in enumerate(completed):
+            a, b = getattr(m, f1), getattr(m, f2)
+            if a is not None and b is not None:
+                sets1[i] += a > b
+                sets2[i] += b > a
+    return MatchArrays(p1, p2, winner, loser, score1, score2, sets1, sets2)
+
+
+def _encode_store(store: MatchStore, index, vectorized: bool) -> MatchArrays:
+    """The store already has typed columns: with NumPy they are read in place, with no per-match loop."""
+    # Store entrant code -> entrant index; the trailing -1 maps the NONE code (-1) to -1
+    code_to_index = [index(entrant_id, -1) for entrant_id in store.entrants] + [-1]
+    if vectorized:
+        def column(name, dtype=np.int32):
+            return np.frombuffer(getattr(store, name), dtype=dtype)
+
+        selected = (column('phase', np.int8) == PHASES.index('group')) & (column('status', np.int8) == STATUSES.index('completed'))
+        codes = np.array(code_to_index, dtype=np.int64)
+        p1_code, p2_code, winner_code = (column(name)[selected] for name in ('participant1_id', 'participant2_id', 'winner_id'))
+        p1, p2, winner = codes[p1_code], codes[p2_code], codes[winner_code]
+        loser = np.where(winner_code != NONE, np.where(winner_code == p1_code, p2, p1), -1)
+        score1, score2 = (np.maximum(column(name)[selected], 0).astype(np.int64) for name in ('score_participant1', 'score_participant2'))
+        sets1 = np.zeros(len(p1), dtype=np.int64)
+        sets2 = np.zeros(len(p1), dtype=np.int64)
+        for f1, f2 in SET_FIELDS:
+            a, b = column(f1)[selected], column(f2)[selected]
+            played = (a != NONE) & (b != NONE)
+            sets1 += played & (a > b)
+            sets2 += played & (b > a)
+        return MatchArrays(p1, p2, winner, loser, score1, score2, sets1, sets2)
+
+    rows = store.indices(phase='group', status='completed')
+    p1 = [code_to_index[store.participant1_id[i]] for i in rows]
+    p2 = [code_to_index[store.participant2_id[i]] for i in rows]
+    winner = [code_to_index[store.winner_id[i]] for i in rows]
+    loser = [
+        (b if store.winner_id[i] == store.participant1_id[i] else a) if store.winner_id[i] != NONE else -1
+        for i, a, b in zip(rows, p1, p2)
+    ]
+    score1 = [max(store.score_participant1[i], 0) for i in rows]
+    score2 = [max(store.score_participant2[i], 0) for i in rows]
+    sets1 = [0] * len(rows)
+    sets2 = [0] * len(rows)
+    for f1, f2 in SET_FIELDS:
+        col1, col2 = getattr(store, f1), getattr(store, f2)
+        for k, i in enumerate(rows):
+            a, b = col1[i], col2[i]
+            if a != NONE and b != NONE:
+                sets1[k] += a > b
+                sets2[k] += b > a
+    return MatchArrays(p1, p2, winner, loser, score1, score2, sets1, sets2)
+
+
+def compute_table(arrays: MatchArrays, n: int) -> Dict[str, Sequence[int]]:
+    """Per-entrant totals (COLUMNS), as arrays indexed like the entrant list."""
+    if HAVE_NUMPY and isinstance(arrays.p1, np.ndarray):
+        def add(idx, weights=None):
+            mask = idx >= 0
+            w = None if weights is None else weights[mask]
+            return np.bincount(idx[mask], weights=w, minlength=n).astype(np.int64)
+
+        return {
+            "played": add(arrays.p1) + add(arrays.p2),
+            "wins": add(arrays.winner),
+            "losses": add(arrays.loser),
+            "score_for": add(arrays.p1, arrays.score1) + add(arrays.p2, arrays.score2),
+            "score_against": add(arrays.p1, arrays.score2) + add(arrays.p2, arrays.score1),
+            "sets_won": add(arrays.p1, arrays.sets1) + add(arrays.p2, arrays.sets2),
+            "sets_lost": add(arrays.p1, arrays.sets2) + add(arrays.p2, arrays.sets1),
+        }
+
+    table = {c: [0] * n for c in COLUMNS}
+    for a, b, w, l, s1, s2, k1, k2 in zip(*arrays):
+        for own, score_for, score_against, sets_won, sets_lost in ((a, s1, s2, k1, k2), (b, s2, s1, k2, k1)):
+            if own >= 0:
+                table["played"][own] += 1
+                table["score_for"][own] += score_for
+                table["score_against"][own] += score_against
+                table["sets_won"][own] += sets_won
+                table["sets_lost"][own] += sets_lost
+        if w >= 0:
+            table["wins"][w] += 1
+        if l >= 0:
+            table["losses"][l] += 1
+    return table
+
+
+def rank(
+    table: Dict[str, Sequence[int]], n: int, tiebreakers: Sequence[str], arrays: Optional[MatchArrays] = None
+) -> List[int]:
+    """
+    Entrant indices in ranking order. `arrays` is only needed for head_to_head. set_ratio is
+    sets won / sets played, which orders entrants like won/lost but has no division by zero.
+    """
+    unknown = set(tiebreakers) - set(TIEBREAKERS)
+    if unknown:
+        raise ValueError(f"Unknown tiebreakers: {sorted(unknown)}")
+    if "head_to_head" in tiebreakers and arrays is None:
+        raise ValueError("head_to_head requires the match arrays")
+
+    if HAVE_NUMPY and isinstance(table["wins"], np.ndarray):
+        keys = []
+        for criterion in tiebreakers:
+            if criterion == "head_to_head":
+                keys.append(_head_to_head_numpy(keys, arrays, n))
+            else:
+                keys.append(_criterion(table, criterion, vectorized=True))
+        # lexsort: the last key is the primary one; ties end on the entrant order
+        return np.lexsort([np.arange(n)] + [-k for k in reversed(keys)]).tolist()
+
+    keys = []
+    for criterion in tiebreakers:
+        if criterion == "head_to_head":
+            keys.append(_head_to_head_python(keys, arrays, n))
+        else:
+            keys.append(_criterion(table, criterion, vectorized=False))
+    return sorted(range(n), key=lambda i: tuple(-k[i] for k in keys))
+
+
+def _criterion(table, criterion: str, vectorized: bool):
+    if criterion == "wins":
+        return table["wins"]
+    if criterion == "score_for":
+        return table["score_for"]
+    if criterion == "score_diff":
+        if vectorized:
+            return table["score_for"] - table["score_against"]
+        return [f - a for f, a in zip(table["score_for"], table["score_against"])]
+    # set_ratio
+    if vectorized:
+        total = table["sets_won"] + table["sets_lost"]
+        return np.divide(table["sets_won"], total, out=np.zeros(len(total)), where=total > 0)
+    return [w / (w + l) if w + l else 0.0 for w, l in zip(table["sets_won"], table["sets_lost"])]
+
+
+def _head_to_head_numpy(previous_keys, arrays: MatchArrays, n: int):
+    if previous_keys:
+        _, group = np.unique(np.stack(previous_keys, axis=1), axis=0, return_inverse=True)
+        group = group.reshape(-1)
+    else:
+        group = np.zeros(n, dtype=np.int64)
+    w, l = arrays.winner, arrays.loser
+    decided = (w >= 0) & (l >= 0)
+    mini = decided.copy()
+    mini[decided] = group[w[decided]] == group[l[decided]]
+    return np.bincount(w[mini], minlength=n)
+
+
+def _head_to_head_python(previous_keys, arrays: MatchArrays, n: int):
+    group = [tuple(k[i] for k in previous_keys) for i in range(n)]
+    h2h = [0] * n
+    for w, l in zip(arrays.winner, arrays.loser):
+        if w >= 0 and l >= 0 and group[w] == group[l]:
+            h2h[w] += 1
+    return h2h
@@ -1,61 +1,132 @@
-from models import Tournament
-
-def _calculate_standings(tournament: Tournament) -> list:
-    standings = {}
-    
-    if tournament.tournament_type == "double":
-        # For doubles, calculate standings for teams
-        for team in tournament.teams:
-            standings[team.id] = {
-                "participant": team,  # This will be a team object
-                "played": 0,
-                "wins": 0,
-                "losses": 0,
-                "score_for": 0,
-                "score_against": 0,
-            }
+import os
+from typing import Dict, List, Optional, Set
+
+from models import Match, Standing, Tournament
+from services import standings_engine
+from services.match_store import MatchStore
+
+# Recompute the table from the matches on every read and report any drift from the stored
+# aggregate (debug/verification only: it brings back the full scan)
+STANDINGS_VERIFY = os.getenv("STANDINGS_VERIFY", "0") == "1"
+
+
+def _apply_match(table: Dict[str, Standing], match: Optional[Match], sign: int) -> None:
+    """Adds (sign=1) or removes (sign=-1) the contribution of a match to the table."""
+    if match is None or match.phase != 'group' or match.status != 'completed':
+        return
+    p1_id = match.participant1_id
+    p2_id = match.participant2_id
+    for own_id, own_score, other_score in (
+        (p1_id, match.score_participant1, match.score_participant2),
+        (p2_id, match.score_participant2, match.score_participant1),
+    ):
+        if own_id is None:
+            continue
+        row = table.setdefault(own_id, Standing())
+        row.played += sign
+        if own_score is not None:
+            row.score_for += sign * own_score
+        if other_score is not None:
+            row.score_against += sign * other_score
+
+    if match.winner_id:
+        table.setdefault(match.winner_id, Standing()).wins += sign
+        loser_id = p2_id if match.winner_id == p1_id else p1_id
+        if loser_id is not None:
+            table.setdefault(loser_id, Standing()).losses += sign
+
+
+def _entrants(tournament: Tournament) -> list:
+    # For doubles the table rows are teams, for singles participants
+    return tournament.teams if tournament.tournament_type == "double" else tournament.participants
+
+
+def compute_standings_table(tournament: Tournament, matches: Optional[MatchStore] = None) -> Dict[str, Standing]:
+    """
+    Full recompute from the matches: used for tournaments without the stored aggregate and for
+    verification. `matches` replaces tournament.matches when the caller loaded them as a MatchStore.
+    """
+    entrant_ids = [e.id for e in _entrants(tournament)]
+    arrays = standings_engine.encode_matches(entrant_ids, tournament.matches if matches is None else matches)
+    totals = standings_engine.compute_table(arrays, len(entrant_ids))
+    return {
+        entrant_id: Standing(**{c: int(totals[c][i]) for c in Standing.model_fields})
+        for i, entrant_id in enumerate(entrant_ids)
+    }
+
+
+def apply_result_delta(tournament: Tournament, old_match: Optional[Match], new_match: Match) -> Dict[str, Standing]:
+    """
+    Updates tournament.standings for a result that is recorded or corrected: removes the
+    contribution of the previous version of the match and adds the new one. Tournaments
+    saved before the aggregate existed get a one-time full recompute (new_match must already
+    be in tournament.matches).
+    """
+    if tournament.standings is None:
+        tournament.standings = compute_standings_table(tournament)
     else:
-        # For singles, calculate standings for participants
-        for p in tournament.participants:
-            standings[p.id] = {
-                "participant": p,
-                "played": 0,
-                "wins": 0,
-                "losses": 0,
-                "score_for": 0,
-                "score_against": 0,
-            }
-    
-    for match in tournament.matches:
-        if match.phase == 'group' and match.status == 'completed':
-            p1_id = match.participant1_id
-            p2_id = match.participant2_id
-
-            if p1_id in standings:
-                standings[p1_id]["played"] += 1
-                if match.score_participant1 is not None:
-                    standings[p1_id]["score_for"] += match.score_participant1
-                if match.score_participant2 is not None:
-                    standings[p1_id]["score_against"] += match.score_participant2
-            
-            if p2_id in standings:
-                standings[p2_id]["played"] += 1
-                if match.score_participant2 is not None:
-                    standings[p2_id]["score_for"] += match.score_participant2
-                if match.score_participant1 is not None:
-                    standings[p2_id]["score_against"] += match.score_participant1
-            
-            if match.winner_id:
-                if match.winner_id in standings:
-                    standings[match.winner_id]["wins"] += 1
-                
-                loser_id = p2_id if match.winner_id == p1_id else p1_id
-                if loser_id in standings:
-                    standings[loser_id]["losses"] += 1
-    
-    sorted_standings = sorted(
-        standings.values(),
-        key=lambda x: (x["wins"], x["score_for"] - x["score_against"]),
-        reverse=True
+        _apply_match(tournament.standings, old_match, -1)
+        _apply_match(tournament.standings, new_match, 1)
+    return tournament.standings
+
+
+def delta_rows(old_match: Optional[Match], new_match: Match) -> Set[str]:
+    """Ids of the table rows that apply_result_delta changes for this result."""
+    return {
+        entrant
+        for match in (old_match, new_match)
+        if match is not None and match.phase == 'group' and match.status == 'completed'
+        for entrant in (match.participant1_id, match.participant2_id, match.winner_id)
+        if entrant
+    }
+
+
+def standings_need_matches(tournament: Tournament, tiebreakers: Optional[List[str]] = None) -> bool:
+    """False when the stored table alone can serve the standings (callers can skip loading the matches)."""
+    return (
+        tournament.standings is None
+        or STANDINGS_VERIFY
+        or not set(tiebreakers or tournament.tiebreakers) <= standings_engine.AGGREGATE_TIEBREAKERS
     )
-    return sorted_standings
+
+
+def _calculate_standings(
+    tournament: Tournament, tiebreakers: Optional[List[str]] = None, matches: Optional[MatchStore] = None
+) -> list:
+    """
+    Standings sorted by the tournament's tiebreak chain. With only aggregate criteria the
+    stored table is enough (O(participants)); head_to_head and set_ratio need the matches
+    and go through the vectorized engine (from `matches` if given, else tournament.matches).
+    """
+    tiebreakers = tiebreakers or tournament.tiebreakers
+    if matches is None:
+        matches = tournament.matches
+    entrants = _entrants(tournament)
+    n = len(entrants)
+    table = tournament.standings
+    if STANDINGS_VERIFY and table is not None:
+        expected = compute_standings_table(tournament, matches)
+        if any((table.get(e.id) or Standing()) != expected[e.id] for e in entrants):
+            print(f"Warning: stored standings of tournament {tournament.id} differ from the matches, using the recomputed table")
+            table = None
+
+    if table is not None and set(tiebreakers) <= standings_engine.AGGREGATE_TIEBREAKERS:
+        rows = [table.get(e.id) or Standing() for e in entrants]
+        totals = {c: [getattr(row, c) for row in rows] for c in Standing.model_fields}
+        order = standings_engine.rank(totals, n, tiebreakers)
+    else:
+        arrays = standings_engine.encode_matches([e.id for e in entrants], matches)
+        totals = standings_engine.compute_table(arrays, n)
+        order = standings_engine.rank(totals, n, tiebreakers, arrays)
+
+    return [
+        {
+            "participant": entrants[i],  # Team object for doubles
+            "played": int(totals["played"][i]),
+            "wins": int(totals["wins"][i]),
+            "losses": int(totals["losses"][i]),
+            "score_for": int(totals["score_for"][i]),
+            "score_against": int(totals["score_against"][i]),
+        }
+        for i in order
+    ]
@@ -0,0 +1,194 @@
+"""Interfaccia comune dei backend di storage selezionati da database_adapter."""
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from tournament_events import apply_event
+
+
+def _to_json(data: Any) -> Any:
+    """Normalizza un dict (datetime -> str, ecc.) per le colonne JSON."""
+    return json.loads(json.dumps(data, default=str))
+
+
+# Campi del torneo riportati cosi' come sono nel riepilogo dell'elenco
+SUMMARY_FIELDS = ("id", "user_id", "name", "tournament_type", "format", "status", "version", "created_seq")
+
+# Voce dell'indice dei tornei: riepilogo e email dei partecipanti (solo per il filtro per utente)
+SummaryEntry = Tuple[Dict[str, Any], FrozenSet[str]]
+
+
+def tournament_summary(tournament: Dict[str, Any]) -> SummaryEntry:
+    """Riepilogo di un torneo per l'elenco: nome, stato, numero di partecipanti e avanzamento del girone."""
+    participants = tournament.get("participants") or []
+    total = completed = 0
+    for m in tournament.get("matches") or []:
+        if (m.get("phase") or "group") == "group":
+            total += 1
+            completed += m.get("status") == "completed"
+    summary = {f: tournament[f] for f in SUMMARY_FIELDS if f in tournament}
+    summary.update(participant_count=len(participants), total_group_matches=total, completed_group_matches=completed)
+    return summary, frozenset(p.get("email") for p in participants if p.get("email"))
+
+
+def summary_key(summary: Dict[str, Any]) -> Tuple[int, str]:
+    """Chiave dell'elenco: ordine di creazione, id a parita' (0 = tornei creati prima del campo)."""
+    return summary.get("created_seq") or 0, summary["id"]
+
+
+def summary_cursor(summary: Dict[str, Any]) -> str:
+    return "%d:%s" % summary_key(summary)
+
+
+def parse_summary_cursor(cursor: str) -> Tuple[int, str]:
+    """Chiave codificata da summary_cursor; ValueError se il cursore non e' valido."""
+    created_seq, separator, tournament_id = cursor.partition(":")
+    if not separator or not tournament_id:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return int(created_seq), tournament_id
+
+
+def paginate_summaries(
+    entries: Iterable[SummaryEntry],
+    limit: int,
+    cursor: Optional[str] = None,
+    user_id: Optional[str] = None,
+    email: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Pagina dell'elenco in ordine di creazione, dopo `cursor` (il next_cursor della pagina
+    precedente): un torneo creato nel frattempo finisce in coda, mai in una pagina gia' letta.
+    Con user_id/email restano solo i tornei creati dall'utente o a cui partecipa; `joined`
+    dice se l'utente (email) e' tra i partecipanti.
+    Restituisce i riepiloghi e il cursore della pagina successiva (None se e' l'ultima).
+    Solleva ValueError per un cursore non valido.
+    """
+    after = parse_summary_cursor(cursor) if cursor is not None else None
+    filtered = user_id is not None or email is not None
+    selected = sorted(
+        (dict(summary, joined=email is not None and email in emails) for summary, emails in entries
+         if (after is None or summary_key(summary) > after)
+         and (not filtered or (user_id is not None and summary.get("user_id") == user_id) or email in emails)),
+        key=summary_key,
+    )
+    page = selected[:limit]
+    return page, summary_cursor(page[-1]) if len(selected) > limit else None
+
+
+class VersionConflict(Exception):
+    """Compare-and-swap fallito: il torneo e' stato modificato da un'altra richiesta dopo la lettura."""
+
+    def __init__(self, tournament_id: str, expected_version: int, current_version: int):
+        super().__init__(
+            f"Tournament {tournament_id} is at version {current_version}, expected {expected_version}"
+        )
+        self.tournament_id = tournament_id
+        self.expected_version = expected_version
+        self.current_version = current_version
+
+
+class StorageBackend(ABC):
+    """
+    Ogni torneo ha un campo `version` che ogni scrittura incrementa di uno. Le scritture
+    accettano una versione attesa (`expected_version` o l'omonima chiave dell'evento): se il
+    torneo salvato ha una versione diversa sollevano VersionConflict senza modificare nulla.
+    """
+
+    # True se get_matches filtra giornata e fase con una query sugli indici dello storage:
+    # i router la usano al posto degli indici in memoria costruiti dal torneo completo
+    indexed_match_queries = False
+
+    # --- Tornei ---
+
+    @abstractmethod
+    def get_all_tournaments(self) -> List[Dict[str, Any]]: ...
+
+    @abstractmethod
+    def get_tournament(self, tournament_id: str) -> Optional[Dict[str, Any]]: ...
+
+    @abstractmethod
+    def create_tournament(self, tournament_data: Dict[str, Any]) -> Dict[str, Any]: ...
+
+    @abstractmethod
+    def update_tournament(
+        self, tournament_id: str, tournament_data: Dict[str, Any], expected_version: Optional[int] = None
+    ) -> Optional[Dict[str, Any]]: ...
+
+    @abstractmethod
+    def delete_tournament(self, tournament_id: str) -> bool: ...
+
+    def get_tournament_info(self, tournament_id: str) -> Optional[Dict[str, Any]]:
+        """Solo i campi del torneo, senza partecipanti, squadre e match."""
+        tournament = self.get_tournament(tournament_id)
+        if tournament is None:
+            return None
+        return {k: v for k, v in tournament.items() if k not in ("participants", "teams", "matches")}
+
+    def get_tournament_version(self, tournament_id: str) -> Optional[int]:
+        """Versione corrente del torneo (None se non esiste), per gli ETag delle GET."""
+        info = self.get_tournament_info(tournament_id)
+        return None if info is None else info.get("version", 0)
+
+    def list_tournament_summaries(
+        self, limit: int, cursor: Optional[str] = None, user_id: Optional[str] = None, email: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Pagina dei riepiloghi dei tornei (vedi paginate_summaries). Default: calcolati dai tornei completi."""
+        entries = (tournament_summary(t) for t in self.get_all_tournaments())
+        return paginate_summaries(entries, limit, cursor, user_id, email)
+
+    def get_matches(
+        self, tournament_id: str, match_day: Optional[int] = None, phase: Optional[str] = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Match del torneo filtrati per giornata e/o fase (None se il torneo non esiste)."""
+        tournament = self.get_tournament(tournament_id)
+        if tournament is None:
+            return None
+        return [
+            m for m in tournament.get("matches", [])
+            if (match_day is None or m.get("match_day") == match_day) and (phase is None or m.get("phase") == phase)
+        ]
+
+    def record_event(self, event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Applica un evento di dominio (vedi tournament_events). Default: read-modify-write del
+        torneo con compare-and-swap sulla versione letta; senza versione attesa nell'evento
+        la lettura viene ripetuta finche' la scrittura non va a buon fine.
+        """
+        tournament_id = event["tournament_id"]
+        expected_version = event.get("expected_version")
+        while True:
+            tournament = self.get_tournament(tournament_id)
+            if tournament is None:
+                return None
+            version = tournament.get("version", 0) if expected_version is None else expected_version
+            try:
+                return self.update_tournament(tournament_id, apply_event(tournament, event), expected_version=version)
+            except VersionConflict:
+                if expected_version is not None:
+                    raise
+
+    def cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Contatori della cache dei tornei in memoria, per GET /api/health (None = nessuna cache)."""
+        return None
+
+    # --- Utenti ---
+
+    @abstractmethod
+    def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]: ...
+
+    @abstractmethod
+    def get_user_by_id(self, user_id: str) -> Optional[Dict[str, Any]]: ...
+
+    @abstractmethod
+    def create_user(self, user_data: Dict[str, Any]) -> Optional[Dict[str, Any]]: ...
+
+    @abstractmethod
+    def update_user(self, user_id: str, user_update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]: ...
+
+    # --- Feedback ---
+
+    @abstractmethod
+    def save_feedback(self, feedback_data: Dict[str, Any]) -> Dict[str, Any]: ...
+
+    @abstractmethod
+    def get_all_feedback(self) -> List[Dict[str, Any]]: ...
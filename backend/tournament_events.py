@@ -0,0 +1,90 @@
+"""
+Eventi di dominio sui tornei, condivisi dal journal e dai backend di storage.
+
+Gli eventi sono operazioni di tipo "imposta" (upsert di match e di righe della classifica,
+sostituzione dei playoff, sostituzione completa del torneo...), quindi riapplicarli a uno
+stato che li contiene gia' produce lo stesso risultato. Per lo stesso motivo la versione del torneo viaggia nell'evento
+come valore assoluto (`version`, assegnata dallo storage al momento della scrittura), mentre
+`expected_version` e' la versione letta dal chiamante per il compare-and-swap.
+"""
+from typing import Any, Dict, List, Optional
+
+RESULT_RECORDED = "result_recorded"
+PARTICIPANT_JOINED = "participant_joined"
+PLAYOFFS_GENERATED = "playoffs_generated"
+TOURNAMENT_CREATED = "tournament_created"
+TOURNAMENT_SAVED = "tournament_saved"
+TOURNAMENT_DELETED = "tournament_deleted"
+
+
+def _upsert_matches(matches: List[Dict[str, Any]], updates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    by_id = {m["id"]: m for m in updates}
+    merged = [by_id.pop(m.get("id"), m) for m in matches]
+    merged.extend(by_id.values())
+    return merged
+
+
+def apply_event(tournament: Optional[Dict[str, Any]], event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Applica un evento a un torneo e restituisce il nuovo stato (None = torneo eliminato).
+    Non modifica mai gli oggetti annidati in place: basta una copia superficiale del torneo.
+    """
+    event_type = event["type"]
+    if event_type in (TOURNAMENT_CREATED, TOURNAMENT_SAVED):
+        tournament = dict(event["tournament"])
+    elif event_type == TOURNAMENT_DELETED or tournament is None:
+        return None
+    else:
+        tournament = dict(tournament)
+
+    if event_type == RESULT_RECORDED:
+        tournament["matches"] = _upsert_matches(tournament.get("matches", []), event["matches"])
+        if event.get("standings"):
+            # Solo le righe della classifica cambiate dal risultato
+            tournament["standings"] = dict(tournament.get("standings") or {}, **event["standings"])
+    elif event_type == PLAYOFFS_GENERATED:
+        group_matches = [m for m in tournament.get("matches", []) if m.get("phase") != "playoff"]
+        tournament["matches"] = group_matches + event["matches"]
+    elif event_type == PARTICIPANT_JOINED:
+        participant = event["participant"]
+        participants = tournament.get("participants", [])
+        if not any(p.get("id") == participant.get("id") for p in participants):
+            tournament["participants"] = participants + [participant]
+    tournament.update(event.get("changes") or {})
+    if "version" in event:
+        tournament["version"] = event["version"]
+    return tournament
+
+
+def result_recorded(
+    tournament_id: str,
+    matches: List[Dict[str, Any]],
+    changes: Optional[Dict[str, Any]] = None,
+    expected_version: Optional[int] = None,
+    standings: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    return {
+        "type": RESULT_RECORDED, "tournament_id": tournament_id, "matches": matches, "changes": changes,
+        "standings": standings, "expected_version": expected_version,
+    }
+
+
+def participant_joined(
+    tournament_id: str, participant: Dict[str, Any], expected_version: Optional[int] = None
+) -> Dict[str, Any]:
+    return {
+        "type": PARTICIPANT_JOINED, "tournament_id": tournament_id, "participant": participant,
+        "expected_version": expected_version,
+    }
+
+
+def playoffs_generated(
+    tournament_id: str,
+    playoff_matches: List[Dict[str, Any]],
+    changes: Optional[Dict[str, Any]] = None,
+    expected_version: Optional[int] = None,
+) -> Dict[str, Any]:
+    return {
+        "type": PLAYOFFS_GENERATED, "tournament_id": tournament_id, "matches": playoff_matches, "changes": changes,
+        "expected_version": expected_version,
+    }
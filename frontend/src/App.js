@@ -49,6 +49,7 @@ function App() {
         } catch (error) {
           console.error("App.js: Token validation failed:", error);
           localStorage.removeItem('authToken');
+          localStorage.removeItem('refreshToken');
           setCurrentUser(null);
           console.log("App.js: Token invalid, currentUser set to null.");
         } finally {
@@ -70,6 +71,7 @@ function App() {
     try {
       const loginData = await api.loginUser(usernameOrEmail, password);
       localStorage.setItem('authToken', loginData.access_token);
+      localStorage.setItem('refreshToken', loginData.refresh_token);
       const userDetails = await api.getCurrentUserDetails();
       setCurrentUser(userDetails);
       return true;
@@ -77,6 +79,7 @@ function App() {
       setAuthError(err.message || 'Failed to login');
       setCurrentUser(null);
       localStorage.removeItem('authToken');
+      localStorage.removeItem('refreshToken');
       return false;
     } finally {
       setIsAuthLoading(false);
@@ -90,6 +93,7 @@ function App() {
       await api.registerUser(userData);
       const loginData = await api.loginUser(userData.email, userData.password);
       localStorage.setItem('authToken', loginData.access_token);
+      localStorage.setItem('refreshToken', loginData.refresh_token);
       const userDetails = await api.getCurrentUserDetails();
       setCurrentUser(userDetails);
       return true;
@@ -97,6 +101,7 @@ function App() {
       setAuthError(err.message || 'Failed to register');
       setCurrentUser(null);
       localStorage.removeItem('authToken');
+      localStorage.removeItem('refreshToken');
       return false;
     } finally {
       setIsAuthLoading(false);
@@ -104,7 +109,10 @@ function App() {
   };
 
   const handleLogout = () => {
+    // Revoca lato server di access e refresh token; l'esito non blocca il logout locale
+    api.logoutUser().catch((err) => console.error("App.js: Logout request failed:", err));
     localStorage.removeItem('authToken');
+    localStorage.removeItem('refreshToken');
     setCurrentUser(null);
     navigate('/login');
   };
@@ -113,13 +121,9 @@ function App() {
     setAppIsLoading(true);
     setAppError(null);
     try {
-      const data = await api.getTournaments();
-      const sorted = data.sort((a, b) => {
-        const dateA = new Date(a.start_date || 0);
-        const dateB = new Date(b.start_date || 0);
-        return dateB - dateA;
-      });
-      setTournaments(sorted);
+      // Il backend li restituisce in ordine di creazione: i piu' recenti in cima
+      const tournaments = await api.getAllTournaments();
+      setTournaments(tournaments.reverse());
     } catch (err) {
       setAppError(err.message || 'Failed to fetch tournaments');
     } finally {
@@ -153,11 +157,7 @@ function App() {
     setAppError(null);
     try {
       const newTournament = await api.createTournament(tournamentData);
-      setTournaments(prev => [newTournament, ...prev].sort((a, b) => {
-        const dateA = new Date(a.start_date || 0);
-        const dateB = new Date(b.start_date || 0);
-        return dateB - dateA;
-      }));
+      setTournaments(prev => [newTournament, ...prev]);
       setShowCreateForm(false);
       navigate(`/tournaments/${newTournament.id}`); // Redirect to the new tournament
     } catch (err) {
@@ -173,11 +173,7 @@ function App() {
     setAppError(null);
     try {
       const updatedTournament = await api.updateTournament(editingTournament.id, tournamentData);
-      setTournaments(prev => prev.map(t => t.id === updatedTournament.id ? updatedTournament : t).sort((a, b) => {
-        const dateA = new Date(a.start_date || 0);
-        const dateB = new Date(b.start_date || 0);
-        return dateB - dateA;
-      }));
+      setTournaments(prev => prev.map(t => t.id === updatedTournament.id ? updatedTournament : t));
       setShowCreateForm(false);
       setEditingTournament(null);
     } catch (err) {
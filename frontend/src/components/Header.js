@@ -45,7 +45,7 @@ const Header = ({ title, tournaments, currentTournamentId, onTournamentChange, o
               </div>
               {currentTournament && (
                 <p className="text-xs text-slate-500 dark:text-slate-400 truncate px-1">
-                  {currentTournament.tournament_type === 'double' ? 'Doubles' : 'Singles'} · {currentTournament.format.replace('_', ' ').split(' ').map(w => w.charAt(0).toUpperCase() + w.slice(1)).join(' ')} · {currentTournament.participants?.length || 0} player{currentTournament.participants?.length !== 1 ? 's' : ''}
+                  {currentTournament.tournament_type === 'double' ? 'Doubles' : 'Singles'} · {currentTournament.format.replace('_', ' ').split(' ').map(w => w.charAt(0).toUpperCase() + w.slice(1)).join(' ')} · {currentTournament.participant_count || 0} player{currentTournament.participant_count !== 1 ? 's' : ''}
                 </p>
               )}
             </>
@@ -1,9 +1,43 @@
-import React, { useState, useEffect, useCallback } from 'react';
+import React, { useState, useEffect, useCallback, useRef } from 'react';
 import { useParams } from 'react-router-dom';
 import * as api from '../services/api';
 import RecordResultModal from './RecordResultModal';
 import ConfirmModal from './ConfirmModal';
 
+// Live deltas applied like backend/tournament_events.py apply_event
+const upsertMatches = (current, updates) => {
+  const byId = new Map(updates.map(m => [m.id, m]));
+  const merged = current.map(m => {
+    const update = byId.get(m.id);
+    byId.delete(m.id);
+    return update || m;
+  });
+  return [...merged, ...byId.values()];
+};
+
+const applyMatchesDelta = (current, type, data) => {
+  if (type === 'result_recorded') return upsertMatches(current, data.matches);
+  if (type === 'playoffs_generated') return [...current.filter(m => m.phase !== 'playoff'), ...data.matches];
+  return current;
+};
+
+const applyParticipantsDelta = (current, type, data) => {
+  if (type !== 'participant_joined' || current.some(p => p.id === data.participant.id)) return current;
+  return [...current, data.participant];
+};
+
+const applyTournamentDelta = (tournament, type, data) => {
+  return {
+    ...tournament,
+    ...(data.changes || {}),
+    matches: applyMatchesDelta(tournament.matches || [], type, data),
+    participants: applyParticipantsDelta(tournament.participants || [], type, data),
+    // Only the rows that changed are sent
+    standings: data.standings ? { ...tournament.standings, ...data.standings } : tournament.standings,
+    version: data.version,
+  };
+};
+
 function TournamentDetail({ currentUser }) {
   const { tournamentId } = useParams();
   const [tournament, setTournament] = useState(null);
@@ -19,18 +53,23 @@ function TournamentDetail({ currentUser }) {
     return saved || 'group';
   });
   const [allMatchesOpen, setAllMatchesOpen] = useState(false);
+  // Version of the data on screen, and whether the live connection is open
+  const versionRef = useRef(null);
+  const liveRef = useRef(false);
 
-  const fetchTournamentData = useCallback(async () => {
+  // silent: refresh without replacing the page with the loading message
+  const fetchTournamentData = useCallback(async ({ silent = false } = {}) => {
     if (!tournamentId) return;
-    setIsLoading(true);
+    if (!silent) setIsLoading(true);
     setError(null);
     try {
       const tournamentData = await api.getTournamentById(tournamentId);
+      versionRef.current = tournamentData.version;
       setTournament(tournamentData);
       const participantsData = await api.getTournamentParticipants(tournamentId);
       setParticipants(participantsData);
       const matchesData = await api.getTournamentMatches(tournamentId);
-      setMatches(matchesData);
+      setMatches(matchesData.items);
     } catch (err) {
       setError(err.message || `Failed to fetch tournament details`);
     } finally {
@@ -42,6 +81,53 @@ function TournamentDetail({ currentUser }) {
     fetchTournamentData();
   }, [fetchTournamentData]);
 
+  // Live updates: a delta is applied only on top of the version right before it; anything
+  // else (missed events, reconnection, full updates) reloads the tournament
+  useEffect(() => {
+    if (!tournamentId) return undefined;
+    const handleLiveEvent = (type, data) => {
+      if (type === 'disconnected') {
+        liveRef.current = false;
+        return;
+      }
+      if (type === 'hello') {
+        liveRef.current = true;
+        if (versionRef.current !== null && data.version !== versionRef.current) {
+          fetchTournamentData({ silent: true });
+        }
+        return;
+      }
+      if (type === 'tournament_deleted') {
+        versionRef.current = null;
+        setTournament(null);
+        return;
+      }
+      if (type === 'resync') {
+        fetchTournamentData({ silent: true });
+        return;
+      }
+      if (versionRef.current === null || data.version <= versionRef.current) return;
+      if (type === 'tournament_saved' || data.version !== versionRef.current + 1) {
+        fetchTournamentData({ silent: true });
+        return;
+      }
+      versionRef.current = data.version;
+      setTournament(prev => (prev ? applyTournamentDelta(prev, type, data) : prev));
+      setMatches(prev => applyMatchesDelta(prev, type, data));
+      setParticipants(prev => applyParticipantsDelta(prev, type, data));
+    };
+    const unsubscribe = api.subscribeTournamentEvents(tournamentId, handleLiveEvent);
+    return () => {
+      liveRef.current = false;
+      unsubscribe();
+    };
+  }, [tournamentId, fetchTournamentData]);
+
+  // After an action: with the live connection open the changes arrive as events
+  const refreshAfterAction = async () => {
+    if (!liveRef.current) await fetchTournamentData();
+  };
+
 
 
   const handleGenerateMatches = async () => {
@@ -53,7 +139,7 @@ function TournamentDetail({ currentUser }) {
       onConfirm: async () => {
         try {
           await api.generateMatches(tournament.id);
-          await fetchTournamentData();
+          await refreshAfterAction();
         } catch (err) {
           setError(err.message || 'Failed to generate matches');
         }
@@ -74,7 +160,7 @@ function TournamentDetail({ currentUser }) {
   const handleSubmitMatchResult = async (tournamentId, matchId, resultData) => {
     try {
       const response = await api.recordMatchResult(tournamentId, matchId, resultData);
-      await fetchTournamentData();
+      await refreshAfterAction();
       setIsResultModalOpen(false);
       setCurrentMatchForResult(null);
       
@@ -378,7 +464,7 @@ function TournamentDetail({ currentUser }) {
               onClick={async () => {
                 try {
                   await api.generatePlayoffs(tournament.id);
-                  await fetchTournamentData();
+                  await refreshAfterAction();
                 } catch (err) {
                   setError(err.message || 'Failed to generate playoffs');
                 }
@@ -16,7 +16,7 @@ const HomePage = ({ currentUser }) => {
       setIsLoading(true);
       setError(null);
       try {
-        const tournaments = await api.getTournaments();
+        const tournaments = await api.getAllTournaments();
         // Filtra i tornei dell'utente corrente
         const userTourns = tournaments.filter(t => t.user_id === currentUser.id);
         setUserTournaments(userTourns);
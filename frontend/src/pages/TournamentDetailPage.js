@@ -37,7 +37,7 @@ const TournamentDetailPage = ({ currentUser }) => {
       
       setTournament(tournamentData);
       setParticipants(participantsData);
-      setMatches(matchesData);
+      setMatches(matchesData.items);
     } catch (err) {
       setError(err.message || 'Failed to fetch tournament details');
       console.error(err);
@@ -16,8 +16,7 @@ const TournamentsPage = ({ currentUser, onCreateTournament }) => {
       setIsLoading(true);
       setError(null);
       try {
-        const data = await api.getTournaments();
-        setTournaments(data);
+        setTournaments(await api.getAllTournaments());
       } catch (err) {
         setError(err.message || 'Failed to fetch tournaments');
         console.error(err);
@@ -37,10 +36,11 @@ const TournamentsPage = ({ currentUser, onCreateTournament }) => {
     return tournaments.filter(tournament => {
       const matchesSearch = tournament.name.toLowerCase().includes(searchTerm.toLowerCase());
       const matchesStatus = statusFilter === 'all' || tournament.status === statusFilter;
-      const isJoined = currentUser && tournament.participants?.some(p => p.email === currentUser.email);
+      // joined e' calcolato dal backend per l'utente autenticato (i riepiloghi non hanno i partecipanti)
+      const isJoined = currentUser && tournament.joined;
       return matchesSearch && matchesStatus && !isJoined;
     });
-  }, [tournaments, searchTerm, statusFilter]);
+  }, [tournaments, searchTerm, statusFilter, currentUser]);
 
   if (isLoading) {
     return (
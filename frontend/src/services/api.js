@@ -34,31 +34,90 @@ const handleResponse = async (response) => {
  * @returns {Promise<any>} - The JSON response.
  */
 const authenticatedFetch = async (url, method, body) => {
-  const token = localStorage.getItem('authToken');
-  const headers = {
-    'Content-Type': 'application/json',
-  };
-  if (token) {
-    headers['Authorization'] = `Bearer ${token}`;
-  }
+  const buildConfig = () => {
+    const token = localStorage.getItem('authToken');
+    const headers = {
+      'Content-Type': 'application/json',
+    };
+    if (token) {
+      headers['Authorization'] = `Bearer ${token}`;
+    }
 
-  const config = {
-    method,
-    headers,
+    const config = {
+      method,
+      headers,
+    };
+
+    if (body) {
+      config.body = JSON.stringify(body);
+    }
+    return config;
   };
 
-  if (body) {
-    config.body = JSON.stringify(body);
+  let response = await fetch(url, buildConfig());
+  // Access token scaduto: lo si rinnova con il refresh token (senza password) e si riprova una volta
+  if (response.status === 401 && localStorage.getItem('refreshToken') && await refreshAccessToken()) {
+    response = await fetch(url, buildConfig());
   }
-
-  const response = await fetch(url, config);
   return handleResponse(response);
 };
 
+// Un solo refresh alla volta: le richieste che ricevono 401 insieme aspettano lo stesso rinnovo
+let refreshPromise = null;
+
+/**
+ * Exchanges the stored refresh token for a new access/refresh token pair.
+ * @returns {Promise<boolean>} - true if new tokens were stored.
+ */
+export const refreshAccessToken = () => {
+  if (!refreshPromise) {
+    refreshPromise = (async () => {
+      try {
+        const response = await fetch(`${API_BASE_URL}/users/refresh`, {
+          method: 'POST',
+          headers: {
+            'Content-Type': 'application/json',
+          },
+          body: JSON.stringify({ refresh_token: localStorage.getItem('refreshToken') }),
+        });
+        if (!response.ok) {
+          localStorage.removeItem('refreshToken');
+          return false;
+        }
+        const data = await response.json();
+        localStorage.setItem('authToken', data.access_token);
+        localStorage.setItem('refreshToken', data.refresh_token);
+        return true;
+      } catch (e) {
+        return false;
+      } finally {
+        refreshPromise = null;
+      }
+    })();
+  }
+  return refreshPromise;
+};
+
 // --- Tournament Endpoints ---
 
-export const getTournaments = async () => {
-  return authenticatedFetch(`${API_BASE_URL}/tournaments/`, 'GET');
+// Elenco paginato dei tornei: { items: [riepiloghi], next_cursor }.
+// I riepiloghi hanno participant_count e l'avanzamento del girone, non partecipanti e match.
+export const getTournaments = async ({ limit = 50, cursor = null } = {}) => {
+  const params = new URLSearchParams({ limit });
+  if (cursor) params.append('cursor', cursor);
+  return authenticatedFetch(`${API_BASE_URL}/tournaments/?${params}`, 'GET');
+};
+
+// Tutti i riepiloghi, pagina dopo pagina finche' next_cursor non e' null (in ordine di creazione).
+export const getAllTournaments = async () => {
+  const tournaments = [];
+  let cursor = null;
+  do {
+    const { items, next_cursor } = await getTournaments({ limit: 200, cursor });
+    tournaments.push(...items);
+    cursor = next_cursor;
+  } while (cursor);
+  return tournaments;
 };
 
 export const getTournamentById = async (tournamentId) => {
@@ -67,6 +126,31 @@ export const getTournamentById = async (tournamentId) => {
   return handleResponse(response);
 };
 
+// Tipi di evento inviati da GET /tournaments/{id}/events (vedi backend/live_updates.py)
+const TOURNAMENT_EVENT_TYPES = [
+  'hello', 'result_recorded', 'participant_joined', 'playoffs_generated',
+  'tournament_saved', 'tournament_deleted', 'resync',
+];
+
+/**
+ * Subscribes to the live updates of a tournament (Server-Sent Events).
+ * @param {string} tournamentId - The tournament to follow.
+ * @param {function(string, object): void} onEvent - Called with the event type and its data;
+ *   'disconnected' when the connection drops (EventSource reconnects on its own and sends 'hello' again).
+ * @returns {function(): void} - Closes the connection.
+ */
+export const subscribeTournamentEvents = (tournamentId, onEvent) => {
+  if (typeof EventSource === 'undefined') {
+    return () => {};
+  }
+  const source = new EventSource(`${API_BASE_URL}/tournaments/${tournamentId}/events`);
+  TOURNAMENT_EVENT_TYPES.forEach((type) => {
+    source.addEventListener(type, (event) => onEvent(type, JSON.parse(event.data)));
+  });
+  source.onerror = () => onEvent('disconnected', null);
+  return () => source.close();
+};
+
 export const createTournament = async (tournamentData) => {
   // Assicurati che i campi opzionali non inviati come undefined siano gestiti
   // Pydantic dovrebbe gestire i default se i campi non sono presenti
@@ -112,9 +196,15 @@ export const generateMatches = async (tournamentId) => {
   return authenticatedFetch(`${API_BASE_URL}/tournaments/${tournamentId}/matches/generate`, 'POST');
 };
 
-export const getTournamentMatches = async (tournamentId) => {
-  // Assuming viewing matches might require login, or to see user-specific context
-  return authenticatedFetch(`${API_BASE_URL}/tournaments/${tournamentId}/matches`, 'GET');
+// Match del torneo: { items, next_cursor }. Senza limit arrivano tutti in un'unica pagina.
+// Filtri: status, phase, matchday, round, participant_id (es. "le mie partite di oggi").
+export const getTournamentMatches = async (tournamentId, { limit, cursor, ...filters } = {}) => {
+  const params = new URLSearchParams();
+  Object.entries({ ...filters, limit, cursor }).forEach(([key, value]) => {
+    if (value !== undefined && value !== null) params.append(key, value);
+  });
+  const query = params.toString() ? `?${params}` : '';
+  return authenticatedFetch(`${API_BASE_URL}/tournaments/${tournamentId}/matches${query}`, 'GET');
 };
 
 export const recordMatchResult = async (tournamentId, matchId, resultData) => {
@@ -187,7 +277,25 @@ export const loginUser = async (usernameOrEmail, password) => {
     },
     body: formData.toString(),
   });
-  return handleResponse(response); // Expects { access_token, token_type }
+  return handleResponse(response); // Expects { access_token, token_type, refresh_token }
+};
+
+export const logoutUser = async () => {
+  const token = localStorage.getItem('authToken');
+  const refreshToken = localStorage.getItem('refreshToken');
+  if (!token) {
+    return null;
+  }
+  // Il refresh token viaggia nel corpo, come per /users/refresh, non nella query string
+  const response = await fetch(`${API_BASE_URL}/users/logout`, {
+    method: 'POST',
+    headers: {
+      'Authorization': `Bearer ${token}`,
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify({ refresh_token: refreshToken }),
+  });
+  return handleResponse(response);
 };
 
 export const getCurrentUserDetails = async () => {